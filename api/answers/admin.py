@@ -44,6 +44,8 @@ class AnswerAdmin(admin.ModelAdmin):
         else:
             return None
 
+    # Avoids one query per row for the question/owner columns
+    list_select_related = ("question", "owner")
     list_filter = ("is_active",)
     raw_id_fields = ("question", "owner")
     readonly_fields = ("answer_id",)
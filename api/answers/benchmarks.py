@@ -0,0 +1,42 @@
+"""
+Benchmarks for the Answers endpoints and writing Answers (insert throughput)
+"""
+from api.answers.models import Answer
+from api.answers.views import answers_search
+from api.core.benchmarks.base import benchmark
+from api.core.benchmarks.client import get
+from api.core.benchmarks.corpus import WORDS
+from api.questions.models import Question
+
+BATCH_SIZE = 100
+# About 2KB, the size of the "Long Answer" rows of the demo data
+LONG_DESCRIPTION_WORDS = 300
+
+
+@benchmark("answers_search.contains")
+def search_contains(corpus):
+    get(answers_search, corpus.user, {"description": "$" + corpus.random.choice(WORDS), "per_page": BATCH_SIZE})
+
+
+def _long_description(corpus):
+    return " ".join(corpus.random.choices(WORDS, k=LONG_DESCRIPTION_WORDS))
+
+
+@benchmark("answers_insert.long_description")
+def insert_long_description(corpus):
+    Answer.objects.bulk_create(
+        [
+            Answer(description=_long_description(corpus), question_id=corpus.random_question_id())
+            for _ in range(BATCH_SIZE)
+        ]
+    )
+
+
+@benchmark("questions_insert.context")
+def insert_context(corpus):
+    Question.objects.bulk_create(
+        [
+            Question(title="Benchmark question", context=_long_description(corpus)[:256])
+            for _ in range(BATCH_SIZE)
+        ]
+    )
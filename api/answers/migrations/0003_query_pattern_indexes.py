@@ -0,0 +1,30 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0004_query_pattern_indexes'),
+        ('answers', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'is_active'], name='answer_question_active_idx'),
+        ),
+        # Replaced by answer_question_active_idx, created first so question_id is never unindexed
+        migrations.AlterField(
+            model_name='answer',
+            name='question',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='questions.question'),
+        ),
+        # Answers of a tag read the auto-created through table by answertag_id
+        migrations.RunSQL(
+            sql='CREATE INDEX answer_tags_tag_answer_idx ON answer_tags (answertag_id, answer_id)',
+            reverse_sql='DROP INDEX answer_tags_tag_answer_idx',
+        ),
+    ]
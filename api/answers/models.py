@@ -20,11 +20,18 @@ class Answer(CoreModel):
     answer_id = models.UUIDField("Answer ID", primary_key=True, default=uuid.uuid4, editable=False)
 
     # Main information
-    description = models.TextField("Description", blank=False, null=False, db_index=True)
+    # Searched with istartswith/icontains, served by a trigram index on PostgreSQL (migration 0004)
+    description = models.TextField("Description", blank=False, null=False)
 
     # Relationships
+    # Indexed by answer_question_active_idx, which starts with question_id
     question = models.ForeignKey(
-        "questions.Question", related_name="answers", blank=False, null=False, on_delete=models.deletion.CASCADE
+        "questions.Question",
+        related_name="answers",
+        blank=False,
+        null=False,
+        db_index=False,
+        on_delete=models.deletion.CASCADE,
     )
     owner = models.ForeignKey("users.User", blank=True, null=True, on_delete=models.deletion.SET_NULL)
     tags = models.ManyToManyField("answers.AnswerTag", blank=True)
@@ -33,6 +40,10 @@ class Answer(CoreModel):
         db_table = "answer"
         verbose_name = "Answer"
         verbose_name_plural = "Answers"
+        indexes = [
+            # Answers are fetched by question (prefetches, questions_info), active ones only in searches
+            models.Index(fields=["question", "is_active"], name="answer_question_active_idx"),
+        ]
 
     def __str__(self):
         return f"Answer: ID: {self.answer_id} and Question: {self.question.title}"
@@ -76,6 +87,8 @@ class AnswerTag(CoreModel):
 
     # Tag data
     title = models.CharField("Tag Title", max_length=256, blank=False, null=False, unique=True)
+    # Maintained by api/core/counters.py
+    answer_count = models.PositiveIntegerField("Answer Count", default=0)
 
     class Meta:
         db_table = "answer_tag"
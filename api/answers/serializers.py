@@ -7,7 +7,7 @@ from rest_framework import serializers
 
 from api.answers.models import Answer, AnswerTag
 from api.core.models import EagerLoadingMixin
-from api.core.serializer import BaseModelSerializer
+from api.core.serializer import BaseModelSerializer, TimedListSerializer
 from users.api.serializers import UserSerializer
 
 LOGGER = logging.getLogger("roon")
@@ -18,9 +18,13 @@ class AnswerTagSerializer(BaseModelSerializer):
     AnswerTag serializer.
     """
 
+    # Counters (api/core/counters.py)
+    answer_count = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = AnswerTag
-        fields = ("tag_id", "title")
+        list_serializer_class = TimedListSerializer
+        fields = ("tag_id", "title", "answer_count")
 
 
 class AnswerSerializer(BaseModelSerializer, EagerLoadingMixin):
@@ -29,13 +33,14 @@ class AnswerSerializer(BaseModelSerializer, EagerLoadingMixin):
     """
 
     # Query Optimizations
-    _SELECT_RELATED_FIELDS = ["question", "owner"]
+    # Only the relations rendered: the question ID is the FK column and the owner is not returned
+    _SELECT_RELATED_FIELDS = []
     _PREFETCH_RELATED_FIELDS = [
         "tags",
     ]
 
     # Related
-    question_id = serializers.CharField(source="question.question_id", allow_null=True, allow_blank=True)
+    question_id = serializers.CharField(allow_null=True, allow_blank=True)
     # owner = UserSerializer(many=False, read_only=True)
 
     # Many-to-Many
@@ -43,6 +48,7 @@ class AnswerSerializer(BaseModelSerializer, EagerLoadingMixin):
 
     class Meta:
         model = Answer
+        list_serializer_class = TimedListSerializer
         fields = (
             # Primary
             "answer_id",
@@ -0,0 +1,19 @@
+"""
+Signals for Answers: maintain Question.answer_count (api/core/counters.py)
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.answers.models import Answer
+from api.core.counters import ANSWER_COUNT
+
+
+@receiver(post_save, sender=Answer)
+def increment_answer_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ANSWER_COUNT.increment(instance.question_id, 1)
+
+
+@receiver(post_delete, sender=Answer)
+def decrement_answer_count(sender, instance, **kwargs):
+    ANSWER_COUNT.increment(instance.question_id, -1)
@@ -0,0 +1,20 @@
+from factory import Faker, Sequence, SubFactory
+from factory.django import DjangoModelFactory
+
+from api.answers.models import Answer, AnswerTag
+from api.questions.tests.factories import QuestionFactory
+
+
+class AnswerTagFactory(DjangoModelFactory):
+    title = Sequence(lambda n: f"tag {n}")
+
+    class Meta:
+        model = AnswerTag
+
+
+class AnswerFactory(DjangoModelFactory):
+    description = Faker("paragraph")
+    question = SubFactory(QuestionFactory)
+
+    class Meta:
+        model = Answer
@@ -0,0 +1,41 @@
+"""
+Tests for answers_search
+"""
+import pytest
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import status
+
+from api.answers.tests.factories import AnswerFactory, AnswerTagFactory
+from api.core.query_instrumentation import record_queries
+from api.questions.tests.factories import QuestionFactory
+
+
+@pytest.mark.django_db
+def test_answers_search(api_client):
+    """
+    Ensure answers are searched, paginated and serialized without their question, within the budget
+    """
+    question = QuestionFactory()
+    tag = AnswerTagFactory()
+    for description in ("Rest after surgery", "Eat well", "Rest and sleep"):
+        AnswerFactory(question=question, description=description).tags.add(tag)
+    AnswerFactory(description="Rest at home")  # Other question
+    AnswerFactory(question=question, description="Rest inactive", is_active=False)
+
+    with record_queries() as stats:
+        response = api_client.get(
+            reverse("answers:search"),
+            {"description": "Rest", "question_id": "=%s" % question.question_id, "order_by": "description"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [answer["description"] for answer in response.data["answers"]] == ["Rest after surgery", "Rest and sleep"]
+    assert response.data["answers"][0]["question_id"] == str(question.question_id)
+    assert response.data["answers"][0]["tags"][0]["title"] == tag.title
+    assert response.data["pagination_info"]["total_count"] == 2
+    assert stats.count <= settings.QUERY_BUDGETS["answers:search"]
+
+    response = api_client.get(reverse("answers:search"), {"per_page": 2, "count": "false"})
+    assert len(response.data["answers"]) == 2
+    assert response.data["pagination_info"]["has_next"]
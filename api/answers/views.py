@@ -6,6 +6,9 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from api.answers.models import Answer
+from api.answers.serializers import AnswerSerializer
+from api.core.search import paginated_search
 from api.core.view_exception_handler import view_exception_handling
 
 LOGGER = logging.getLogger("roon")
@@ -80,10 +83,29 @@ def answers_search(request):
     """
     Please read documentation carefully.
 
-    ### Search for an Answer ###
+    ### Search for Answers ###
 
-    Search information related to an **Answer** .
+    Search information related to an **Answer**, without the nested payload of its Question.
 
-    ### NOT IMPLEMENTED ###
+    Same search, sort and pagination parameters as `questions_search`, Ex:
+
+        - ?description=$tumor&question_id==<question_id> (`=` prefix: exact match)
+        - ?created_at_date_start=2020-01-01T00:00:00&order_by=-created_at
+        - page, per_page (default 1, 100), or cursor for keyset pagination
+        - count=false, to skip the total_count
+        - ids_only=true, to only return the `answer_ids`
+
+    ---
+    ** VERSION **:
+
+        V1
+
+    ** RESPONSE_SERIALIZER **:
+
+        AnswerSerializer
+    ---
     """
-    return Response({}, status.HTTP_200_OK)
+    return Response(
+        paginated_search(Answer.active_objects.all(), request.query_params, AnswerSerializer, "answers"),
+        status.HTTP_200_OK,
+    )
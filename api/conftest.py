@@ -1,4 +1,5 @@
 import pytest
+from rest_framework.test import APIClient
 
 from roon_api.users.models import User
 from roon_api.users.tests.factories import UserFactory
@@ -12,3 +13,10 @@ def media_storage(settings, tmpdir):
 @pytest.fixture
 def user(db) -> User:
     return UserFactory()
+
+
+@pytest.fixture
+def api_client(user) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
@@ -0,0 +1,139 @@
+"""
+Async function based views for ASGI deployments
+
+Django REST Framework views are sync only: `async_api_view` is the async counterpart of
+`rest_framework.decorators.api_view`. Authenticators providing `aauthenticate` are awaited on
+the event loop, the others (and all ORM work in the views) run through `sync_to_async`.
+"""
+import asyncio
+import types
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines, with async authentication
+
+    Content negotiation, permissions and throttles are the sync APIView ones, they do not
+    touch the database for the default policies.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Same as APIView.dispatch, awaiting authentication and the handler
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """
+        Same as APIView.initial, with async authentication
+        """
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    @staticmethod
+    async def aperform_authentication(request):
+        """
+        Same as Request._authenticate, awaiting `aauthenticate` when an authenticator has one
+        """
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+
+def async_api_view(http_method_names=None):
+    """
+    Decorator that converts an async function based view into an AsyncAPIView
+
+    Async views are never wrapped in ATOMIC_REQUESTS transactions (Django refuses to), so
+    writes must open their own `transaction.atomic` block inside `sync_to_async`.
+    """
+    http_method_names = ["GET"] if (http_method_names is None) else http_method_names
+
+    def decorator(func):
+        assert asyncio.iscoroutinefunction(func), "@async_api_view expects an `async def` view"
+        assert not isinstance(http_method_names, types.FunctionType), "@async_api_view missing list of HTTP methods"
+
+        WrappedAPIView = type("WrappedAPIView", (AsyncAPIView,), {"__doc__": func.__doc__})
+        WrappedAPIView.http_method_names = [method.lower() for method in set(http_method_names) | {"options"}]
+
+        def handler(self, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        for method in http_method_names:
+            setattr(WrappedAPIView, method.lower(), handler)
+
+        WrappedAPIView.__name__ = func.__name__
+        WrappedAPIView.__module__ = func.__module__
+
+        # Policies set by the rest_framework.decorators (@permission_classes...)
+        for policy in (
+            "renderer_classes",
+            "parser_classes",
+            "authentication_classes",
+            "throttle_classes",
+            "permission_classes",
+            "schema",
+        ):
+            setattr(WrappedAPIView, policy, getattr(func, policy, getattr(APIView, policy)))
+
+        view = WrappedAPIView.as_view()
+
+        # as_view() returns a sync function returning the dispatch coroutine, Django must see a coroutine function
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        update_wrapper(async_view, view)
+        async_view._non_atomic_requests = set(settings.DATABASES)
+        return async_view
+
+    return decorator
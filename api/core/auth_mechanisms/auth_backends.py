@@ -7,23 +7,29 @@ import binascii
 import json
 import logging
 
+import httpx
+import jwt
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.forms import forms
 from rest_framework import exceptions, HTTP_HEADER_ENCODING
 from rest_framework.authentication import get_authorization_header
 from rest_framework_jwt.authentication import JSONWebTokenAuthentication
+from rest_framework_jwt.blacklist.exceptions import MissingToken
 from rest_framework_jwt.settings import api_settings
 
 from api.core.auth_mechanisms.utils import (
+    averify_token_and_get_user,
     verify_token_and_get_user,
     add_token_user_into_request_user,
     send_credentials_and_get_user,
 )
 from api.core.exceptions import Service500FailureException, Service400FailureException
+from api.core.metrics import observe_auth_service
 from api.services.utils import get_from_service
-from api.users.models import PHIUser
+from api.users.models import User
 
 # Setup logger
 LOGGER = logging.getLogger("roon")
@@ -72,13 +78,13 @@ class RemoteMicroserviceAuthentication(ModelBackend):
         """
         This method is used for session auth
 
-        Note: Do Not Change user_id
+        Note: Do Not Change user_id, the Auth Service user_id is stored as the username
         """
 
         try:
-            user = PHIUser.objects.get(user_id=str(user_id))
+            user = User.objects.get(username=str(user_id))
 
-        except PHIUser.DoesNotExist:
+        except User.DoesNotExist:
             message = "The following user could not be found: %s. " "Retrieving user from Auth Service." % user_id
             LOGGER.info(message)
             user = self.get_or_create_user(user_id=user_id)
@@ -96,19 +102,20 @@ class RemoteMicroserviceAuthentication(ModelBackend):
                 assert user_id, "Must supply user_id"
 
                 service_endpoint = JWT_AUTH_URL + "users/info/" + str(user_id)
-                token_user = get_from_service(service_endpoint, None, sudo=True).json_data
+                with observe_auth_service("users_info"):
+                    token_user = get_from_service(service_endpoint, None, sudo=True).json_data
 
             if not token_user:
-                raise PHIUser.DoesNotExist()
+                raise User.DoesNotExist()
 
-            get_params = {"user_id": token_user["user_id"]}
+            get_params = {"username": str(token_user["user_id"])}
             creation_params = {"email": token_user["email"]}
             creation_params.update(get_params)
 
-            user, created = PHIUser.objects.get_or_create(defaults=creation_params, **get_params)
+            user, created = User.objects.get_or_create(defaults=creation_params, **get_params)
             return add_token_user_into_request_user(token_user, user, created=created)
 
-        except (PHIUser.DoesNotExist, Service400FailureException, AssertionError) as err:
+        except (User.DoesNotExist, Service400FailureException, AssertionError) as err:
             err = getattr(err, "raw_message", err)
             message = "The following user could not be found: %s" % user_id
             LOGGER.critical(message + " Reason: {}".format(err))
@@ -175,11 +182,56 @@ class RoonJSONWebTokenAuthentication(JSONWebTokenAuthentication):
         supplied using JWT-based authentication.  Otherwise returns `None`.
         """
 
-        self.retrieved_token = self.get_jwt_value(request)
+        try:
+            self.retrieved_token = self.get_token_from_request(request)
+        except MissingToken:
+            return None
+        if self.retrieved_token is None:
+            return None
         self._request = request
 
         return super().authenticate(request)
 
+    async def aauthenticate(self, request):
+        """
+        Async authenticate for async views, the Auth Service verification does not block the event loop
+        """
+
+        try:
+            token = self.get_token_from_request(request)
+        except MissingToken:
+            return None
+        if token is None:
+            return None
+
+        payload = self.decode_token_payload(token)
+
+        try:
+            token_user = await averify_token_and_get_user(token, payload, request.META)
+
+            # Add attrs from token users to the service users
+            get_or_create_user = sync_to_async(RemoteMicroserviceAuthentication.get_or_create_user)
+            return await get_or_create_user(token_user=token_user), token
+
+        except (httpx.TransportError, Service500FailureException) as err:
+            message = "Sorry, the Auth Service seems to be unavailable. " "Check in with DevOps!"
+            LOGGER.critical(message + " Reason: {}".format(err))
+            raise forms.ValidationError(message)
+
+    @classmethod
+    def decode_token_payload(cls, token):
+        """
+        Decoded token payload, same errors as JSONWebTokenAuthentication.authenticate
+        """
+        try:
+            return cls.jwt_decode_token(token)
+        except jwt.ExpiredSignatureError:
+            raise exceptions.AuthenticationFailed("Token has expired.")
+        except jwt.DecodeError:
+            raise exceptions.AuthenticationFailed("Error decoding token.")
+        except jwt.InvalidTokenError:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
     def authenticate_credentials(self, payload):
         """
         Returns an active users that matches the payload's user_id and email.
@@ -1,21 +1,43 @@
 """
 Override to JWT Token Auth to send requests to the Auth Microservice
 """
+import asyncio
 import logging
+from functools import partial
+from weakref import WeakKeyDictionary
 
+import httpx
 import requests
 from django.conf import settings
+from django.db import transaction
 from django.http import HttpRequest
 from rest_framework import exceptions
 from rest_framework.request import Request
 from rest_framework_jwt.settings import api_settings
 
+from api.core.deadlines import timeout
+from api.core.metrics import observe_auth_service
+
 # Setup logger
 LOGGER = logging.getLogger("roon")
 
 jwt_decode_handler = api_settings.JWT_DECODE_HANDLER
 jwt_auth_url = settings.HF_AUTH_SERVICE_URL
 
+# One pooled async client per event loop (a client's connections are bound to their loop)
+_ASYNC_CLIENTS = WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Shared httpx.AsyncClient of the running event loop, for keep-alive connections to the Services
+    """
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(timeout=settings.HF_SERVICE_TIMEOUT)
+    return client
+
 
 def verify_token_and_get_user(token, decoded_payload, headers):
     """
@@ -29,6 +51,18 @@ def verify_token_and_get_user(token, decoded_payload, headers):
     return get_user_from_token(token)
 
 
+async def averify_token_and_get_user(token, decoded_payload, headers):
+    """
+    Async verify_token_and_get_user, for async views
+    """
+
+    data = {"token": token}
+    headers.update(data)
+    await _ahandle_token_action(data, "verify", headers)
+
+    return get_user_from_token(token)
+
+
 def send_credentials_and_get_user(email, password, headers):
     """
     Obtains a token with the Auth Microservice and returns the payload and nested user attrs.
@@ -48,7 +82,34 @@ def _handle_token_action(data, action, headers):
     endpoint = jwt_auth_url
     endpoint += "tokens/{}/".format(action)
 
-    response = requests.post(endpoint, json=data, headers=get_http_headers(headers))
+    with observe_auth_service(action):
+        response = requests.post(
+            endpoint, json=data, headers=get_http_headers(headers), timeout=timeout(settings.HF_SERVICE_TIMEOUT)
+        )
+
+    return _get_token_response_body(response)
+
+
+async def _ahandle_token_action(data, action, headers):
+    """
+    Async _handle_token_action, the Auth Service call does not block the event loop
+    """
+
+    endpoint = jwt_auth_url
+    endpoint += "tokens/{}/".format(action)
+
+    with observe_auth_service(action):
+        response = await get_async_client().post(
+            endpoint, json=data, headers=get_http_headers(headers), timeout=timeout(settings.HF_SERVICE_TIMEOUT)
+        )
+
+    return _get_token_response_body(response)
+
+
+def _get_token_response_body(response):
+    """
+    Body of a token response of the Auth Service (requests or httpx response)
+    """
     if response.status_code != requests.codes.ok:
         LOGGER.error(response.content)
         raise exceptions.AuthenticationFailed(response.content)
@@ -115,11 +176,16 @@ def add_token_user_into_request_user(token_user, service_user_model, created=Tru
     from the one provided by the token users
     """
     for attr, attr_value in token_user.items():
-        if not created and attr in ["user_id", "email"]:
+        if attr == "user_id" or (not created and attr == "email"):
             continue
 
         if attr == "groups":
-            service_user_model.change_groups([group["name"] for group in token_user["groups"]])
+            names = [group["name"] for group in token_user["groups"]]
+            if created:
+                service_user_model.change_groups(names)
+            elif not service_user_model.has_groups(names):
+                # Group changes of existing users are written by a background task, once the request commits
+                transaction.on_commit(partial(_queue_group_sync, service_user_model.pk, names))
         else:
             try:
                 setattr(service_user_model, attr, attr_value)
@@ -129,6 +195,16 @@ def add_token_user_into_request_user(token_user, service_user_model, created=Tru
     return service_user_model
 
 
+def _queue_group_sync(user_id, names):
+    from api.users.tasks import sync_user_groups
+
+    # The groups are synced again on the next request of the user
+    try:
+        sync_user_groups.delay(user_id, names)
+    except Exception:
+        LOGGER.exception("Could not queue the group sync of user %s", user_id)
+
+
 def create_dummy_request(headers, user):
     """
     Creation of a dummy request object to be used with all emails
@@ -137,9 +213,9 @@ def create_dummy_request(headers, user):
           a `request` object into the task signature
     """
 
-    from phi.users.models import PHIUser
+    from api.users.models import User
 
-    assert isinstance(user, PHIUser)
+    assert isinstance(user, User)
 
     dummy_request = HttpRequest()
     dummy_request.META = headers
@@ -0,0 +1,279 @@
+"""
+Per-process prefix index of question, topic and tag titles, for questions/autocomplete/
+
+The titles are kept in one sorted array of (key, kind, id, title, score) entries, the key being the
+casefolded title. A prefix is the bisect range of the array, ranked by score (answer_count,
+question_count). The top-k of the short prefixes (AUTOCOMPLETE_RANKED_PREFIX_LENGTH), whose ranges
+are the largest, are precomputed; longer prefixes rank the first AUTOCOMPLETE_SCAN_LIMIT matches.
+
+The index is built once per worker (config/gunicorn.py post_worker_init, or the first request)
+and refreshed from `last_modified` every AUTOCOMPLETE_REFRESH_INTERVAL seconds. Transactions
+commit out of order, so each refresh reads again the rows modified AUTOCOMPLETE_REFRESH_OVERLAP
+seconds before the previous one. The entries are loaded by decreasing score until
+AUTOCOMPLETE_MEMORY_BUDGET (bytes) is reached.
+
+Counter updates (F() increments) do not touch `last_modified`: scores are refreshed with their
+rows' other changes, or on the next build.
+"""
+import heapq
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+
+from api.answers.models import AnswerTag
+from api.questions.models import Question
+from api.topics.models import QuestionTopic
+
+LOGGER = logging.getLogger("roon")
+
+
+class Source(object):
+    """
+    Titles of `model` indexed as `kind`, ranked by `score_field`
+    """
+
+    def __init__(self, kind, model, score_field):
+        self.kind = kind
+        self.model = model
+        self.score_field = score_field
+
+    def rows(self, since=None):
+        """
+        (id, title, score, is_active, last_modified) of the rows modified since `since` (all active rows when None)
+        """
+        qs = self.model.objects.all() if since else self.model.active_objects.all()
+        if since:
+            qs = qs.filter(last_modified__gte=since)
+        return qs.order_by("-" + self.score_field).values_list(
+            "pk", "title", self.score_field, "is_active", "last_modified"
+        )
+
+
+SOURCES = (
+    Source("question", Question, "answer_count"),
+    Source("topic", QuestionTopic, "question_count"),
+    Source("tag", AnswerTag, "answer_count"),
+)
+
+
+def _entry_size(entry, ranked_prefix_length):
+    """
+    Approximate bytes of an entry: the tuple, its strings (kind is shared) and its references in the prefix top-k
+    """
+    strings = sys.getsizeof(entry[0]) + sys.getsizeof(entry[2]) + sys.getsizeof(entry[3])
+    return sys.getsizeof(entry) + strings + 8 * (ranked_prefix_length + 1)
+
+
+def _rank_key(entry):
+    # Highest score first, then alphabetical
+    return -entry[4], entry
+
+
+class PrefixIndex(object):
+    """
+    Sorted array of (key, kind, id, title, score) with precomputed top-k of the short prefixes
+    """
+
+    def __init__(self, top_k=None, ranked_prefix_length=None, scan_limit=None, memory_budget=None):
+        self.top_k = top_k or settings.AUTOCOMPLETE_TOP_K
+        self.ranked_prefix_length = ranked_prefix_length or settings.AUTOCOMPLETE_RANKED_PREFIX_LENGTH
+        self.scan_limit = scan_limit or settings.AUTOCOMPLETE_SCAN_LIMIT
+        self.memory_budget = memory_budget or settings.AUTOCOMPLETE_MEMORY_BUDGET
+
+        self.entries = []
+        self.by_id = {}
+        self.ranked = {}
+        self.memory = 0
+        self.truncated = False
+        self.refreshed_at = {}
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def key(text):
+        return " ".join(text.casefold().split())
+
+    def build(self, sources=SOURCES):
+        """
+        Load every active row of the sources, by decreasing score within the memory budget
+        """
+        entries, by_id, memory = [], {}, 0
+        # Every source, even without rows yet, is refreshed from the start of the build
+        refreshed_at = {source.kind: timezone.now() for source in sources}
+        rows = []
+        for source in sources:
+            for pk, title, score, _, _ in source.rows():
+                rows.append((score, source.kind, str(pk), title))
+
+        truncated = False
+        for score, kind, pk, title in sorted(rows, key=lambda row: -row[0]):
+            entry = (self.key(title), kind, pk, title, score)
+            size = _entry_size(entry, self.ranked_prefix_length)
+            if memory + size > self.memory_budget:
+                truncated = True
+                break
+            entries.append(entry)
+            by_id[(kind, pk)] = entry
+            memory += size
+        entries.sort()
+
+        with self.lock:
+            self.entries, self.by_id, self.memory, self.truncated = entries, by_id, memory, truncated
+            self.refreshed_at = refreshed_at
+            self.ranked = self._rank_prefixes(entries)
+
+        if truncated:
+            LOGGER.warning("Autocomplete index reached its memory budget (%s bytes)", self.memory_budget)
+        return self
+
+    def refresh(self, sources=SOURCES):
+        """
+        Apply the rows modified since the last build/refresh (and its overlap), returns the number of rows applied
+        """
+        changed = []
+        overlap = timedelta(seconds=settings.AUTOCOMPLETE_REFRESH_OVERLAP)
+        for source in sources:
+            since = self.refreshed_at.get(source.kind)
+            if since is None:
+                continue
+            started_at = timezone.now()
+            for pk, title, score, is_active, _ in source.rows(since=since - overlap):
+                changed.append((source.kind, str(pk), title, score, is_active))
+            self.refreshed_at[source.kind] = started_at
+
+        if changed:
+            with self.lock:
+                for kind, pk, title, score, is_active in changed:
+                    self._remove((kind, pk))
+                    if is_active:
+                        self._insert((self.key(title), kind, pk, title, score))
+        return len(changed)
+
+    def search(self, text, kinds=None, limit=None):
+        """
+        Top `limit` entries (by score) whose key starts with `text`, optionally only of `kinds`
+        """
+        prefix, limit = self.key(text), min(limit or self.top_k, self.top_k)
+        if not prefix:
+            return []
+
+        with self.lock:
+            if kinds is None and len(prefix) <= self.ranked_prefix_length:
+                return self.ranked.get(prefix, [])[:limit]
+            return self._rank(prefix, kinds=kinds, limit=limit, scan_limit=self.scan_limit)
+
+    def _rank(self, prefix, kinds=None, limit=None, scan_limit=None):
+        """
+        Top entries of `prefix`, among its first `scan_limit` matches (all when None)
+        """
+        # The prefix range is between the prefix and the prefix with its last character incremented
+        start = bisect_left(self.entries, (prefix,))
+        end = bisect_left(self.entries, (prefix[:-1] + chr(ord(prefix[-1]) + 1),), lo=start)
+        matches = self.entries[start:min(end, start + scan_limit) if scan_limit else end]
+        if kinds is not None:
+            matches = [entry for entry in matches if entry[1] in kinds]
+        # Stable: alphabetical order between equal scores, as _rank_key
+        return heapq.nlargest(limit or self.top_k, matches, key=itemgetter(4))
+
+    def _rank_prefixes(self, entries):
+        """
+        {prefix: top-k entries} of every prefix up to ranked_prefix_length characters
+        """
+        heaps = {}
+        for position, entry in enumerate(entries):
+            for length in range(1, min(len(entry[0]), self.ranked_prefix_length) + 1):
+                heap = heaps.setdefault(entry[0][:length], [])
+                # (score, -position) keeps the first entry of equal scores
+                item = (entry[4], -position, entry)
+                if len(heap) < self.top_k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        return {prefix: [item[2] for item in sorted(heap, reverse=True)] for prefix, heap in heaps.items()}
+
+    def _prefixes(self, key):
+        return [key[:length] for length in range(1, min(len(key), self.ranked_prefix_length) + 1)]
+
+    def _remove(self, entry_id):
+        entry = self.by_id.pop(entry_id, None)
+        if entry is None:
+            return
+        position = bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+        self.memory -= _entry_size(entry, self.ranked_prefix_length)
+
+        # Rank again the prefixes whose top-k held the entry
+        for prefix in self._prefixes(entry[0]):
+            if entry in self.ranked.get(prefix, ()):
+                self.ranked[prefix] = self._rank(prefix)
+                if not self.ranked[prefix]:
+                    del self.ranked[prefix]
+
+    def _insert(self, entry):
+        size = _entry_size(entry, self.ranked_prefix_length)
+        if self.memory + size > self.memory_budget:
+            self.truncated = True
+            return
+        insort(self.entries, entry)
+        self.by_id[(entry[1], entry[2])] = entry
+        self.memory += size
+
+        for prefix in self._prefixes(entry[0]):
+            top = self.ranked.setdefault(prefix, [])
+            if len(top) < self.top_k or entry[4] > top[-1][4]:
+                top.append(entry)
+                top.sort(key=_rank_key)
+                del top[self.top_k:]
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+_last_refresh = 0.0
+
+
+def get_index():
+    """
+    The process' index, built on first use and refreshed every AUTOCOMPLETE_REFRESH_INTERVAL seconds
+    """
+    global _last_refresh
+
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            build_index()
+        elif time.monotonic() - _last_refresh >= settings.AUTOCOMPLETE_REFRESH_INTERVAL:
+            _last_refresh = time.monotonic()
+            _INDEX.refresh()
+    return _INDEX
+
+
+def build_index():
+    """
+    Build the process' index (worker start), returns it
+    """
+    global _INDEX, _last_refresh
+
+    start = time.perf_counter()
+    index = PrefixIndex().build()
+    _INDEX, _last_refresh = index, time.monotonic()
+    LOGGER.info(
+        "Built the autocomplete index in %.3fms: %s entries, %s bytes",
+        (time.perf_counter() - start) * 1000,
+        len(index.entries),
+        index.memory,
+    )
+    return index
+
+
+def reset_index():
+    """
+    Drop the process' index, the next get_index() builds it again
+    """
+    global _INDEX
+    _INDEX = None
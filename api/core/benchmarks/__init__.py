@@ -0,0 +1,22 @@
+"""
+Performance benchmark suite for the API hot paths
+
+Benchmarks are registered with `@benchmark(name)` in each app's `benchmarks` module and
+run against a seeded synthetic corpus with `python manage.py run_benchmarks`.
+"""
+from importlib import import_module
+
+BENCHMARK_MODULES = [
+    "api.core.benchmarks.keys",
+    "api.answers.benchmarks",
+    "api.questions.benchmarks",
+    "api.topics.benchmarks",
+]
+
+
+def load_benchmarks():
+    """
+    Import every benchmark module so their benchmarks are registered
+    """
+    for module in BENCHMARK_MODULES:
+        import_module(module)
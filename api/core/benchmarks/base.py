@@ -0,0 +1,135 @@
+"""
+Benchmark registry, runner and regression check
+"""
+import json
+import logging
+import platform
+import statistics
+import time
+from datetime import datetime
+
+from django.db import connection
+
+LOGGER = logging.getLogger("roon")
+
+BENCHMARKS = {}
+
+
+def benchmark(name, rounds=None):
+    """
+    Register a benchmark function under `name`
+
+    The function receives the seeded Corpus (api.core.benchmarks.corpus) and runs ONE iteration of the measured work.
+    """
+
+    def decorate(func):
+        assert name not in BENCHMARKS, "Benchmark %s is already registered" % name
+        func.benchmark_name = name
+        func.benchmark_rounds = rounds
+        BENCHMARKS[name] = func
+        return func
+
+    return decorate
+
+
+class BenchmarkResult(object):
+    """
+    Timings (ms) of one benchmark
+    """
+
+    def __init__(self, name, timings):
+        self.name = name
+        self.timings = sorted(timings)
+
+    @property
+    def summary(self):
+        timings = self.timings
+        return {
+            "rounds": len(timings),
+            "min": round(timings[0], 4),
+            "max": round(timings[-1], 4),
+            "mean": round(statistics.fmean(timings), 4),
+            "median": round(statistics.median(timings), 4),
+            "p95": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+            "stdev": round(statistics.pstdev(timings), 4),
+        }
+
+
+def run_benchmark(func, context, rounds=20, warmup=2):
+    """
+    Run a single benchmark and return its BenchmarkResult
+    """
+    rounds = func.benchmark_rounds or rounds
+
+    for _ in range(warmup):
+        func(context)
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(context)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return BenchmarkResult(func.benchmark_name, timings)
+
+
+def run_benchmarks(context, names=None, rounds=20, warmup=2):
+    """
+    Run the registered benchmarks (all, or those whose name starts with one of `names`)
+    """
+    results = {}
+    for name, func in sorted(BENCHMARKS.items()):
+        if names and not any(name.startswith(selected) for selected in names):
+            continue
+        LOGGER.info("Running benchmark %s", name)
+        results[name] = run_benchmark(func, context, rounds=rounds, warmup=warmup).summary
+    return results
+
+
+def build_report(results, corpus=None):
+    """
+    JSON serializable report of benchmark results and the environment they ran in
+    """
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "database": connection.vendor,
+            "corpus": corpus or {},
+        },
+        "results": results,
+    }
+
+
+def save_report(report, path):
+    with open(path, "w") as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+
+
+def load_report(path):
+    with open(path) as report_file:
+        return json.load(report_file)
+
+
+def find_regressions(results, baseline, threshold=0.2, metric="median"):
+    """
+    Benchmarks whose `metric` is more than `threshold` (fraction) slower than the baseline
+
+    Returns {name: {"baseline": ms, "current": ms, "change": fraction}}
+    """
+    baseline_results = baseline.get("results", baseline)
+
+    regressions = {}
+    for name, summary in results.items():
+        if name not in baseline_results:
+            continue
+        previous = baseline_results[name][metric]
+        current = summary[metric]
+        if previous and current > previous * (1 + threshold):
+            regressions[name] = {
+                "baseline": previous,
+                "current": current,
+                "change": round(current / previous - 1, 4),
+            }
+    return regressions
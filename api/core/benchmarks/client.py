@@ -0,0 +1,29 @@
+"""
+Helpers to call API views directly from benchmarks
+"""
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+FACTORY = APIRequestFactory()
+
+
+def _call(view, request, user, **kwargs):
+    force_authenticate(request, user=user)
+    response = view(request, **kwargs)
+    response.render()
+    assert response.status_code == status.HTTP_200_OK, response.data
+    return response
+
+
+def get(view, user, params=None, **kwargs):
+    """
+    Authenticated GET on a view function, returns the rendered response
+    """
+    return _call(view, FACTORY.get("/", params), user, **kwargs)
+
+
+def post(view, user, data, **kwargs):
+    """
+    Authenticated JSON POST on a view function, returns the rendered response
+    """
+    return _call(view, FACTORY.post("/", data, format="json"), user, **kwargs)
@@ -0,0 +1,168 @@
+"""
+Synthetic, reproducible corpora of questions with answers, tags and topics
+"""
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from django.db import transaction
+
+from api.answers.models import Answer, AnswerTag
+from api.core.counters import COUNTERS
+from api.questions.models import Question
+from api.topics.models import QuestionTopic
+from api.users.models import User
+
+LOGGER = logging.getLogger("roon")
+
+WORDS = (
+    "glioblastoma treatment surgery radiation chemotherapy seizure fatigue nausea caregiver clinical trial tumor "
+    "biopsy steroids headache memory driving diet exercise sleep recovery insurance scan MRI symptom dose side "
+    "effect pain support"
+).split()
+QUESTION_TEMPLATES = [
+    "How does {0} affect {1}?",
+    "What is the role of {0} in {1}?",
+    "When should I ask about {0} and {1}?",
+    "Why do I need {0} after {1}?",
+    "Is {0} normal during {1}?",
+]
+# Questions are spread over this many days before the corpus' reference date
+CORPUS_DAYS = 3 * 365
+CORPUS_REFERENCE_DATE = datetime(2023, 1, 1)
+
+
+class Corpus(object):
+    """
+    Description of a seeded corpus, also used as the benchmark context
+    """
+
+    def __init__(self, questions, answers_per_question, topics, tags, seed):
+        self.questions = questions
+        self.answers_per_question = answers_per_question
+        self.topics = topics
+        self.tags = tags
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        # Samples used by the benchmarks, loaded after seeding
+        self.question_ids = []
+        self.topic_ids = []
+        self.user = None
+
+        # Data prepared once by benchmarks, outside of their timings
+        self.cache = {}
+
+    def as_dict(self):
+        return {
+            "questions": self.questions,
+            "answers_per_question": self.answers_per_question,
+            "topics": self.topics,
+            "tags": self.tags,
+            "seed": self.seed,
+        }
+
+    def load_samples(self, sample_size=100):
+        """
+        Sample question and topic IDs to request in the benchmarks
+        """
+        self.question_ids = list(Question.active_objects.values_list("question_id", flat=True)[:sample_size])
+        self.topic_ids = list(QuestionTopic.active_objects.values_list("topic_id", flat=True)[:sample_size])
+        return self
+
+    def random_question_id(self):
+        return self.random.choice(self.question_ids)
+
+    def random_topic_id(self):
+        return self.random.choice(self.topic_ids)
+
+
+def _title(rnd):
+    return rnd.choice(QUESTION_TEMPLATES).format(rnd.choice(WORDS), rnd.choice(WORDS))
+
+
+def seed_corpus(questions=10000, answers_per_question=2, topics=50, tags=200, seed=42, batch_size=5000):
+    """
+    Bulk insert a synthetic corpus, in batches so 1M questions fit in memory
+
+    Every question has 1-2 topics and `answers_per_question` answers with 2 tags each.
+    The same arguments always produce the same corpus.
+    """
+    corpus = Corpus(questions, answers_per_question, topics, tags, seed)
+    rnd = random.Random(seed)
+
+    with transaction.atomic():
+        topic_objs = QuestionTopic.objects.bulk_create(
+            [QuestionTopic(topic_id=uuid.UUID(int=rnd.getrandbits(128)), title="Topic %s" % i) for i in range(topics)]
+        )
+        tag_objs = AnswerTag.objects.bulk_create(
+            [AnswerTag(tag_id=uuid.UUID(int=rnd.getrandbits(128)), title="tag %s" % i) for i in range(tags)]
+        )
+
+    QuestionTopics = Question.topics.through
+    AnswerTags = Answer.tags.through
+
+    for start in range(0, questions, batch_size):
+        question_objs, answer_objs, question_topics, answer_tags = [], [], [], []
+
+        for _ in range(start, min(start + batch_size, questions)):
+            created_at = CORPUS_REFERENCE_DATE - timedelta(seconds=rnd.randrange(CORPUS_DAYS * 24 * 3600))
+            question = Question(
+                question_id=uuid.UUID(int=rnd.getrandbits(128)),
+                title=_title(rnd),
+                context=" ".join(rnd.choices(WORDS, k=12)),
+                created_at=created_at,
+                last_modified=created_at,
+            )
+            question_objs.append(question)
+
+            for topic in rnd.sample(topic_objs, rnd.randint(1, 2)):
+                question_topics.append(
+                    QuestionTopics(question_id=question.question_id, questiontopic_id=topic.topic_id)
+                )
+
+            for _ in range(answers_per_question):
+                answer = Answer(
+                    answer_id=uuid.UUID(int=rnd.getrandbits(128)),
+                    description=" ".join(rnd.choices(WORDS, k=40)),
+                    question_id=question.question_id,
+                    created_at=created_at,
+                    last_modified=created_at,
+                )
+                answer_objs.append(answer)
+                for tag in rnd.sample(tag_objs, 2):
+                    answer_tags.append(AnswerTags(answer_id=answer.answer_id, answertag_id=tag.tag_id))
+
+        with transaction.atomic():
+            Question.objects.bulk_create(question_objs)
+            Answer.objects.bulk_create(answer_objs)
+            QuestionTopics.objects.bulk_create(question_topics)
+            AnswerTags.objects.bulk_create(answer_tags)
+
+        LOGGER.info("Seeded %s/%s questions", min(start + batch_size, questions), questions)
+
+    # bulk_create sends no signals
+    with transaction.atomic():
+        for counter in COUNTERS:
+            counter.recount()
+
+    return corpus
+
+
+def prepare_corpus(questions=10000, answers_per_question=2, topics=50, tags=200, seed=42, keepdb=False):
+    """
+    Seed the corpus, unless a kept database already holds it, and load its samples and user
+    """
+    corpus_options = dict(
+        questions=questions, answers_per_question=answers_per_question, topics=topics, tags=tags, seed=seed
+    )
+
+    if keepdb and Question.objects.count() >= questions:
+        LOGGER.info("Reusing the seeded corpus of the kept test database")
+        corpus = Corpus(**corpus_options)
+    else:
+        corpus = seed_corpus(**corpus_options)
+
+    corpus.user, _ = User.objects.get_or_create(username="benchmark", defaults={"email": "benchmark@roon.com"})
+    return corpus.load_samples()
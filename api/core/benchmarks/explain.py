@@ -0,0 +1,151 @@
+"""
+EXPLAIN the queries of the API query shapes and report their index usage
+
+Every registered benchmark (api.core.benchmarks) is one API query shape: it is run once
+while its SELECTs are captured, then each distinct query is explained on the same database.
+"""
+import json
+import logging
+import re
+
+from django.db import connection
+
+from api.core.benchmarks.base import BENCHMARKS
+from api.core.query_instrumentation import QueryStats
+
+LOGGER = logging.getLogger("roon")
+
+# PostgreSQL plan nodes reading through an index
+POSTGRESQL_INDEX_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+# SQLite: "SCAN question", "SEARCH answer USING INDEX answer_question_active_idx (question_id=?)"
+SQLITE_PLAN_RE = re.compile(
+    r"^(?P<op>SCAN|SEARCH) (?:TABLE )?(?P<table>\S+)(?: AS \S+)?"
+    r"(?: USING (?:COVERING )?(?:INDEX (?P<index>\S+)|(?P<pk>INTEGER PRIMARY KEY|PRIMARY KEY)))?"
+)
+
+
+class QueryPlan(object):
+    """
+    Index usage of one explained query
+    """
+
+    def __init__(self, sql, indexes=None, full_scans=None, sorts=False):
+        self.sql = sql
+        self.indexes = sorted(set(indexes or ()))
+        self.full_scans = sorted(set(full_scans or ()))
+        # The rows are sorted after being read, no index provides the ORDER BY
+        self.sorts = sorts
+
+    @property
+    def uses_index(self):
+        return bool(self.indexes) and not self.full_scans
+
+    def as_dict(self):
+        return {
+            "shape": QueryStats.shape(self.sql),
+            "uses_index": self.uses_index,
+            "indexes": self.indexes,
+            "full_scans": self.full_scans,
+            "sorts": self.sorts,
+        }
+
+
+def parse_postgresql_plan(sql, plan):
+    """
+    QueryPlan of an `EXPLAIN (FORMAT JSON)` result
+    """
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    indexes, full_scans, sorts = [], [], False
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get("Plans", ()))
+
+        if node["Node Type"] in POSTGRESQL_INDEX_NODES:
+            indexes.append(node["Index Name"])
+        elif node["Node Type"] == "Seq Scan":
+            full_scans.append(node["Relation Name"])
+        elif node["Node Type"] in ("Sort", "Incremental Sort"):
+            sorts = True
+
+    return QueryPlan(sql, indexes, full_scans, sorts)
+
+
+def parse_sqlite_plan(sql, rows):
+    """
+    QueryPlan of `EXPLAIN QUERY PLAN` rows (id, parent, notused, detail)
+    """
+    indexes, full_scans, sorts = [], [], False
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail:
+            sorts = True
+            continue
+
+        match = SQLITE_PLAN_RE.match(detail)
+        if match is None:
+            continue
+        if match.group("index"):
+            indexes.append(match.group("index"))
+        elif match.group("pk"):
+            indexes.append("%s (%s)" % (match.group("table"), match.group("pk").lower()))
+        elif match.group("op") == "SCAN":
+            full_scans.append(match.group("table"))
+
+    return QueryPlan(sql, indexes, full_scans, sorts)
+
+
+def explain_query(sql, params, using=connection):
+    """
+    EXPLAIN (without running) a query on the `using` connection
+    """
+    with using.cursor() as cursor:
+        if using.vendor == "postgresql":
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            return parse_postgresql_plan(sql, cursor.fetchone()[0])
+        if using.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return parse_sqlite_plan(sql, cursor.fetchall())
+
+    raise NotImplementedError("EXPLAIN is not supported on %s" % using.vendor)
+
+
+def capture_selects(func, context, using=connection):
+    """
+    Run `func(context)` and return the distinct (sql, params) of the SELECTs it executed
+    """
+    queries = {}
+
+    def capture(execute, sql, params, many, execution_context):
+        if not many and sql.lstrip().upper().startswith("SELECT"):
+            queries.setdefault(QueryStats.shape(sql), (sql, params))
+        return execute(sql, params, many, execution_context)
+
+    with using.execute_wrapper(capture):
+        func(context)
+
+    return list(queries.values())
+
+
+def explain_benchmarks(context, names=None, using=connection):
+    """
+    Explain the SELECTs of the registered benchmarks (all, or those whose name starts with one of `names`)
+
+    Returns {benchmark name: [QueryPlan.as_dict()]}
+    """
+    if using.vendor == "postgresql":
+        # Up to date statistics, the planner scans freshly seeded tables otherwise
+        with using.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    plans = {}
+    for name, func in sorted(BENCHMARKS.items()):
+        if names and not any(name.startswith(selected) for selected in names):
+            continue
+        LOGGER.info("Explaining benchmark %s", name)
+        plans[name] = [
+            explain_query(sql, params, using=using).as_dict() for sql, params in capture_selects(func, context, using)
+        ]
+    return plans
@@ -0,0 +1,103 @@
+"""
+Benchmarks of random (uuid4) vs time ordered (uuid7) primary keys
+
+Two throwaway tables, outside of every app and migration, with the same rows:
+ * RandomKeyRow: uuid4 UUIDField PK (char(32) on SQLite) and the `created_at` index ordering needs
+ * TimeOrderedKeyRow: TimeOrderedUUIDField PK (16 bytes), the PK order is the creation order
+"""
+import uuid
+from datetime import datetime
+
+from django.apps.registry import Apps
+from django.db import connection, models
+
+from api.core.benchmarks.base import benchmark
+from api.core.fields import TimeOrderedUUIDField
+
+KEYS_APPS = Apps(installed_apps=())
+BATCH_SIZE = 1000
+
+
+class RandomKeyRow(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    created_at = models.DateTimeField(default=datetime.utcnow)
+    title = models.CharField(max_length=256)
+
+    class Meta:
+        apps = KEYS_APPS
+        app_label = "benchmarks"
+        db_table = "benchmark_random_key"
+        indexes = [models.Index(fields=["-created_at"], name="benchmark_random_created_idx")]
+
+
+class TimeOrderedKeyRow(models.Model):
+    id = TimeOrderedUUIDField(primary_key=True)
+    created_at = models.DateTimeField(default=datetime.utcnow)
+    title = models.CharField(max_length=256)
+
+    class Meta:
+        apps = KEYS_APPS
+        app_label = "benchmarks"
+        db_table = "benchmark_time_ordered_key"
+
+
+KEY_MODELS = (RandomKeyRow, TimeOrderedKeyRow)
+
+
+def create_key_tables(using=connection):
+    """
+    Create the benchmark tables if missing
+
+    The SQL is run directly: the SQLite schema editor refuses to run inside the transaction of a test.
+    """
+    editor = using.schema_editor()
+    existing = set(using.introspection.table_names())
+    with using.cursor() as cursor:
+        for model in KEY_MODELS:
+            if model._meta.db_table in existing:
+                continue
+            sql, params = editor.table_sql(model)
+            cursor.execute(sql, params)
+            for index in model._meta.indexes:
+                cursor.execute(str(index.create_sql(model, editor)))
+
+
+def index_size(model, using=connection):
+    """
+    Bytes used by every index of the model's table (including the PK index)
+    """
+    with using.cursor() as cursor:
+        if using.vendor == "postgresql":
+            cursor.execute("SELECT pg_indexes_size(%s::regclass)", [model._meta.db_table])
+            return cursor.fetchone()[0]
+        if using.vendor == "sqlite":
+            cursor.execute(
+                "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN "
+                "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+                [model._meta.db_table],
+            )
+            return cursor.fetchone()[0]
+
+    raise NotImplementedError("Index size is not supported on %s" % using.vendor)
+
+
+def insert_rows(model, rows=BATCH_SIZE):
+    model.objects.bulk_create([model(title="Benchmark row %s" % i) for i in range(rows)])
+
+
+def _prepare(corpus):
+    if "keys.tables" not in corpus.cache:
+        create_key_tables()
+        corpus.cache["keys.tables"] = True
+
+
+@benchmark("keys_insert.uuid4")
+def insert_uuid4(corpus):
+    _prepare(corpus)
+    insert_rows(RandomKeyRow)
+
+
+@benchmark("keys_insert.uuid7")
+def insert_uuid7(corpus):
+    _prepare(corpus)
+    insert_rows(TimeOrderedKeyRow)
@@ -0,0 +1,106 @@
+"""
+Denormalized counters (Question.answer_count, QuestionTopic.question_count, AnswerTag.answer_count)
+
+The counters are kept up to date:
+ * answers created/deleted: F() increments of Question.answer_count, in the transaction of the write
+   (api/answers/signals.py)
+ * M2M changes and deletes (whose through rows are removed without m2m_changed): the affected
+   counters are recounted from the through table by the outbox drain (api/outbox/drain.py),
+   off the write path. A recount is idempotent, an event can be delivered twice.
+
+Bulk writes (bulk_create, QuerySet.update, raw SQL) send no signals, `reconcile_counters`
+(python manage.py reconcile_counters) recounts the drifted rows.
+"""
+import logging
+
+from django.db import connection
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from api.answers.models import Answer, AnswerTag
+from api.core.utils import chunked
+from api.questions.models import Question
+from api.topics.models import QuestionTopic
+
+LOGGER = logging.getLogger("roon")
+
+
+class Counter(object):
+    """
+    `model.field` counts the rows of `count_model` whose `fk_name` points at it
+    """
+
+    def __init__(self, name, model, field, count_model, fk_name):
+        self.name = name
+        self.model = model
+        self.field = field
+        self.count_model = count_model
+        self.fk_name = fk_name
+
+    def actual_count(self):
+        """
+        Subquery counting the rows of count_model of the outer row
+        """
+        counts = (
+            self.count_model.objects.filter(**{self.fk_name: OuterRef("pk")})
+            .order_by()
+            .values(self.fk_name)
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        return Coalesce(Subquery(counts), Value(0))
+
+    def increment(self, pk, delta):
+        """
+        Atomically add `delta` to the counter of one row
+        """
+        self.model.objects.filter(pk=pk).update(**{self.field: F(self.field) + delta})
+
+    def recount(self, pks=None):
+        """
+        Recount the rows in `pks` (all rows when None), returns the number of rows updated
+        """
+        qs = self.model.objects.all()
+        if pks is None:
+            return qs.update(**{self.field: self.actual_count()})
+
+        # Chunks within the variable limit of the database (999 on SQLite)
+        return sum(
+            qs.filter(pk__in=chunk).update(**{self.field: self.actual_count()})
+            for chunk in chunked(pks, connection.features.max_query_params)
+        )
+
+    def drifted(self):
+        """
+        PKs of the rows whose counter is not their actual count
+        """
+        return list(
+            self.model.objects.annotate(_actual_count=self.actual_count())
+            .exclude(**{self.field: F("_actual_count")})
+            .values_list("pk", flat=True)
+        )
+
+
+ANSWER_COUNT = Counter("question.answer_count", Question, "answer_count", Answer, "question")
+QUESTION_COUNT = Counter(
+    "topic.question_count", QuestionTopic, "question_count", Question.topics.through, "questiontopic"
+)
+TAG_ANSWER_COUNT = Counter("tag.answer_count", AnswerTag, "answer_count", Answer.tags.through, "answertag")
+
+COUNTERS = (ANSWER_COUNT, QUESTION_COUNT, TAG_ANSWER_COUNT)
+
+
+def reconcile_counters(fix=True):
+    """
+    Find (and recount when `fix`) the drifted rows of every counter
+
+    Returns {counter name: number of drifted rows}
+    """
+    drifted = {}
+    for counter in COUNTERS:
+        pks = counter.drifted()
+        drifted[counter.name] = len(pks)
+        if pks and fix:
+            counter.recount(pks)
+            LOGGER.info("Recounted %s rows of %s", len(pks), counter.name)
+    return drifted
@@ -1,58 +1,113 @@
 """
 Data anonymizer class.
 """
-import copy
+from functools import lru_cache
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
 
 class DataAnonymizer(object):
     """
     Class anonymizes value of keys matching the predefined field list
+
+    The field list (and every prefix + field combination) is compiled once into a
+    frozenset, so instances are immutable and safe to share between requests.
     """
 
-    FIELD_PREFIX = []
-    ANONYMIZE_FIELDS = []
+    FIELD_PREFIX = ()
+    ANONYMIZE_FIELDS = ()
     ANONYMIZE_STRING = "Anonymized Data"
 
     def __init__(self, anonymize_fields=None, field_prefix=None, anonymize_value=None):
         """
         Constructor
         """
-        self.anonymize_fields = anonymize_fields if anonymize_fields else self.ANONYMIZE_FIELDS
-        self.field_prefix = field_prefix if field_prefix else self.FIELD_PREFIX
-        self.anonymize_value = anonymize_value if anonymize_value else self.ANONYMIZE_STRING
+        fields = tuple(anonymize_fields if anonymize_fields else self.ANONYMIZE_FIELDS)
+        prefixes = tuple(field_prefix if field_prefix else self.FIELD_PREFIX)
 
-        to_anonymize = [prefix + field for field in self.anonymize_fields for prefix in self.field_prefix]
-        self.anonymize_fields.extend(to_anonymize)
+        self.anonymize_value = anonymize_value if anonymize_value else self.ANONYMIZE_STRING
+        self.field_prefix = frozenset(prefixes)
+        self.anonymize_fields = frozenset(fields).union(prefix + field for field in fields for prefix in prefixes)
 
     def run(self, data):
         """
-        Method to perform anonymization. Method returns a new dict. The original
-            'data' is not changed.
+        Method to perform anonymization. Method returns a new dict when a value
+            is anonymized. The original 'data' is not changed: only the branches
+            that change are copied, untouched branches are shared.
+        """
+        return self._anonymize(data)
+
+    def _anonymize(self, data):
+        """
+        Copy-on-write anonymization of dicts and lists (of dicts)
         """
-        data = copy.deepcopy(data)
+        if isinstance(data, dict):
+            changed = None
+            for key, value in data.items():
+                # A matching key is anonymized whatever its value (Ex: the lists of QueryDict.lists())
+                if key in self.anonymize_fields:
+                    new_value = self.anonymize_value
+                elif isinstance(value, (dict, list)):
+                    new_value = self._anonymize(value)
+                else:
+                    continue
+
+                if new_value is not value:
+                    if changed is None:
+                        changed = dict(data)
+                    changed[key] = new_value
+
+            return data if changed is None else changed
+
+        if isinstance(data, list):
+            changed = None
+            for index, value in enumerate(data):
+                if not isinstance(value, (dict, list)):
+                    continue
+
+                new_value = self._anonymize(value)
+                if new_value is not value:
+                    if changed is None:
+                        changed = list(data)
+                    changed[index] = new_value
 
-        for key in data:
-            if isinstance(data[key], dict):
-                data[key] = self.run(data[key])
-            elif key in self.anonymize_fields:
-                data[key] = self.anonymize_value
+            return data if changed is None else changed
 
         return data
 
 
+@lru_cache(maxsize=None)
+def get_anonymizer():
+    """
+    Returns the DataAnonymizer compiled from settings
+    """
+    return DataAnonymizer(
+        anonymize_fields=settings.ANONYMIZE_API_VALUES,
+        field_prefix=settings.ANONYMIZE_API_PREFIX_VALUES,
+    )
+
+
+@receiver(setting_changed)
+def _reset_anonymizer(setting, **kwargs):
+    """
+    Recompile the anonymizer when the settings change (Ex: in tests)
+    """
+    if setting in ("ANONYMIZE_API_VALUES", "ANONYMIZE_API_PREFIX_VALUES"):
+        get_anonymizer.cache_clear()
+
+
 def cleanse_data(data, fields=None):
     """
     Remove sensitive data
     """
+    if not fields:
+        return get_anonymizer().run(data)
+
     anonymize_fields = []
     anonymize_fields.extend(settings.ANONYMIZE_API_VALUES)
-    if fields:
-        anonymize_fields.extend(fields)
-
-    field_prefix = []
-    field_prefix.extend(settings.ANONYMIZE_API_PREFIX_VALUES)
+    anonymize_fields.extend(fields)
 
-    anonymizer = DataAnonymizer(anonymize_fields=anonymize_fields, field_prefix=field_prefix)
-    return anonymizer.run(data)  # makes a copy
+    anonymizer = DataAnonymizer(anonymize_fields=anonymize_fields, field_prefix=settings.ANONYMIZE_API_PREFIX_VALUES)
+    return anonymizer.run(data)
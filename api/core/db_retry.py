@@ -0,0 +1,281 @@
+"""
+Retries of views failing with an OperationalError (lost connection, failover), and the database circuit breaker
+
+A view is retried in a loop, waiting an exponential backoff with full jitter between attempts
+(random 0 - min(DB_RETRY_MAX_DELAY, DB_RETRY_BASE_DELAY * 2 ** retry) seconds), at most MAX_RETRIES
+times and within DB_RETRY_DEADLINE seconds of the first attempt. Only calls that are safe to replay
+are retried:
+
+ * idempotent requests (GET, HEAD, OPTIONS), or statements that never reached the database (the
+   connection failed to open)
+ * and no failed connection inside a transaction opened by the caller
+
+view_exception_handling runs the ATOMIC_REQUESTS transactions itself, one per attempt (`DatabaseRetry.attempt`):
+a failed attempt rolls back before the next one, where the request-wide transaction of Django could not be replayed.
+Like Django's, the transaction commits the writes of views answering an exception they raised (4xx, 500).
+
+Retries also stop at the request deadline (api/core/deadlines.py).
+
+The circuit breaker is shared by every view of the worker: DB_CIRCUIT_FAILURE_THRESHOLD
+OperationalErrors within DB_CIRCUIT_WINDOW seconds open it, views then answer 503 without
+touching the database. After DB_CIRCUIT_RESET_TIMEOUT seconds one trial request is let through
+(half-open): it closes the circuit on success, or opens it again.
+"""
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+
+from django import db
+from django.conf import settings
+from django.db import transaction
+
+from api.core.deadlines import current_deadline
+from api.core.metrics import DB_CIRCUIT_REJECTIONS, DB_CIRCUIT_STATE, DB_RETRIES, DB_RETRY_OUTCOMES
+
+LOGGER = logging.getLogger("roon")
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class CircuitBreaker(object):
+    """
+    Closed / open / half-open circuit of a shared dependency, thread safe
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name, failure_threshold=None, window=None, reset_timeout=None):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._window = window
+        self._reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.failures = deque()
+        self.opened_at = None
+        self.trial_started_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def failure_threshold(self):
+        return self._failure_threshold or settings.DB_CIRCUIT_FAILURE_THRESHOLD
+
+    @property
+    def window(self):
+        return self._window or settings.DB_CIRCUIT_WINDOW
+
+    @property
+    def reset_timeout(self):
+        return self._reset_timeout or settings.DB_CIRCUIT_RESET_TIMEOUT
+
+    def allow(self):
+        """
+        True if a call may go through: the circuit is closed, or this call is the half-open trial
+        """
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        with self.lock:
+            if self.state == self.OPEN:
+                if now < self.opened_at + self.reset_timeout:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            elif self.state == self.HALF_OPEN and now < self.trial_started_at + self.reset_timeout:
+                # One trial at a time, a trial that never reports frees its slot after reset_timeout
+                return False
+            elif self.state == self.CLOSED:
+                return True
+            self.trial_started_at = now
+            return True
+
+    def is_open(self):
+        return self.state == self.OPEN
+
+    def record_success(self):
+        if self.state == self.CLOSED:
+            return
+
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.failures.clear()
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        now = time.monotonic()
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self._open(now)
+            elif self.state == self.CLOSED:
+                self.failures.append(now)
+                while self.failures and self.failures[0] <= now - self.window:
+                    self.failures.popleft()
+                if len(self.failures) >= self.failure_threshold:
+                    self._open(now)
+
+    def retry_after(self):
+        """
+        Whole seconds until the next trial (at least 1), for the Retry-After header
+        """
+        if self.opened_at is None or self.state != self.OPEN:
+            return 1
+        return max(1, math.ceil(self.opened_at + self.reset_timeout - time.monotonic()))
+
+    def reset(self):
+        with self.lock:
+            self.failures.clear()
+            self.opened_at = self.trial_started_at = None
+            self._set_state(self.CLOSED)
+
+    def _open(self, now):
+        LOGGER.critical(
+            "Circuit %s open for %ss: %s failures within %ss",
+            self.name,
+            self.reset_timeout,
+            len(self.failures) or 1,
+            self.window,
+        )
+        self.opened_at = now
+        self.failures.clear()
+        self._set_state(self.OPEN)
+
+    def _set_state(self, state):
+        self.state = state
+        DB_CIRCUIT_STATE.labels(circuit=self.name).set(self.STATE_VALUES[state])
+
+
+DATABASE_CIRCUIT = CircuitBreaker("database")
+
+
+def view_request(args):
+    """
+    Request of a view's arguments, None for views called without one
+    """
+    for arg in args:
+        if isinstance(getattr(arg, "method", None), str):
+            return arg
+    return None
+
+
+def request_databases(view):
+    """
+    Aliases of the databases whose ATOMIC_REQUESTS transaction wraps the view
+    """
+    non_atomic = getattr(view, "_non_atomic_requests", set())
+    return [
+        conn.alias
+        for conn in db.connections.all()
+        if conn.settings_dict["ATOMIC_REQUESTS"] and conn.alias not in non_atomic
+    ]
+
+
+def reset_connections():
+    """
+    Close the connections outside of a transaction, the next query opens a new one
+    """
+    for conn in db.connections.all():
+        if not conn.in_atomic_block:
+            conn.close()
+
+
+class DatabaseRetry(object):
+    """
+    Retry state of one view call: attempts, deadline and outcome
+    """
+
+    def __init__(self, view, request=None, circuit=DATABASE_CIRCUIT):
+        self.view = view
+        self.method = request.method.upper() if request is not None else None
+        self.circuit = circuit
+        self.retries = 0
+        self.outcome = None
+        # Whether the statements of the failed attempt reached the database, read before its rollback
+        self.sent = None
+        self.deadline = time.monotonic() + settings.DB_RETRY_DEADLINE
+        # Retries stop at the request deadline too
+        request_deadline = current_deadline()
+        if request_deadline is not None:
+            self.deadline = min(self.deadline, request_deadline.expires_at)
+
+    def allow(self):
+        """
+        True if the call may go through the circuit, counts the rejections
+        """
+        if self.circuit.allow():
+            return True
+        DB_CIRCUIT_REJECTIONS.labels(view=self.view).inc()
+        return False
+
+    @contextmanager
+    def attempt(self, databases=()):
+        """
+        One call of the view, within a transaction on each of the databases
+        """
+        self.sent = None
+        with ExitStack() as stack:
+            # A connection failing to open fails here, before any statement
+            for alias in databases:
+                stack.enter_context(transaction.atomic(using=alias))
+            # A failed commit may have been applied
+            self.sent = True
+            try:
+                yield
+            except db.OperationalError:
+                # Rolling back may close the failed connections
+                self.sent = self._sent()
+                raise
+
+    def backoff(self):
+        """
+        Seconds to wait before retrying the OperationalError being handled, None to give up (self.outcome)
+        """
+        self.circuit.record_failure()
+        delay = random.uniform(0, min(settings.DB_RETRY_MAX_DELAY, settings.DB_RETRY_BASE_DELAY * 2**self.retries))
+
+        if not self.replayable():
+            self.outcome = "not_retryable"
+        elif self.retries >= settings.MAX_RETRIES:
+            self.outcome = "exhausted"
+        elif self.circuit.is_open():
+            self.outcome = "circuit_open"
+        elif time.monotonic() + delay >= self.deadline:
+            self.outcome = "deadline"
+        else:
+            self.retries += 1
+            DB_RETRIES.labels(view=self.view).inc()
+            return delay
+
+        DB_RETRY_OUTCOMES.labels(view=self.view, outcome=self.outcome).inc()
+        return None
+
+    def replayable(self):
+        """
+        True if the failed call can be replayed: nothing was committed, nor is a broken transaction still open
+        """
+        if any(conn.in_atomic_block for conn in self._failed()):
+            return False
+        if self.method in IDEMPOTENT_METHODS:
+            return True
+        # The statement was never sent when the connection failed to open
+        return not (self._sent() if self.sent is None else self.sent)
+
+    def _failed(self):
+        return [conn for conn in db.connections.all() if conn.errors_occurred]
+
+    def _sent(self):
+        failed = self._failed()
+        return not failed or any(conn.connection is not None for conn in failed)
+
+    def succeeded(self):
+        """
+        The call went through (or failed for another reason than the database)
+        """
+        self.circuit.record_success()
+        if self.retries:
+            self.outcome = "recovered"
+            DB_RETRY_OUTCOMES.labels(view=self.view, outcome=self.outcome).inc()
@@ -0,0 +1,196 @@
+"""
+Per-request deadlines: the time budget of a view, enforced on its queries and downstream calls
+
+The budget of a view is its `@view_deadline(seconds)`, else VIEW_DEADLINES[view_name], else
+VIEW_DEADLINE_DEFAULT (None: no deadline). view_exception_handling runs the view within
+`request_deadline(seconds)`, and answers DeadlineExceeded with a structured 504.
+
+Every connection runs the same execute wrapper, which reads the deadline of the current context
+(contextvars, followed into sync_to_async threads like api/core/query_instrumentation.py):
+
+ * a statement starting past the deadline raises DeadlineExceeded
+ * PostgreSQL: the connection's statement_timeout is set to the remaining budget, and set again
+   when the remaining budget falls under half of it. The server cancels the statement on timeout
+   (QueryCanceled). The first statement run without a deadline resets it.
+ * SQLite (tests, local): a progress handler interrupts the statement past the deadline
+
+Downstream calls (Auth Service, other Services) use `timeout(default)`, bounded by the remaining budget.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import httpx
+import requests
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.utils import OperationalError
+
+from api.core.exceptions import DeadlineExceeded
+
+# SQLSTATE of statements cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+# SQLite virtual machine instructions between two deadline checks (about a millisecond)
+SQLITE_PROGRESS_STEPS = 100000
+
+DOWNSTREAM_TIMEOUTS = (requests.Timeout, httpx.TimeoutException)
+
+
+class Deadline(object):
+    """
+    Time budget of `seconds` starting now
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def error(self):
+        return DeadlineExceeded(self.seconds)
+
+
+_DEADLINE = ContextVar("deadline", default=None)
+
+
+def current_deadline():
+    """
+    Deadline of the current request, None without one
+    """
+    return _DEADLINE.get()
+
+
+def timeout(default):
+    """
+    Timeout (seconds) of a downstream call: `default`, bounded by the remaining budget of the request
+    """
+    deadline = _DEADLINE.get()
+    if deadline is None:
+        return default
+
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise deadline.error()
+    return remaining if default is None else min(default, remaining)
+
+
+def deadline_error(err):
+    """
+    DeadlineExceeded of a downstream timeout once the request is past its deadline, else `err`
+    """
+    deadline = _DEADLINE.get()
+    if isinstance(err, DOWNSTREAM_TIMEOUTS) and deadline is not None and deadline.expired():
+        return deadline.error()
+    return err
+
+
+def view_deadline(seconds):
+    """
+    Decorator setting the time budget of a view (seconds, None: no deadline), under view_exception_handling
+    """
+
+    def decorator(func):
+        func.deadline_seconds = seconds
+        return func
+
+    return decorator
+
+
+def get_view_deadline(func, request=None):
+    """
+    Time budget of a view: its `@view_deadline`, else its VIEW_DEADLINES entry, else VIEW_DEADLINE_DEFAULT
+    """
+    if hasattr(func, "deadline_seconds"):
+        return func.deadline_seconds
+
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is not None and resolver_match.view_name in settings.VIEW_DEADLINES:
+        return settings.VIEW_DEADLINES[resolver_match.view_name]
+    return settings.VIEW_DEADLINE_DEFAULT
+
+
+@contextmanager
+def request_deadline(seconds):
+    """
+    Enforce a deadline of `seconds` on the queries and downstream calls of the block (and its sync_to_async calls)
+    """
+    if seconds is None:
+        yield None
+        return
+
+    # Connections opened before this module was imported missed connection_created
+    for connection in connections.all():
+        install_deadline_enforcer(connection)
+
+    deadline = Deadline(seconds)
+    token = _DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _DEADLINE.reset(token)
+
+
+def _set_statement_timeout(connection, cursor, deadline, remaining):
+    milliseconds = max(1, int(remaining * 1000))
+    current = connection.statement_timeout
+    if current is None or current[0] is not deadline or current[1] > 2 * milliseconds:
+        cursor.execute("SET statement_timeout = %d" % milliseconds)
+        connection.statement_timeout = (deadline, milliseconds)
+
+
+def enforce_deadline(execute, sql, params, many, context):
+    """
+    Execute wrapper bounding every statement by the deadline of the current context
+    """
+    connection = context["connection"]
+    deadline = _DEADLINE.get()
+    if deadline is None:
+        if getattr(connection, "statement_timeout", None) is not None:
+            context["cursor"].cursor.execute("RESET statement_timeout")
+            connection.statement_timeout = None
+        return execute(sql, params, many, context)
+
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise deadline.error()
+
+    if connection.vendor == "postgresql":
+        _set_statement_timeout(connection, context["cursor"].cursor, deadline, remaining)
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as err:
+            if getattr(err.__cause__, "pgcode", None) == QUERY_CANCELED:
+                raise deadline.error() from err
+            raise
+
+    if connection.vendor == "sqlite":
+        connection.connection.set_progress_handler(deadline.expired, SQLITE_PROGRESS_STEPS)
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as err:
+            if deadline.expired():
+                raise deadline.error() from err
+            raise
+        finally:
+            connection.connection.set_progress_handler(None, 0)
+
+    return execute(sql, params, many, context)
+
+
+def install_deadline_enforcer(connection, **kwargs):
+    """
+    Add the deadline execute wrapper to a connection, once. A new connection has the default statement_timeout.
+    """
+    if kwargs.get("signal") is not None or not hasattr(connection, "statement_timeout"):
+        connection.statement_timeout = None
+    if enforce_deadline not in connection.execute_wrappers:
+        connection.execute_wrappers.append(enforce_deadline)
+
+
+connection_created.connect(install_deadline_enforcer, dispatch_uid="install_deadline_enforcer")
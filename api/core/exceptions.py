@@ -131,3 +131,13 @@ class HTTP412ResponseException(Exception):
     """
 
     pass
+
+
+class DeadlineExceeded(Exception):
+    """
+    Error if a request runs past its deadline (api/core/deadlines.py)
+    """
+
+    def __init__(self, seconds, *args):
+        self.seconds = seconds
+        super(DeadlineExceeded, self).__init__("Request exceeded its %ss deadline" % seconds, *args)
@@ -0,0 +1,89 @@
+"""
+Custom model fields for roon service
+"""
+import os
+import threading
+import time
+import uuid
+
+from django.db import models
+
+_UUID7_LOCK = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7():
+    """
+    Time ordered UUID (version 7, RFC 9562): 48 bits of Unix time (ms), then 74 random bits
+
+    The 12 bits after the version are a counter within the millisecond, so the keys
+    generated by a process are strictly increasing, even if the clock goes back.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+
+    with _UUID7_LOCK:
+        now_ms = time.time_ns() // 1000000
+        if now_ms > _uuid7_last_ms:
+            # Start low in the counter range, to leave room for the keys of the same millisecond
+            _uuid7_last_ms, _uuid7_counter = now_ms, int.from_bytes(os.urandom(2), "big") & 0x3FF
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                # Counter exhausted, borrow the next millisecond
+                _uuid7_last_ms, _uuid7_counter = _uuid7_last_ms + 1, 0
+        unix_ms, counter = _uuid7_last_ms, _uuid7_counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=(unix_ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b)
+
+
+class CompactUUIDField(models.UUIDField):
+    """
+    UUIDField stored in 16 bytes on PostgreSQL and SQLite
+
+    Native `uuid` on PostgreSQL, a 16 byte BLOB on SQLite (instead of char(32) hex), and char(32) elsewhere.
+    The bytes are big endian, so ordering by the column orders by the UUID value.
+    """
+
+    def get_internal_type(self):
+        # Not "UUIDField": the SQLite backend would convert the BLOB read as a hex string
+        return "CompactUUIDField"
+
+    def db_type(self, connection):
+        if connection.vendor == "sqlite":
+            return "blob"
+        return connection.data_types["UUIDField"]
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if connection.vendor != "sqlite":
+            return super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = self.to_python(value)
+        return value.bytes
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, (bytes, memoryview)):
+            return uuid.UUID(bytes=bytes(value))
+        return uuid.UUID(value)
+
+
+class TimeOrderedUUIDField(CompactUUIDField):
+    """
+    Compact UUID primary key defaulting to uuid7, so new rows are appended to the end of the PK index
+
+    Opt-in for CoreModel subclasses:
+
+        question_id = TimeOrderedUUIDField("Question ID", primary_key=True, editable=False)
+
+    The key order is the creation order: `CustomModelQuerySet.cursor_page` pages by PK alone,
+    with no `created_at` index or sort.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default", uuid7)
+        super().__init__(*args, **kwargs)
@@ -0,0 +1,61 @@
+"""
+Custom lookups for roon service
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Field
+from django.db.models.lookups import In
+from django.utils.datastructures import OrderedSet
+
+
+@Field.register_lookup
+class AnyLookup(In):
+    """
+    `field__any=values`: IN with the values bound as ONE parameter, for large value lists
+
+     * PostgreSQL: field = ANY(%s::type[]), one array parameter
+     * SQLite: field IN (SELECT value FROM json_each(%s)), one JSON parameter, so the list is not
+       limited by the SQLite variable limit (32766)
+     * Otherwise (and for values JSON can't hold, Ex: bytes): the IN lookup
+    """
+
+    lookup_name = "any"
+
+    def as_sql(self, compiler, connection):
+        if not self.rhs_is_direct_value() or connection.vendor not in ("postgresql", "sqlite"):
+            return super().as_sql(compiler, connection)
+
+        try:
+            rhs = OrderedSet(self.rhs)
+            rhs.discard(None)
+        except TypeError:  # Unhashable items in self.rhs
+            rhs = [value for value in self.rhs if value is not None]
+        if not rhs:
+            raise EmptyResultSet
+
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        _, rhs_params = self.batch_process_rhs(compiler, connection, rhs)
+
+        if connection.vendor == "postgresql":
+            db_type = self.lhs.output_field.cast_db_type(connection)
+            return "%s = ANY(%%s::%s[])" % (lhs_sql, db_type), [*lhs_params, list(rhs_params)]
+
+        try:
+            values = json.dumps(list(rhs_params))
+        except TypeError:
+            return super().as_sql(compiler, connection)
+        return "%s IN (SELECT value FROM json_each(%%s))" % lhs_sql, [*lhs_params, values]
+
+
+def in_lookup(field, values):
+    """
+    (lookup, values) of an IN search: `any` for lists of IN_SEARCH_ARRAY_MIN_VALUES values or more
+
+    Short lists keep IN (value, ...), the planner estimates their rows from the values.
+    """
+    if not isinstance(values, (list, tuple, set)):
+        values = [values]
+    lookup = "__any" if len(values) >= settings.IN_SEARCH_ARRAY_MIN_VALUES else "__in"
+    return field + lookup, list(values)
@@ -0,0 +1,133 @@
+"""
+Roon Service Metrics
+
+Prometheus metrics registry exposed at /metrics. When PROMETHEUS_MULTIPROC_DIR is set
+(gunicorn), every worker writes its samples to mmap'd files in that directory and
+the /metrics view aggregates all workers.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Seconds, tuned for API requests (5ms - 10s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+# Seconds, tuned for background tasks (10ms - 30min)
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0)
+
+REQUEST_LATENCY = Histogram(
+    "roon_request_latency_seconds",
+    "Request latency by resolved view name, method and status",
+    ["view", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "roon_request_db_seconds",
+    "Total database time per request by resolved view name",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "roon_request_db_queries",
+    "Number of database queries per request by resolved view name",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+AUTH_SERVICE_LATENCY = Histogram(
+    "roon_auth_service_latency_seconds",
+    "Auth Service call latency by action and outcome",
+    ["action", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "roon_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss)",
+    ["cache", "result"],
+)
+TASK_DURATION = Histogram(
+    "roon_task_duration_seconds",
+    "Background task duration by task name and outcome (config/celery_app.py)",
+    ["task", "outcome"],
+    buckets=TASK_BUCKETS,
+)
+DB_RETRIES = Counter(
+    "roon_db_retries_total",
+    "Views retried after an OperationalError (api/core/db_retry.py)",
+    ["view"],
+)
+DB_RETRY_OUTCOMES = Counter(
+    "roon_db_retry_outcomes_total",
+    "OperationalErrors of views by outcome (recovered/not_retryable/exhausted/deadline/circuit_open)",
+    ["view", "outcome"],
+)
+DB_CIRCUIT_STATE = Gauge(
+    "roon_circuit_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open (the worst worker in multiprocess mode)",
+    ["circuit"],
+    multiprocess_mode="max",
+)
+DB_CIRCUIT_REJECTIONS = Counter(
+    "roon_db_circuit_rejections_total",
+    "Requests answered 503 without a database call while the database circuit is open",
+    ["view"],
+)
+SERIALIZER_TIME = Histogram(
+    "roon_serializer_seconds",
+    "Time spent rendering serializer data by serializer class",
+    ["serializer"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def observe(histogram, **labels):
+    """
+    Observe the duration of the block (seconds) on a histogram
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def observe_auth_service(action):
+    """
+    Observe an Auth Service call, labelled with its outcome (success/error)
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        AUTH_SERVICE_LATENCY.labels(action=action, outcome=outcome).observe(time.perf_counter() - start)
+
+
+def record_cache_lookup(cache, hit):
+    """
+    Count a cache lookup, hit ratio = hit / (hit + miss)
+    """
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def render_metrics():
+    """
+    Metrics in the Prometheus text format, aggregated across workers in multiprocess mode
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+
+    return generate_latest(REGISTRY)
@@ -0,0 +1,105 @@
+"""
+Roon Service Middleware
+
+The middlewares are sync and async capable, so ASGI deployments do not switch threads around them.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+
+from api.core import metrics
+from api.core.query_instrumentation import check_query_budget, get_view_query_budget, record_queries
+
+
+class HybridMiddleware(object):
+    """
+    Base middleware running `__call__` under WSGI and `__acall__` under ASGI (same as Django's MiddlewareMixin)
+
+    Subclasses implement both and dispatch to `__acall__` when the instance is a coroutine function.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Mark the instance as a coroutine function so Django awaits it
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """
+    Records request latency, DB time and query count per resolved view name
+
+    Must be the outermost middleware so the latency covers the whole request. Also sets
+    `response.duration` (ms), which RequestLogFilter logs.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - start)
+
+    @staticmethod
+    def observe(request, response, duration):
+        resolver_match = getattr(request, "resolver_match", None)
+        view_name = resolver_match.view_name if resolver_match is not None else "Unknown"
+
+        metrics.REQUEST_LATENCY.labels(
+            view=view_name, method=request.method, status=str(response.status_code)
+        ).observe(duration)
+
+        query_stats = getattr(request, "query_stats", None)
+        if query_stats is not None:
+            metrics.REQUEST_DB_TIME.labels(view=view_name).observe(query_stats.duration / 1000)
+            metrics.REQUEST_DB_QUERIES.labels(view=view_name).observe(query_stats.count)
+
+        response.duration = round(duration * 1000, 3)
+        return response
+
+
+class QueryInstrumentationMiddleware(HybridMiddleware):
+    """
+    Records query count, DB time and duplicate query shapes for every request
+
+    The stats are attached to the request (`request.query_stats`) for RequestLogFilter,
+    and checked against the view's budget in settings.QUERY_BUDGETS.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with record_queries() as stats:
+            response = self.get_response(request)
+        return self.check_budget(request, response, stats)
+
+    async def __acall__(self, request):
+        with record_queries() as stats:
+            response = await self.get_response(request)
+        return self.check_budget(request, response, stats)
+
+    @staticmethod
+    def check_budget(request, response, stats):
+        request.query_stats = stats
+
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None:
+            check_query_budget(
+                resolver_match.view_name,
+                stats,
+                get_view_query_budget(resolver_match.view_name),
+                enforce=getattr(settings, "QUERY_BUDGET_ENFORCE", False),
+            )
+
+        return response
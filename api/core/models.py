@@ -1,6 +1,5 @@
 """Core model definitions for phi service"""
 import abc
-import ast
 import operator
 from datetime import datetime
 from functools import reduce
@@ -13,6 +12,8 @@ from django.db.models.query import QuerySet
 from django.http import QueryDict
 
 from api.core.exceptions import DateSearchError, SearchWithOperatorException
+from api.core.lookups import in_lookup
+from api.core.query_grammar import compile_query, parse_query
 from api.core.utils import computed_model_keys, model_search, remove_forbidden_data
 
 SEARCH_FILTERS = settings.SEARCH_FILTERS
@@ -35,16 +36,33 @@ class EagerLoadingMixin(object):
     """
 
     @classmethod
-    def setup_eager_loading(cls, queryset):
+    def setup_eager_loading(cls, queryset, fields=None):
+        """
+        Eager load the relations the serializer renders, only those of `fields` when projected
+        """
 
         # select_related for "to-one" relationships
         if hasattr(cls, "_SELECT_RELATED_FIELDS"):
-            queryset = queryset.select_related(*cls._SELECT_RELATED_FIELDS)
+            queryset = queryset.select_related(*cls._projected_lookups(cls._SELECT_RELATED_FIELDS, fields))
         # prefetch_related for "to-many" relationships
         if hasattr(cls, "_PREFETCH_RELATED_FIELDS"):
-            queryset = queryset.prefetch_related(*cls._PREFETCH_RELATED_FIELDS)
+            queryset = queryset.prefetch_related(*cls._projected_lookups(cls._PREFETCH_RELATED_FIELDS, fields))
         return queryset
 
+    @classmethod
+    def _projected_lookups(cls, lookups, fields):
+        """
+        Lookups whose serializer field is in `fields` (all when None)
+
+        The field of a lookup is its first relation, or its _EAGER_LOADING_SOURCES entry
+        (Ex: canonical_answer is rendered by canonical_answer_id).
+        """
+        if fields is None:
+            return lookups
+
+        sources = getattr(cls, "_EAGER_LOADING_SOURCES", {})
+        return [lookup for lookup in lookups if sources.get(lookup.split("__")[0], lookup.split("__")[0]) in fields]
+
 
 class TransformComputedParams(object):
     """
@@ -348,8 +366,8 @@ def search_with_operator(qs, query_dictionary):
             return qs
 
         if opr == "IN":
-            for param in list(query_dictionary.keys()):
-                return getattr(qs, opr)(param, query_dictionary[param])
+            # Every field, Ex: ?operator=IN&title=a&title=b&owner=<id>
+            return qs.IN(**remove_forbidden_data(query_dictionary, SEARCH_FILTERS))
         else:
             cleaned_query_dictionary = remove_forbidden_data(query_dictionary, SEARCH_FILTERS)
             return getattr(qs, opr)(cleaned_query_dictionary)
@@ -389,7 +407,7 @@ class CustomModelQuerySet(QuerySet):
                     for item in _query_dict[key]:
                         query_creation_helper({key: item}, q_objects)
                 else:
-                    q_objs = model_search({key: _query_dict[key]}, qs=None, qs_objs=True)
+                    q_objs = model_search({key: _query_dict[key]}, qs=None, qs_objs=True, model=self.model)
                     q_objects.extend(q_objs)
 
             return q_objects
@@ -433,16 +451,42 @@ class CustomModelQuerySet(QuerySet):
         """
         return self.build_qs(self._NOT(query_dict))
 
-    def IN(self, field, values):
+    def IN(self, *args, **fields):
         """
-        Returns a QuerySet containing all objects that
-        satisfy the predicates within **kwargs' values
+        Returns a QuerySet containing all objects whose
+        fields are in their values (all fields)
+
+        Ex: IN("title", ["a", "b"]) or IN(title=["a", "b"], owner=[...])
+        """
+        if args:
+            field, values = args
+            fields[field] = values
+        return self.build_qs(Q(*[in_lookup(field, values) for field, values in fields.items()]))
+
+    def cursor_page(self, cursor=None, per_page=100):
+        """
+        Keyset page ordered by primary key alone (newest first for TimeOrderedUUIDField keys)
+
+        Rows after `cursor` (the last PK of the previous page) are read straight from the PK
+        index, without the OFFSET scan and COUNT of page based pagination.
+        Returns (objects, next_cursor), next_cursor is None on the last page.
         """
-        return self.build_qs(Q((field + "__in", values)))
+        qs = self.order_by("-pk")
+        if cursor:
+            qs = qs.filter(pk__lt=cursor)
+
+        objects = list(qs[: per_page + 1])
+        if len(objects) > per_page:
+            objects = objects[:per_page]
+            # Model instances, or the PKs themselves for values_list("pk", flat=True)
+            return objects, str(getattr(objects[-1], "pk", objects[-1]))
+        return objects, None
 
     def ADVANCED(self, query_dict):
         """
         Returns a complex QuerySet
+
+        The values of the outer operation are JSON documents, see api.core.query_grammar
         """
         operation_keys = [key for key in query_dict.keys() if key in self.ALLOWED_OPERATIONS]
 
@@ -454,16 +498,16 @@ class CustomModelQuerySet(QuerySet):
                 )
             else:
                 operation = operation_keys[0]
-                decoded_query = []
-                if isinstance(query_dict[operation], list):
-                    decoded_query = [ast.literal_eval(data) for data in query_dict[operation]]
+                documents = query_dict[operation]
+                if not isinstance(documents, list):
+                    documents = [documents]
         else:
             raise SearchWithOperatorException(
                 "Invalid usage of Advanced search. You have not sent an"
                 ' operation. Choose one "outer" operation Ex: {}'.format(self.ALLOWED_OPERATIONS)
             )
 
-        return self.build_qs(getattr(self, operation)(decoded_query))
+        return self.build_qs(compile_query(parse_query(operation, tuple(documents)), self.model))
 
 
 class CustomModelManager(models.Manager):
@@ -493,12 +537,12 @@ class CustomModelManager(models.Manager):
         # pylint:disable=E1120
         return self.get_queryset().NOT(*args)
 
-    def IN(self, **kwargs):
+    def IN(self, *args, **kwargs):
         """
-        Returns a QuerySet containing all objects that
-        satisfy the predicates within **kwargs' values
+        Returns a QuerySet containing all objects whose
+        fields are in their values (all fields)
         """
-        return self.get_queryset().IN(**kwargs)
+        return self.get_queryset().IN(*args, **kwargs)
 
     def ADVANCED(self, *args):
         """
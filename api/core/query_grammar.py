@@ -0,0 +1,196 @@
+"""
+JSON boolean query grammar of the `operator=ADVANCED` search
+
+    ?operator=ADVANCED&_OR={"title": "What"}&_OR={"_AND": [{"title": "How"}, {"context": "$tumor"}]}
+
+Every value of the outer operation (`_AND`, `_OR` or `_NOT`) is a JSON document, one or
+more terms of the operation:
+
+ * {"_AND": [terms]}, {"_OR": [terms]}: all/any of the terms
+ * {"_NOT": [terms]}: none of the terms
+ * {"_IN": {"field": [values]}}: field is one of the values
+ * {"field": "value"}: model_search lookup, the value prefix selects it (Ex: "$tumor", ">=2"),
+   a list of values is one term per value
+
+The documents are parsed once into an immutable AST (cached by their text), with limits on
+length, depth, node count and IN list size (settings.ADVANCED_SEARCH_*). Nested operations
+with the same connector are flattened, so the compiled Q tree is as shallow as the query allows.
+"""
+import json
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Q
+
+from api.core.exceptions import SearchWithOperatorException
+from api.core.lookups import in_lookup
+from api.core.utils import search_lookup
+
+OPERATIONS = ("_AND", "_OR", "_NOT")
+IN = "_IN"
+# _NOT is the negation of its terms combined with OR
+CONNECTORS = {"_AND": Q.AND, "_OR": Q.OR, "_NOT": Q.OR}
+FIELD_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# AST nodes
+Operation = namedtuple("Operation", ["operation", "children"])
+Lookup = namedtuple("Lookup", ["field", "value"])
+In = namedtuple("In", ["field", "values"])
+
+
+class QueryParser(object):
+    """
+    Parser of the decoded JSON documents of one query, counting its nodes
+    """
+
+    def __init__(self):
+        self.nodes = 0
+
+    def parse(self, operation, documents):
+        return self._operation(operation, documents, depth=1)
+
+    def _count(self, nodes=1):
+        self.nodes += nodes
+        if self.nodes > settings.ADVANCED_SEARCH_MAX_NODES:
+            raise SearchWithOperatorException(
+                "Advanced search is limited to %s terms" % settings.ADVANCED_SEARCH_MAX_NODES
+            )
+
+    def _operation(self, operation, items, depth):
+        _check_depth(depth)
+        if not isinstance(items, list):
+            items = [items]
+        self._count()
+
+        children = []
+        for item in items:
+            children.extend(self._terms(operation, item, depth))
+        if not children:
+            raise SearchWithOperatorException("%s requires at least one term" % operation)
+        return _simplify(operation, children)
+
+    def _terms(self, parent, item, depth):
+        """
+        AST nodes of one item of the `parent` operation, spliced into it when they share its connector
+        """
+        if isinstance(item, list):
+            # Nested lists count as nesting, or `[[[...]]]` would be unbounded
+            _check_depth(depth + 1)
+            return [term for element in item for term in self._terms(parent, element, depth + 1)]
+        if not isinstance(item, dict):
+            raise SearchWithOperatorException("Advanced search terms are JSON objects, got: %s" % json.dumps(item))
+
+        terms = []
+        for key, value in item.items():
+            if key in OPERATIONS:
+                node = self._operation(key, value, depth + 1)
+                if isinstance(node, Operation) and node.operation != "_NOT" and CONNECTORS[key] == CONNECTORS[parent]:
+                    terms.extend(node.children)
+                else:
+                    terms.append(node)
+            elif key == IN:
+                terms.extend(self._in(value))
+            else:
+                terms.extend(self._lookups(key, value))
+        return terms
+
+    def _in(self, value):
+        if not isinstance(value, dict) or not value:
+            raise SearchWithOperatorException('_IN takes an object of lists, Ex: {"_IN": {"title": ["a", "b"]}}')
+
+        terms = []
+        for field, values in value.items():
+            if not isinstance(values, list):
+                raise SearchWithOperatorException("_IN values of %s must be a list" % field)
+            terms.append(In(_field(field), _values(field, values)))
+            self._count()
+        return terms
+
+    def _lookups(self, field, value):
+        values = _values(field, value) if isinstance(value, list) else _values(field, [value])
+        self._count(len(values))
+        return [Lookup(_field(field), val) for val in values]
+
+
+def _check_depth(depth):
+    if depth > settings.ADVANCED_SEARCH_MAX_DEPTH:
+        raise SearchWithOperatorException(
+            "Advanced search is limited to %s nested operations" % settings.ADVANCED_SEARCH_MAX_DEPTH
+        )
+
+
+def _field(field):
+    if not FIELD_RE.match(field):
+        raise SearchWithOperatorException("Invalid advanced search field or operation: %s" % field)
+    return field
+
+
+def _values(field, values):
+    if len(values) > settings.ADVANCED_SEARCH_MAX_IN_VALUES:
+        raise SearchWithOperatorException(
+            "Advanced search is limited to %s values per field" % settings.ADVANCED_SEARCH_MAX_IN_VALUES
+        )
+    if not all(isinstance(value, SCALAR_TYPES) for value in values):
+        raise SearchWithOperatorException("Values of %s must be strings, numbers, booleans or null" % field)
+    return tuple(values)
+
+
+def _simplify(operation, children):
+    """
+    Smallest node equivalent to `operation` of `children`
+    """
+    if operation != "_NOT":
+        return children[0] if len(children) == 1 else Operation(operation, tuple(children))
+
+    child = children[0]
+    if len(children) == 1 and isinstance(child, Operation) and child.operation == "_NOT":
+        # Double negation: the terms of the inner _NOT, combined with OR
+        return _simplify("_OR", list(child.children))
+    return Operation(operation, tuple(children))
+
+
+@lru_cache(maxsize=settings.ADVANCED_SEARCH_CACHE_SIZE)
+def parse_query(operation, documents):
+    """
+    AST of the outer `operation` of the JSON `documents` (tuple of str), cached
+    """
+    if operation not in OPERATIONS:
+        raise SearchWithOperatorException("Invalid advanced search operation: %s" % operation)
+    if not all(isinstance(document, str) for document in documents):
+        raise SearchWithOperatorException("Advanced search terms must be JSON strings")
+    if sum(len(document) for document in documents) > settings.ADVANCED_SEARCH_MAX_LENGTH:
+        raise SearchWithOperatorException(
+            "Advanced search is limited to %s characters" % settings.ADVANCED_SEARCH_MAX_LENGTH
+        )
+
+    try:
+        decoded = [json.loads(document) for document in documents]
+    except (ValueError, RecursionError) as err:
+        raise SearchWithOperatorException("Invalid advanced search JSON: %s" % err)
+
+    return QueryParser().parse(operation, decoded)
+
+
+def compile_query(node, model=None):
+    """
+    Q object of an AST node, on the fields of `model`
+    """
+    compiled = _compile(node, model)
+    return compiled if isinstance(compiled, Q) else Q(compiled)
+
+
+def _compile(node, model):
+    # Lookups are (lookup, value) children of their operation's Q, not Q objects of their own
+    if isinstance(node, Lookup):
+        return search_lookup(node.field, node.value, model)
+    if isinstance(node, In):
+        return in_lookup(node.field, node.values)
+
+    return Q(
+        *[_compile(child, model) for child in node.children],
+        _connector=CONNECTORS[node.operation],
+        _negated=node.operation == "_NOT",
+    )
@@ -0,0 +1,178 @@
+"""
+Per-request SQL query instrumentation
+
+Records query count, total DB time and duplicate query shapes through
+`connection.execute_wrapper`, so N+1 queries (missing _SELECT_RELATED_FIELDS /
+_PREFETCH_RELATED_FIELDS hints) show up in logs and fail tests.
+
+Every connection runs the same execute wrapper, which records into the QueryStats
+of the current context (contextvars). The context follows async views into the
+sync_to_async threads that run their ORM calls, whose connections are not the
+event loop thread's.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+LOGGER = logging.getLogger("roon")
+
+# Collapses "IN (%s, %s, %s)" so queries differing only by IN-list size share a shape
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Error if a block or endpoint runs more queries than its declared budget
+    """
+
+    pass
+
+
+class QueryStats(object):
+    """
+    Query count, DB time (ms) and query shapes recorded for a request or block
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    @staticmethod
+    def shape(sql):
+        """
+        Normalized SQL used to group identical queries (params are already placeholders)
+        """
+        return _IN_LIST_RE.sub("IN (...)", _WHITESPACE_RE.sub(" ", sql.strip()))
+
+    @property
+    def duplicates(self):
+        """
+        {shape: count} of every query shape executed more than once
+        """
+        return {shape: count for shape, count in self.shapes.items() if count > 1}
+
+    @property
+    def duplicate_count(self):
+        """
+        Number of executions that repeated an already executed shape
+        """
+        return sum(count - 1 for count in self.duplicates.values())
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[self.shape(sql)] += 1
+
+    def as_log_fields(self):
+        return {
+            "db_query_count": self.count,
+            "db_duration": round(self.duration, 3),
+            "db_duplicate_queries": self.duplicate_count,
+        }
+
+    def __repr__(self):
+        return "QueryStats(count=%s, duration=%.3fms, duplicates=%s)" % (
+            self.count,
+            self.duration,
+            self.duplicate_count,
+        )
+
+
+# QueryStats recording in the current context, nested blocks record into all of them
+_ACTIVE_STATS = ContextVar("query_stats", default=())
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper that records every executed statement into the active QueryStats
+    """
+    active_stats = _ACTIVE_STATS.get()
+    if not active_stats:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - start) * 1000
+        for stats in active_stats:
+            stats.add(sql, duration)
+
+
+def install_query_recorder(connection, **kwargs):
+    """
+    Add the recording execute wrapper to a connection, once
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder, dispatch_uid="install_query_recorder")
+
+
+@contextmanager
+def record_queries(stats=None):
+    """
+    Record the queries of every database connection within the block (and its sync_to_async calls)
+    """
+    stats = stats if stats is not None else QueryStats()
+
+    # Connections opened before this module was imported missed connection_created
+    for connection in connections.all():
+        install_query_recorder(connection)
+
+    token = _ACTIVE_STATS.set(_ACTIVE_STATS.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _ACTIVE_STATS.reset(token)
+
+
+def check_query_budget(name, stats, budget, enforce=False):
+    """
+    Log (or raise QueryBudgetExceeded when enforced) if stats exceed the budget
+    """
+    if budget is None or stats.count <= budget:
+        return True
+
+    message = "%s ran %s queries, budget is %s. Duplicate query shapes: %s" % (
+        name,
+        stats.count,
+        budget,
+        stats.duplicates,
+    )
+    if enforce:
+        raise QueryBudgetExceeded(message)
+
+    LOGGER.warning(message)
+    return False
+
+
+@contextmanager
+def query_budget(max_queries, name="Block"):
+    """
+    Test helper, fails when the block runs more than max_queries queries
+
+        with query_budget(5):
+            client.get(url)
+    """
+    with record_queries() as stats:
+        yield stats
+
+    check_query_budget(name, stats, max_queries, enforce=True)
+
+
+def get_view_query_budget(view_name):
+    """
+    Declared query budget for a resolved view_name, None if not declared
+    """
+    return getattr(settings, "QUERY_BUDGETS", {}).get(view_name)
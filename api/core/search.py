@@ -0,0 +1,245 @@
+"""
+Search engine shared by the search and listing endpoints
+
+Every endpoint filters with the same DSL (date search, `operator` searches, model_search
+prefixes), sorts with `order_by` and paginates with `page`/`per_page` or `cursor`.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Count, F
+
+from api.core.metrics import record_cache_lookup
+from api.core.models import date_search, search_with_operator
+from api.core.serializer import CursorPaginationSerializer, PaginationSerializer
+from api.core.utils import model_search
+
+DEFAULT_PER_PAGE = 100
+# Params that page, sort or shape the results, not filter them
+NON_FILTER_PARAMS = ("page", "per_page", "cursor", "count", "ids_only", "order_by", "format", "fields", "facets")
+# Part of the cached search results' keys, bumped by the outbox drain on writes (api/outbox/drain.py)
+SEARCH_GENERATION_KEY = "search_generation"
+
+
+class Facet(object):
+    """
+    Counts of the searched rows grouped by `field`, with its `label` (Ex: topics__topic_id, topics__title)
+    """
+
+    def __init__(self, field, label=None):
+        self.field = field
+        self.label = label or field
+
+
+def is_true(value):
+    return str(value).lower() in ["true", "1", "t", "y", "yes"]
+
+
+def list_param(params, name):
+    """
+    Values of a comma separated and/or repeated param, None when absent
+    """
+    if name not in params:
+        return None
+
+    values = params.getlist(name) if hasattr(params, "getlist") else params[name]
+    if isinstance(values, str):
+        values = [values]
+    return [item.strip() for value in values for item in value.split(",") if item.strip()]
+
+
+def requested_fields(params):
+    """
+    Field projection of the `fields` param, None when absent
+    """
+    return list_param(params, "fields")
+
+
+def filter_queryset(queryset, params):
+    """
+    Apply the search params (date search, operator search or model_search) to `queryset`
+    """
+    queryset, params = date_search(queryset, params)
+
+    if "operator" in list(params.keys()):
+        return search_with_operator(queryset, params)
+    return model_search(params, qs=queryset)
+
+
+def filter_shape(params):
+    """
+    Stable hash of the filtering params (page, sort and projection params excluded)
+    """
+    items = params.lists() if hasattr(params, "lists") else params.items()
+    shape = sorted(
+        (key, sorted(map(str, value)) if isinstance(value, list) else [str(value)])
+        for key, value in items
+        if key not in NON_FILTER_PARAMS
+    )
+    return hashlib.sha1(json.dumps(shape).encode()).hexdigest()
+
+
+def search_generation():
+    """
+    Current generation of the cached search results
+    """
+    return cache.get_or_set(SEARCH_GENERATION_KEY, 0, None)
+
+
+def bump_search_generation():
+    """
+    Invalidate every cached search result: their keys hold the previous generation
+    """
+    try:
+        cache.incr(SEARCH_GENERATION_KEY)
+    except ValueError:  # Not set (or evicted)
+        cache.set(SEARCH_GENERATION_KEY, 1, None)
+
+
+def facet_counts(queryset, params, facets):
+    """
+    {facet name: [{"value", "label", "count"}]} of the `facets` param, over `queryset` filtered by the params
+
+    One aggregate query per facet, on settings.SEARCH_FACETS_DATABASE (the replica), cached
+    SEARCH_FACETS_CACHE_TIMEOUT seconds per filter shape, until the next search generation. The
+    counts are of distinct rows, the SEARCH_FACETS_LIMIT largest per facet.
+    """
+    requested = list_param(params, "facets")
+    unknown = set(requested) - set(facets)
+    if unknown:
+        raise ValueError("Unknown facets: %s, available: %s" % (", ".join(sorted(unknown)), ", ".join(facets)))
+
+    model = queryset.model
+    key_prefix = "search_facets:%s:%s:%s:" % (search_generation(), model._meta.label_lower, filter_shape(params))
+    counts = cache.get_many([key_prefix + name for name in requested])
+    for name in requested:
+        record_cache_lookup("search_facets", key_prefix + name in counts)
+
+    missing = [name for name in requested if key_prefix + name not in counts]
+    if missing:
+        # The facets group the matching rows, not the joins of the filters (Ex: topics__title=...)
+        queryset = queryset.using(settings.SEARCH_FACETS_DATABASE)
+        matching = filter_queryset(queryset, params.copy()).order_by().values("pk")
+        for name in missing:
+            facet = facets[name]
+            rows = (
+                model._default_manager.db_manager(settings.SEARCH_FACETS_DATABASE)
+                .filter(pk__in=matching)
+                .exclude(**{facet.field: None})
+                .values(value=F(facet.field), label=F(facet.label))
+                .annotate(count=Count("pk", distinct=True))
+                .order_by("-count", "label")[: settings.SEARCH_FACETS_LIMIT]
+            )
+            counts[key_prefix + name] = [
+                {"value": str(row["value"]), "label": row["label"], "count": row["count"]} for row in rows
+            ]
+            cache.set(key_prefix + name, counts[key_prefix + name], settings.SEARCH_FACETS_CACHE_TIMEOUT)
+
+    return {name: counts[key_prefix + name] for name in requested}
+
+
+def paginated_search(queryset, params, serializer_class, results_key, facets=None):
+    """
+    Page of `queryset` matching the search params, serialized with `serializer_class`
+
+    Params (besides the search ones, see settings.SEARCH_FILTERS):
+     * page, per_page: page based pagination (default 1, 100)
+     * cursor: keyset pagination by primary key (empty for the first page), see CustomModelQuerySet.cursor_page
+     * order_by: sort (default -created_at), not with `cursor`
+     * count=false: no total_count, saves the COUNT query of page based pagination
+     * ids_only=true: only the primary keys, under `<pk name>s`, without serializing or eager loading
+     * fields: only these serializer fields (comma separated or repeated), and their eager loading
+     * facets: counts of the matching rows per value of these `facets` (see facet_counts)
+
+    Returns {"pagination_info": ..., "facets": {...} (when requested), results_key: [...]}
+    """
+    ids_only = is_true(params.get("ids_only", False))
+    fields = requested_fields(params)
+    counts = facet_counts(queryset, params, facets or {}) if "facets" in params else None
+    if ids_only:
+        results_key = queryset.model._meta.pk.name + "s"
+    elif hasattr(serializer_class, "setup_eager_loading"):
+        queryset = serializer_class.setup_eager_loading(queryset, fields=fields)
+
+    queryset = filter_queryset(queryset, params)
+
+    if "cursor" in params:
+        return _with_facets(_cursor_page(queryset, params, serializer_class, results_key, ids_only, fields), counts)
+
+    queryset = queryset.order_by(params.get("order_by", "-created_at"))
+    if ids_only:
+        queryset = queryset.values_list("pk", flat=True)
+
+    total_count = None
+    try:
+        page = int(params.get("page", 1))
+        per_page = int(params.get("per_page", DEFAULT_PER_PAGE))
+        if is_true(params.get("count", True)):
+            paginator = Paginator(queryset, per_page)
+            total_count = paginator.count
+            results = paginator.page(page)
+            has_next, has_previous = results.has_next(), results.has_previous()
+        else:
+            results, has_next, has_previous = _uncounted_page(queryset, page, per_page)
+    except EmptyPage:
+        results, has_next, has_previous = queryset.none(), False, page > 1
+    except (ValueError, PageNotAnInteger):
+        raise PageNotAnInteger("Invalid value, per_page/page are integers only.")
+
+    results = [str(pk) for pk in results] if ids_only else serializer_class(results, many=True, fields=fields).data
+    pagination_serializer = PaginationSerializer(
+        data={
+            "page": page,
+            "page_count": len(results),
+            "total_count": total_count,
+            "has_next": has_next,
+            "has_previous": has_previous,
+        }
+    )
+    pagination_serializer.is_valid()
+    return _with_facets({"pagination_info": pagination_serializer.data, results_key: results}, counts)
+
+
+def _with_facets(response, counts):
+    """
+    Search response with the facet counts next to its pagination_info
+    """
+    if counts is None:
+        return response
+
+    pagination_info = response.pop("pagination_info")
+    return {"pagination_info": pagination_info, "facets": counts, **response}
+
+
+def _uncounted_page(queryset, page, per_page):
+    """
+    Page without the COUNT query: one extra row tells whether there is a next page
+    """
+    if page < 1 or per_page < 1:
+        raise EmptyPage("That page number is less than 1")
+
+    offset = (page - 1) * per_page
+    results = list(queryset[offset:offset + per_page + 1])
+    return results[:per_page], len(results) > per_page, page > 1
+
+
+def _cursor_page(queryset, params, serializer_class, results_key, ids_only, fields):
+    """
+    Page after `cursor`, ordered by primary key
+    """
+    if "order_by" in params or "page" in params:
+        raise ValueError(
+            "cursor pagination is ordered by %s, order_by and page are not supported" % queryset.model._meta.pk.name
+        )
+
+    if ids_only:
+        queryset = queryset.values_list("pk", flat=True)
+    results, next_cursor = queryset.cursor_page(params.get("cursor"), int(params.get("per_page", DEFAULT_PER_PAGE)))
+
+    results = [str(pk) for pk in results] if ids_only else serializer_class(results, many=True, fields=fields).data
+    pagination_serializer = CursorPaginationSerializer(data={"page_count": len(results), "next_cursor": next_cursor})
+    pagination_serializer.is_valid()
+    return {"pagination_info": pagination_serializer.data, results_key: results}
@@ -5,6 +5,20 @@ from django.db import IntegrityError
 from rest_framework import serializers
 from rest_framework.fields import CharField
 
+from api.core.metrics import SERIALIZER_TIME, observe
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer that records the time spent rendering `data` (many=True), the Meta.list_serializer_class
+    of the serializers
+    """
+
+    @property
+    def data(self):
+        with observe(SERIALIZER_TIME, serializer=self.child.__class__.__name__):
+            return super().data
+
 
 class BaseModelSerializer(serializers.ModelSerializer):
     """
@@ -16,9 +30,24 @@ class BaseModelSerializer(serializers.ModelSerializer):
     REPLACE_VALUES = ["*NULL*", "*NEW_LINE*", "*TAB_IND*"]
 
     def __init__(self, *args, **kwargs):
+        # Field projection, Ex: QuestionSerializer(question, fields=["question_id", "title"])
+        projection = kwargs.pop("fields", None)
+
         setattr(self.Meta, "extra_kwargs", self._preserve_white_spaces())
         super().__init__(*args, **kwargs)
 
+        if projection is not None:
+            unknown = set(projection) - set(self.fields)
+            if unknown:
+                raise ValueError("Unknown fields: %s" % ", ".join(sorted(unknown)))
+            for name in set(self.fields) - set(projection):
+                self.fields.pop(name)
+
+    @property
+    def data(self):
+        with observe(SERIALIZER_TIME, serializer=self.__class__.__name__):
+            return super().data
+
     @staticmethod
     def cleanse_chars(raw_value, check_values, replace_values):
         """
@@ -64,6 +93,12 @@ class BaseModelSerializer(serializers.ModelSerializer):
 class PaginationSerializer(serializers.Serializer):
     page = serializers.IntegerField(min_value=0, default=0)
     page_count = serializers.IntegerField(min_value=0, default=0)
-    total_count = serializers.IntegerField(min_value=0, default=0)
+    # None when the search is not counted (count=false)
+    total_count = serializers.IntegerField(min_value=0, default=0, allow_null=True)
     has_next = serializers.BooleanField(default=False)
     has_previous = serializers.BooleanField(default=False)
+
+
+class CursorPaginationSerializer(serializers.Serializer):
+    page_count = serializers.IntegerField(min_value=0, default=0)
+    next_cursor = serializers.CharField(allow_null=True, default=None)
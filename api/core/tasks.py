@@ -0,0 +1,16 @@
+"""
+Background tasks of roon service (config/celery_app.py)
+"""
+from celery import shared_task
+from django.db import transaction
+
+from api.core.counters import reconcile_counters
+
+
+@shared_task(name="core.reconcile_counters")
+def reconcile_counters_task():
+    """
+    Recount the drifted denormalized counters, returns {counter name: number of drifted rows}
+    """
+    with transaction.atomic():
+        return reconcile_counters()
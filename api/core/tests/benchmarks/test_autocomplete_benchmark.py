@@ -0,0 +1,46 @@
+"""
+Benchmark the autocomplete prefix index on 100k titles
+"""
+import logging
+import random
+import timeit
+from datetime import datetime
+
+import pytest
+
+from api.core.autocomplete import PrefixIndex
+from api.core.benchmarks.corpus import WORDS
+
+LOGGER = logging.getLogger("roon")
+
+
+class SyntheticSource(object):
+    def __init__(self, kind, titles):
+        self.kind = kind
+        self.titles = titles
+
+    def rows(self, since=None):
+        return [(i, title, i % 50, True, datetime(2022, 1, 1)) for i, title in enumerate(self.titles)]
+
+
+@pytest.mark.benchmark
+def test_autocomplete_search():
+    """
+    Ensure every prefix search of a 100k titles index finds titles (timings logged)
+    """
+    rng = random.Random(7)
+    titles = [" ".join(rng.choices(WORDS, k=6)) for _ in range(100000)]
+    index = PrefixIndex(top_k=10, ranked_prefix_length=3, scan_limit=2000, memory_budget=10**9)
+    index.build(sources=[SyntheticSource("question", titles)])
+
+    prefixes = [title[:length] for title in rng.sample(titles, 200) for length in (1, 3, 5, 8, 12)]
+    searches = len(prefixes) * 5
+    duration = min(timeit.repeat(lambda: [index.search(prefix) for prefix in prefixes], number=5, repeat=3))
+
+    LOGGER.info(
+        "Autocomplete: %.4fms per search, %s entries, %s bytes",
+        duration / searches * 1000,
+        len(index.entries),
+        index.memory,
+    )
+    assert all(index.search(prefix) for prefix in prefixes)
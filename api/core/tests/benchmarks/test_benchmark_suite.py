@@ -0,0 +1,44 @@
+"""
+Tests for the benchmark suite
+"""
+import pytest
+
+from api.core.benchmarks import load_benchmarks
+from api.core.benchmarks.base import BENCHMARKS, build_report, find_regressions, run_benchmarks
+from api.core.benchmarks.corpus import seed_corpus
+from api.questions.models import Question
+from api.users.tests.factories import UserFactory
+
+
+def test_find_regressions():
+    """
+    Ensure only benchmarks slower than the threshold are flagged
+    """
+    baseline = {"results": {"fast": {"median": 10.0}, "slow": {"median": 10.0}, "removed": {"median": 1.0}}}
+    results = {"fast": {"median": 11.0}, "slow": {"median": 13.0}, "new": {"median": 5.0}}
+
+    assert find_regressions(results, baseline, threshold=0.2) == {
+        "slow": {"baseline": 10.0, "current": 13.0, "change": 0.3}
+    }
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_run_benchmarks_on_small_corpus():
+    """
+    Ensure every registered benchmark runs against a seeded corpus
+    """
+    corpus = seed_corpus(questions=50, answers_per_question=2, topics=5, tags=10)
+    corpus.user = UserFactory()
+    corpus.load_samples()
+    assert Question.objects.count() == 50
+
+    load_benchmarks()
+    results = run_benchmarks(corpus, rounds=1, warmup=0)
+
+    assert set(results.keys()) == set(BENCHMARKS.keys())
+    assert {"questions_search.advanced", "questions_info", "topics_info", "questions.serialization"}.issubset(results)
+
+    report = build_report(results, corpus=corpus.as_dict())
+    assert report["meta"]["corpus"]["questions"] == 50
+    assert not find_regressions(results, report)
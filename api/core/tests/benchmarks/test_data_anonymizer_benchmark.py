@@ -0,0 +1,66 @@
+"""
+Benchmark DataAnonymizer on large JSON bodies
+
+Compares the compiled, copy-on-write anonymizer with the previous
+deepcopy-per-level implementation.
+"""
+import copy
+import timeit
+
+import pytest
+
+from api.core.data_anonymizer import DataAnonymizer
+
+FIELDS = ["password", "mfa", "key", "vendor", "current_password", "token"]
+
+
+def legacy_run(data, anonymize_fields):
+    """
+    Previous implementation: deepcopy at every recursion level and list membership
+    """
+    data = copy.deepcopy(data)
+
+    for key in data:
+        if isinstance(data[key], dict):
+            data[key] = legacy_run(data[key], anonymize_fields)
+        elif key in anonymize_fields:
+            data[key] = "Anonymized Data"
+
+    return data
+
+
+def large_body(questions=2000):
+    """
+    JSON body shaped like a questions_search response, with a few sensitive keys
+    """
+    return {
+        "pagination_info": {"page": 1, "page_count": questions, "total_count": questions},
+        "token": "secret",
+        "questions": {
+            str(i): {
+                "question_id": str(i),
+                "title": "Question title %s" % i,
+                "context": "Context " * 20,
+                "owner": {"email": "user%s@roon.com" % i, "key": "secret"},
+                "topics": {str(t): {"topic_id": str(t), "title": "topic %s" % t} for t in range(3)},
+            }
+            for i in range(questions)
+        },
+    }
+
+
+@pytest.mark.benchmark
+def test_anonymizer_large_json_benchmark():
+    """
+    Ensure the compiled anonymizer is faster than the deepcopy implementation
+    """
+    body = large_body()
+    anonymizer = DataAnonymizer(anonymize_fields=FIELDS)
+    legacy_fields = list(FIELDS)
+
+    assert anonymizer.run(body) == legacy_run(body, legacy_fields)
+
+    compiled = min(timeit.repeat(lambda: anonymizer.run(body), number=3, repeat=3))
+    legacy = min(timeit.repeat(lambda: legacy_run(body, legacy_fields), number=3, repeat=3))
+
+    assert compiled < legacy, "DataAnonymizer large JSON: compiled=%.4fs legacy=%.4fs" % (compiled, legacy)
@@ -0,0 +1,74 @@
+"""
+Tests for the EXPLAIN report of the API query shapes
+"""
+import pytest
+
+from api.core.benchmarks import load_benchmarks
+from api.core.benchmarks.corpus import seed_corpus
+from api.core.benchmarks.explain import explain_benchmarks, parse_postgresql_plan, parse_sqlite_plan
+from api.users.tests.factories import UserFactory
+
+
+def test_parse_postgresql_plan():
+    """
+    Ensure index and sequential scans are found in nested plan nodes
+    """
+    plan = [
+        {
+            "Plan": {
+                "Node Type": "Nested Loop",
+                "Plans": [
+                    {
+                        "Node Type": "Index Scan",
+                        "Index Name": "question_active_created_idx",
+                        "Relation Name": "question",
+                    },
+                    {"Node Type": "Sort", "Plans": [{"Node Type": "Seq Scan", "Relation Name": "question_topic"}]},
+                ],
+            }
+        }
+    ]
+
+    result = parse_postgresql_plan("SELECT 1", plan)
+    assert result.indexes == ["question_active_created_idx"]
+    assert result.full_scans == ["question_topic"]
+    assert result.sorts
+    assert not result.uses_index
+
+
+def test_parse_sqlite_plan():
+    """
+    Ensure SEARCH/SCAN ... USING INDEX are index reads and a bare SCAN is a full scan
+    """
+    rows = [
+        (3, 0, 0, "SCAN question USING INDEX question_active_created_idx"),
+        (7, 0, 0, "SEARCH T4 USING INTEGER PRIMARY KEY (rowid=?)"),
+        (9, 0, 0, "SEARCH answer USING COVERING INDEX answer_question_active_idx (question_id=?)"),
+    ]
+    result = parse_sqlite_plan("SELECT 1", rows)
+    assert result.indexes == ["T4 (integer primary key)", "answer_question_active_idx", "question_active_created_idx"]
+    assert result.uses_index
+
+    result = parse_sqlite_plan("SELECT 1", [(2, 0, 0, "SCAN question"), (5, 0, 0, "USE TEMP B-TREE FOR ORDER BY")])
+    assert result.full_scans == ["question"]
+    assert result.sorts
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_explain_benchmarks_use_query_pattern_indexes():
+    """
+    Ensure the searches read the partial (created_at DESC) WHERE is_active index and answers their composite index
+    """
+    corpus = seed_corpus(questions=50, answers_per_question=2, topics=5, tags=10)
+    corpus.user = UserFactory()
+    corpus.load_samples()
+
+    load_benchmarks()
+    plans = explain_benchmarks(corpus, names=["questions_search.plain", "topics_info"])
+
+    assert {"questions_search.plain", "topics_info", "topics_info.ids_only"} == set(plans)
+    indexes = {index for plan in plans["questions_search.plain"] for index in plan["indexes"]}
+    assert {"question_active_created_idx", "answer_question_active_idx"}.issubset(indexes)
+    assert not any("question" in plan["full_scans"] for plan in plans["questions_search.plain"])
+    assert all("question_topics_topic_question_idx" in plan["indexes"] for plan in plans["topics_info.ids_only"])
@@ -0,0 +1,43 @@
+"""
+Benchmark random (uuid4) vs time ordered (uuid7) primary keys
+
+Same rows in both tables, the uuid4 one also needs the `created_at` index to page by creation order.
+"""
+import logging
+import time
+
+import pytest
+
+from api.core.benchmarks.keys import RandomKeyRow, TimeOrderedKeyRow, create_key_tables, index_size, insert_rows
+
+LOGGER = logging.getLogger("roon")
+
+ROWS = 20000
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_time_ordered_keys_insert_and_index_size_benchmark():
+    """
+    Ensure the uuid7 table's indexes are smaller than the uuid4 table's
+    """
+    create_key_tables()
+
+    timings = {}
+    for model in (RandomKeyRow, TimeOrderedKeyRow):
+        start = time.perf_counter()
+        for _ in range(ROWS // 1000):
+            insert_rows(model, 1000)
+        timings[model] = time.perf_counter() - start
+
+    random_size, ordered_size = index_size(RandomKeyRow), index_size(TimeOrderedKeyRow)
+    LOGGER.info(
+        "%s rows: uuid4 %.0f rows/s, %s index bytes | uuid7 %.0f rows/s, %s index bytes",
+        ROWS,
+        ROWS / timings[RandomKeyRow],
+        random_size,
+        ROWS / timings[TimeOrderedKeyRow],
+        ordered_size,
+    )
+    assert RandomKeyRow.objects.count() == TimeOrderedKeyRow.objects.count() == ROWS
+    assert ordered_size < random_size
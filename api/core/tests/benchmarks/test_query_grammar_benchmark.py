@@ -0,0 +1,82 @@
+"""
+Fuzz the ADVANCED search grammar and check its parse time stays linear in the query size
+"""
+import json
+import logging
+import random
+import timeit
+
+import pytest
+from django.test import override_settings
+
+from api.core.exceptions import SearchWithOperatorException
+from api.core.query_grammar import OPERATIONS, compile_query, parse_query
+
+LOGGER = logging.getLogger("roon")
+
+FIELDS = ["title", "context", "answer_count", "created_at"]
+VALUES = ["What", "$tumor", ">=2", "<5", "NULL", 3, None, True]
+
+
+def random_term(rng, terms, depth):
+    """
+    Random grammar term of about `terms` lookups, at most `depth` operations deep
+    """
+    if terms <= 1 or depth <= 1:
+        if rng.random() < 0.2:
+            return {"_IN": {rng.choice(FIELDS): [rng.choice(VALUES) for _ in range(rng.randint(1, 5))]}}
+        return {rng.choice(FIELDS): rng.choice(VALUES)}
+
+    children = rng.randint(2, 4)
+    return {
+        rng.choice(OPERATIONS): [random_term(rng, terms // children, depth - 1) for _ in range(children)]
+    }
+
+
+def random_documents(rng, terms, depth=6):
+    return tuple(json.dumps(random_term(rng, terms, depth)) for _ in range(4))
+
+
+def parse_time(documents_list):
+    parse = parse_query.__wrapped__
+    return min(
+        timeit.repeat(lambda: [compile_query(parse("_OR", documents)) for documents in documents_list], number=3)
+    )
+
+
+@pytest.mark.benchmark
+@override_settings(ADVANCED_SEARCH_MAX_NODES=100000, ADVANCED_SEARCH_MAX_LENGTH=10000000)
+def test_query_grammar_fuzz_parse_time_is_linear():
+    """
+    Ensure random queries parse (or are rejected) and the parse time grows linearly with their size
+    """
+    rng = random.Random(42)
+
+    # Fuzz: random and mangled documents are parsed or rejected, nothing else
+    for _ in range(500):
+        documents = random_documents(rng, rng.randint(1, 50))
+        if rng.random() < 0.3:
+            cut = rng.randint(0, len(documents[0]))
+            documents = (documents[0][:cut] + documents[0][cut + 1:],) + documents[1:]
+        try:
+            compile_query(parse_query.__wrapped__(rng.choice(OPERATIONS), documents))
+        except SearchWithOperatorException:
+            pass
+
+    small = [random_documents(rng, 64) for _ in range(20)]
+    large = [random_documents(rng, 64 * 16) for _ in range(20)]
+    size = sum(len(document) for documents in small for document in documents)
+    large_size = sum(len(document) for documents in large for document in documents)
+
+    small_time, large_time = parse_time(small), parse_time(large)
+    LOGGER.info(
+        "Query grammar: %s chars in %.4fs, %s chars in %.4fs (%.1fx size, %.1fx time)",
+        size,
+        small_time,
+        large_size,
+        large_time,
+        large_size / size,
+        large_time / small_time,
+    )
+    # Linear, with room for noise: quadratic parsing would be ~16x slower again
+    assert large_time / small_time < 3 * large_size / size
@@ -0,0 +1,63 @@
+"""
+Benchmark the similar questions index at 100k and 1M questions
+"""
+import logging
+import random
+import timeit
+
+import numpy as np
+import pytest
+
+from api.core.benchmarks.corpus import WORDS
+from api.questions.similarity import SimilarityIndex
+
+LOGGER = logging.getLogger("roon")
+
+
+def _index(size, rng):
+    index = SimilarityIndex(permutations=64, bands=16, batch_size=65536)
+    for i in range(size):
+        index.add(i, " ".join(rng.choices(WORDS, k=8)), " ".join(rng.choices(WORDS, k=12)))
+    return index
+
+
+def _tile(index, size):
+    """
+    The index repeated up to `size` rows, with the ids of the copies
+    """
+    repeats = -(-size // index.size)
+    index.signatures = np.tile(index.signatures[: index.size], (repeats, 1))[:size]
+    index.band_table = np.tile(index.band_table[: index.size], (repeats, 1))[:size]
+    index.alive = np.ones(size, dtype=bool)
+    index.ids = [str(i) for i in range(size)]
+    index.positions = {question_id: position for position, question_id in enumerate(index.ids)}
+    index.size = size
+    return index
+
+
+@pytest.mark.benchmark
+def test_similar_questions_scoring():
+    """
+    Ensure a similar questions lookup scores 1M questions about linearly from 100k (timings logged)
+    """
+    rng = random.Random(7)
+    index = _index(100000, rng)
+    queries = [" ".join(rng.choices(WORDS, k=8)) for _ in range(20)]
+    duplicate = index.ids[123]
+
+    durations = {}
+    for size in (100000, 1000000):
+        if size > index.size:
+            index = _tile(index, size)
+        durations[size] = min(timeit.repeat(lambda: [index.similar(query) for query in queries], number=1, repeat=3))
+        durations[size] /= len(queries)
+        LOGGER.info(
+            "Similar questions: %.3fms per lookup, %s questions, %s bytes",
+            durations[size] * 1000,
+            size,
+            index.signatures.nbytes + index.band_table.nbytes,
+        )
+
+    # The copies of a question are its exact duplicates
+    assert len(index.similar(question_id=duplicate, threshold=0.99, limit=20)) == 9
+    assert durations[1000000] < 15 * durations[100000]
@@ -0,0 +1,72 @@
+"""
+Tests for the JWT authentication against the Auth Service stub (utility/loadtest)
+"""
+import threading
+
+import pytest
+import requests
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+
+from api.core.auth_mechanisms.auth_backends import RoonJSONWebTokenAuthentication
+from utility.loadtest.auth_stub import AuthStubConfig, make_server
+
+FACTORY = APIRequestFactory()
+
+
+@pytest.fixture
+def auth_service(monkeypatch):
+    config = AuthStubConfig(settings.SECRET_KEY, groups=["staff"])
+    server = make_server(config, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    url = "http://127.0.0.1:%s/api/v1/" % server.server_address[1]
+    monkeypatch.setattr("api.core.auth_mechanisms.utils.jwt_auth_url", url)
+    yield url, config
+
+    server.shutdown()
+    server.server_close()
+
+
+def obtain_token(url, email):
+    return requests.post(url + "tokens/obtain/", json={"email": email, "password": "pass"}).json()["token"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("is_async", [False, True])
+def test_jwt_authentication(auth_service, is_async):
+    """
+    Ensure tokens are verified with the Auth Service and mapped to a local user with the token groups
+    """
+    url, config = auth_service
+    token = obtain_token(url, "jwt@roon.com")
+    authentication = RoonJSONWebTokenAuthentication()
+    request = FACTORY.get("/", HTTP_AUTHORIZATION="JWT " + token)
+
+    if is_async:
+        user, auth = async_to_sync(authentication.aauthenticate)(request)
+    else:
+        user, auth = authentication.authenticate(request)
+
+    assert auth == token
+    assert user.email == "jwt@roon.com"
+    assert user.username == config.user_for_email("jwt@roon.com")["user_id"]
+    assert list(user.groups.values_list("name", flat=True)) == ["staff"]
+    assert config.calls["verify"] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("is_async", [False, True])
+def test_jwt_authentication_failures(auth_service, is_async):
+    """
+    Ensure requests without a token are skipped and invalid tokens are rejected
+    """
+    authentication = RoonJSONWebTokenAuthentication()
+    authenticate = async_to_sync(authentication.aauthenticate) if is_async else authentication.authenticate
+
+    assert authenticate(FACTORY.get("/")) is None
+
+    with pytest.raises(exceptions.AuthenticationFailed):
+        authenticate(FACTORY.get("/", HTTP_AUTHORIZATION="JWT not-a-token"))
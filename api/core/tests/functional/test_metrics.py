@@ -0,0 +1,32 @@
+"""
+Tests for the metrics endpoint
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+def test_metrics_records_view_latency(client):
+    """
+    Ensure requests are recorded per resolved view name and exposed at /metrics
+    """
+    heartbeat = client.get(reverse("heartbeat"))
+    assert heartbeat.status_code == status.HTTP_200_OK
+    assert heartbeat.duration >= 0
+
+    result = client.get(reverse("metrics"))
+    assert result.status_code == status.HTTP_200_OK
+    assert result["Content-Type"].startswith("text/plain")
+
+    body = result.content.decode()
+    assert 'roon_request_latency_seconds_count{method="GET",status="200",view="heartbeat"}' in body
+    assert 'roon_request_db_queries_count{view="heartbeat"}' in body
+
+
+@pytest.mark.django_db
+def test_metrics_url():
+    """
+    Ensure metrics are served at /metrics, where Prometheus scrapes by default
+    """
+    assert reverse("metrics") == "/metrics"
@@ -0,0 +1,114 @@
+"""
+Tests for the async views, async exception handling and async middleware
+"""
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework import status
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.decorators import authentication_classes
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from api.core.async_views import async_api_view
+from api.core.exceptions import MissingParameterException
+from api.core.middleware import MetricsMiddleware, QueryInstrumentationMiddleware
+from api.core.view_exception_handler import view_exception_handling
+from api.users.tests.factories import UserFactory
+
+FACTORY = APIRequestFactory()
+
+
+class AsyncTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates the "async" token, only through aauthenticate
+    """
+
+    user = None
+
+    def authenticate(self, request):
+        raise AssertionError("Async views must await aauthenticate")
+
+    async def aauthenticate(self, request):
+        if request.META.get("HTTP_AUTHORIZATION") == "Token async":
+            return self.user, "async"
+        return None
+
+
+@view_exception_handling()
+@async_api_view(["GET"])
+@authentication_classes([AsyncTokenAuthentication])
+async def echo(request, value=None):
+    if value is None:
+        raise MissingParameterException("value is required")
+    return Response({"value": value, "user": request.user.username})
+
+
+def test_async_api_view_is_a_coroutine_function():
+    """
+    Ensure Django sees a coroutine function, outside of ATOMIC_REQUESTS transactions
+    """
+    assert asyncio.iscoroutinefunction(echo)
+    assert echo.csrf_exempt
+    assert "default" in echo._non_atomic_requests
+    assert set(echo.cls.http_method_names) == {"get", "options"}
+
+
+@pytest.mark.django_db
+def test_async_api_view_awaits_aauthenticate():
+    """
+    Ensure authenticators are awaited and unauthenticated requests are rejected
+    """
+    AsyncTokenAuthentication.user = UserFactory()
+
+    response = async_to_sync(echo)(FACTORY.get("/", HTTP_AUTHORIZATION="Token async"), value="1")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"value": "1", "user": AsyncTokenAuthentication.user.username}
+
+    response = async_to_sync(echo)(FACTORY.get("/"), value="1")
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+    response = async_to_sync(echo)(FACTORY.post("/", HTTP_AUTHORIZATION="Token async"), value="1")
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+@pytest.mark.django_db
+def test_async_view_exception_handling():
+    """
+    Ensure exceptions of async views are handled like the sync ones
+    """
+    AsyncTokenAuthentication.user = UserFactory()
+
+    response = async_to_sync(echo)(FACTORY.get("/", HTTP_AUTHORIZATION="Token async"))
+
+    assert response.status_code == status.HTTP_428_PRECONDITION_REQUIRED
+    assert "value is required" in str(response.data)
+
+
+@pytest.mark.django_db
+def test_async_middleware_records_queries_of_other_threads():
+    """
+    Ensure queries run through sync_to_async (other threads, other connections) are recorded
+    """
+
+    def query():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    async def get_response(request):
+        await sync_to_async(query, thread_sensitive=False)()
+        await sync_to_async(query)()
+        return HttpResponse()
+
+    middleware = MetricsMiddleware(QueryInstrumentationMiddleware(get_response))
+    assert asyncio.iscoroutinefunction(middleware)
+
+    request = RequestFactory().get("/")
+    response = async_to_sync(middleware)(request)
+
+    assert request.query_stats.count == 2
+    assert response.duration >= 0
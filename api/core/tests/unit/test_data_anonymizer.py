@@ -0,0 +1,97 @@
+"""
+Unit tests for DataAnonymizer
+"""
+from api.core.data_anonymizer import DataAnonymizer, cleanse_data, get_anonymizer
+
+ANON = DataAnonymizer.ANONYMIZE_STRING
+
+
+def test_anonymize_nested_dicts_and_lists():
+    """
+    Ensure matching keys are anonymized in nested dicts and lists of dicts
+    """
+    anonymizer = DataAnonymizer(anonymize_fields=["password", "token"])
+    data = {
+        "title": "question",
+        "password": "secret",
+        "user": {"email": "user@roon.com", "token": "abc"},
+        "items": [{"token": "abc"}, {"title": "safe"}, "plain"],
+    }
+
+    assert anonymizer.run(data) == {
+        "title": "question",
+        "password": ANON,
+        "user": {"email": "user@roon.com", "token": ANON},
+        "items": [{"token": ANON}, {"title": "safe"}, "plain"],
+    }
+
+
+def test_anonymize_list_and_dict_values():
+    """
+    Ensure matching keys are anonymized whatever their value, as the lists of query strings and form bodies
+    """
+    anonymizer = DataAnonymizer(anonymize_fields=["password", "token"])
+    data = {"password": ["hunter2"], "token": {"value": "abc"}, "title": ["question"]}
+
+    assert anonymizer.run(data) == {"password": ANON, "token": ANON, "title": ["question"]}
+
+
+def test_original_data_is_not_changed():
+    """
+    Ensure run copies only the changed branches and never mutates its input
+    """
+    anonymizer = DataAnonymizer(anonymize_fields=["password"])
+    untouched = {"title": "safe"}
+    data = {"untouched": untouched, "user": {"password": "secret"}, "items": [untouched]}
+
+    result = anonymizer.run(data)
+
+    assert data == {"untouched": {"title": "safe"}, "user": {"password": "secret"}, "items": [{"title": "safe"}]}
+    assert result is not data
+    assert result["untouched"] is untouched
+    assert result["items"] is data["items"]
+    assert result["user"] == {"password": ANON}
+
+
+def test_unchanged_data_is_returned_as_is():
+    """
+    Ensure no copy is made when nothing is anonymized
+    """
+    data = {"title": "safe", "nested": [{"context": "safe"}]}
+
+    assert DataAnonymizer(anonymize_fields=["password"]).run(data) is data
+
+
+def test_prefixed_fields():
+    """
+    Ensure prefix + field combinations are anonymized
+    """
+    anonymizer = DataAnonymizer(anonymize_fields=["email"], field_prefix=["owner__"])
+
+    assert anonymizer.run({"owner__email": "a@b.com", "email": "a@b.com", "owner__name": "name"}) == {
+        "owner__email": ANON,
+        "email": ANON,
+        "owner__name": "name",
+    }
+
+
+def test_shared_field_list_is_not_extended():
+    """
+    Ensure instances never grow the class level field list
+    """
+    DataAnonymizer(anonymize_fields=["email"], field_prefix=["owner__"])
+    DataAnonymizer(anonymize_fields=["email"], field_prefix=["owner__"])
+
+    assert DataAnonymizer.ANONYMIZE_FIELDS == ()
+
+
+def test_cleanse_data_uses_compiled_settings(settings):
+    """
+    Ensure cleanse_data uses the anonymizer compiled from settings
+    """
+    settings.ANONYMIZE_API_VALUES = ["password"]
+    settings.ANONYMIZE_API_PREFIX_VALUES = []
+
+    assert get_anonymizer() is get_anonymizer()
+    assert cleanse_data({"password": "secret", "key": "value"}) == {"password": ANON, "key": "value"}
+    assert cleanse_data({"key": "value"}, fields=["key"]) == {"key": ANON}
@@ -0,0 +1,258 @@
+"""
+Tests for the OperationalError retries and the database circuit breaker
+"""
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Group
+from django.core.handlers.base import BaseHandler
+from django.db import connection
+from django.db.utils import OperationalError
+from django.test import override_settings
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from api.core.async_views import async_api_view
+from api.core.db_retry import DATABASE_CIRCUIT, CircuitBreaker
+from api.core.exceptions import HTTP409ResponseException
+from api.core.view_exception_handler import view_exception_handling
+
+FACTORY = APIRequestFactory()
+CALLS = []
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit():
+    DATABASE_CIRCUIT.reset()
+    CALLS.clear()
+    yield
+    DATABASE_CIRCUIT.reset()
+
+
+def _fail_then_succeed(failures):
+    CALLS.append(1)
+    if len(CALLS) <= failures:
+        raise OperationalError("server has gone away")
+    return Response({"calls": len(CALLS)})
+
+
+@view_exception_handling()
+@api_view(["GET", "POST"])
+@authentication_classes([])
+@permission_classes([])
+def flaky(request):
+    return _fail_then_succeed(int(request.query_params.get("failures", 0)))
+
+
+@view_exception_handling()
+@async_api_view(["GET"])
+@authentication_classes([])
+@permission_classes([])
+async def async_flaky(request):
+    return _fail_then_succeed(int(request.query_params.get("failures", 0)))
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(MAX_RETRIES=3, DB_RETRY_BASE_DELAY=0.01, DB_RETRY_MAX_DELAY=0.02)
+def test_get_retried_with_backoff():
+    """
+    Ensure idempotent requests are retried in a loop, sleeping a jittered exponential backoff
+    """
+    recovered = _sample("roon_db_retry_outcomes_total", view="flaky", outcome="recovered")
+
+    with mock.patch("api.core.view_exception_handler.time.sleep") as sleep:
+        response = flaky(FACTORY.get("/", {"failures": 2}))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"calls": 3}
+    assert sleep.call_count == 2
+    assert all(0 <= call.args[0] <= 0.02 for call in sleep.call_args_list)
+    assert _sample("roon_db_retry_outcomes_total", view="flaky", outcome="recovered") == recovered + 1
+
+
+@override_settings(MAX_RETRIES=2, DB_RETRY_BASE_DELAY=0)
+def test_retries_exhausted():
+    """
+    Ensure views give up after MAX_RETRIES with a 503 and Retry-After
+    """
+    retries = _sample("roon_db_retries_total", view="flaky")
+
+    response = flaky(FACTORY.get("/", {"failures": 10}))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response["Retry-After"] == "1"
+    assert len(CALLS) == 3
+    assert _sample("roon_db_retries_total", view="flaky") == retries + 2
+
+
+@override_settings(DB_RETRY_BASE_DELAY=10, DB_RETRY_MAX_DELAY=10, DB_RETRY_DEADLINE=0.001)
+def test_retry_deadline():
+    """
+    Ensure no retry waits past the deadline
+    """
+    with mock.patch("api.core.view_exception_handler.time.sleep") as sleep, mock.patch(
+        "api.core.db_retry.random.uniform", return_value=5
+    ):
+        response = flaky(FACTORY.get("/", {"failures": 1}))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert not sleep.called
+    assert len(CALLS) == 1
+
+
+def test_post_not_retried():
+    """
+    Ensure a write that may have committed is not replayed
+    """
+    response = flaky(FACTORY.post("/?failures=1"))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert len(CALLS) == 1
+
+
+@pytest.mark.django_db
+def test_broken_transaction_not_retried():
+    """
+    Ensure a request whose transaction was broken by the error is not replayed, even a GET
+    """
+
+    @view_exception_handling()
+    @api_view(["GET"])
+    @authentication_classes([])
+    @permission_classes([])
+    def in_transaction(request):
+        CALLS.append(1)
+        connection.errors_occurred = True
+        raise OperationalError("server has gone away")
+
+    assert connection.in_atomic_block
+    response = in_transaction(FACTORY.get("/"))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert len(CALLS) == 1
+
+
+@view_exception_handling()
+@api_view(["GET", "POST"])
+@authentication_classes([])
+@permission_classes([])
+def flaky_write(request):
+    Group.objects.create(name="attempt %s" % len(CALLS))
+    CALLS.append(1)
+    with connection.cursor() as cursor:
+        # A real database error on the first attempt
+        cursor.execute("SELECT count(*) FROM %s" % ("missing_table" if len(CALLS) == 1 else "auth_group"))
+        return Response({"groups": cursor.fetchone()[0]})
+
+
+@pytest.fixture
+def atomic_requests(monkeypatch):
+    monkeypatch.setitem(connection.settings_dict, "ATOMIC_REQUESTS", True)
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(DB_RETRY_BASE_DELAY=0)
+def test_get_retried_with_atomic_requests(atomic_requests):
+    """
+    Ensure GETs are retried under ATOMIC_REQUESTS, each attempt in its own transaction rolled back on failure
+    """
+    assert BaseHandler().make_view_atomic(flaky_write) is flaky_write
+
+    response = flaky_write(FACTORY.get("/"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(CALLS) == 2
+    assert response.data == {"groups": 1}
+    assert list(Group.objects.values_list("name", flat=True)) == ["attempt 1"]
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(DB_RETRY_BASE_DELAY=0)
+def test_post_not_retried_with_atomic_requests(atomic_requests):
+    """
+    Ensure a write whose statements reached the database is not replayed, its transaction rolled back
+    """
+    response = flaky_write(FACTORY.post("/"))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert len(CALLS) == 1
+    assert not Group.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_handled_exception_commits_with_atomic_requests(atomic_requests):
+    """
+    Ensure the writes of a view answering an exception commit, like Django's ATOMIC_REQUESTS transaction
+    """
+
+    @view_exception_handling()
+    @api_view(["POST"])
+    @authentication_classes([])
+    @permission_classes([])
+    def conflict(request):
+        Group.objects.create(name="written")
+        raise HTTP409ResponseException("Conflict")
+
+    response = conflict(FACTORY.post("/"))
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert list(Group.objects.values_list("name", flat=True)) == ["written"]
+
+
+@override_settings(DB_RETRY_BASE_DELAY=0)
+def test_async_get_retried():
+    response = async_to_sync(async_flaky)(FACTORY.get("/", {"failures": 1}))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"calls": 2}
+
+
+@override_settings(MAX_RETRIES=0, DB_CIRCUIT_FAILURE_THRESHOLD=3, DB_CIRCUIT_RESET_TIMEOUT=30)
+def test_circuit_sheds_load():
+    """
+    Ensure the open circuit answers 503 without calling the views
+    """
+    rejections = _sample("roon_db_circuit_rejections_total", view="flaky")
+    for _ in range(3):
+        flaky(FACTORY.get("/", {"failures": 10}))
+    assert DATABASE_CIRCUIT.is_open()
+    assert _sample("roon_circuit_state", circuit="database") == 2
+
+    response = flaky(FACTORY.get("/"))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert 1 <= int(response["Retry-After"]) <= 30
+    assert len(CALLS) == 3
+    assert _sample("roon_db_circuit_rejections_total", view="flaky") == rejections + 1
+
+
+def test_circuit_half_open_trial():
+    """
+    Ensure one trial call goes through after the reset timeout, closing or opening the circuit again
+    """
+    circuit = CircuitBreaker("test", failure_threshold=2, window=60, reset_timeout=5)
+    with mock.patch("api.core.db_retry.time.monotonic", return_value=100):
+        circuit.record_failure()
+        assert circuit.allow()
+        circuit.record_failure()
+        assert not circuit.allow()
+
+    with mock.patch("api.core.db_retry.time.monotonic", return_value=105):
+        assert circuit.allow()
+        assert not circuit.allow()
+        circuit.record_failure()
+        assert circuit.is_open()
+        assert circuit.retry_after() == 5
+
+    with mock.patch("api.core.db_retry.time.monotonic", return_value=110):
+        assert circuit.allow()
+        circuit.record_success()
+        assert circuit.state == circuit.CLOSED
+        assert circuit.allow()
@@ -0,0 +1,136 @@
+"""
+Tests for the request deadlines: statement timeouts, downstream timeouts and the 504 response
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+import requests
+from django.db import connection
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from api.core.deadlines import (
+    Deadline,
+    _DEADLINE,
+    enforce_deadline,
+    get_view_deadline,
+    request_deadline,
+    timeout,
+    view_deadline,
+)
+from api.core.exceptions import DeadlineExceeded
+from api.core.view_exception_handler import view_exception_handling
+
+FACTORY = APIRequestFactory()
+SLOW_QUERY = (
+    "WITH RECURSIVE numbers(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM numbers WHERE x < 100000000) "
+    "SELECT count(*) FROM numbers"
+)
+
+
+@view_exception_handling()
+@view_deadline(0.05)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([])
+def slow_query(request):
+    with connection.cursor() as cursor:
+        cursor.execute(SLOW_QUERY)
+        return Response({"count": cursor.fetchone()[0]})
+
+
+@view_exception_handling()
+@view_deadline(0.01)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([])
+def slow_service(request):
+    service_timeout = timeout(5)
+    # The Service call outlives the deadline
+    _DEADLINE.get().expires_at = 0
+    requests.get("http://auth.invalid/", timeout=service_timeout)
+
+
+@pytest.mark.django_db
+def test_statement_cancelled_at_deadline():
+    """
+    Ensure a query running past the view deadline is interrupted, and answered with a structured 504
+    """
+    response = slow_query(FACTORY.get("/"))
+
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert response.data["success"] is False
+    assert response.data["internal_code"] == "deadline_exceeded"
+    assert response.data["deadline"] == 0.05
+    # The connection is usable again, without deadline
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+@pytest.mark.django_db
+def test_statement_after_deadline_not_executed():
+    with request_deadline(1) as deadline:
+        deadline.expires_at = 0
+        with pytest.raises(DeadlineExceeded), connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+
+def test_downstream_timeout_bounded_by_deadline():
+    """
+    Ensure Service calls time out at the deadline, and their timeouts past it are answered 504
+    """
+    assert timeout(5) == 5
+    with request_deadline(2):
+        assert 1.9 < timeout(5) <= 2
+        assert timeout(1) == 1
+
+    with mock.patch("requests.get", side_effect=requests.ReadTimeout) as get:
+        response = slow_service(FACTORY.get("/"))
+
+    assert 0 < get.call_args.kwargs["timeout"] <= 0.01
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert response.data["internal_code"] == "deadline_exceeded"
+
+
+@override_settings(VIEW_DEADLINE_DEFAULT=20, VIEW_DEADLINES={"questions:search": 5})
+def test_view_deadline_resolution():
+    search = SimpleNamespace(resolver_match=SimpleNamespace(view_name="questions:search"))
+    other = SimpleNamespace(resolver_match=SimpleNamespace(view_name="questions:info"))
+
+    assert get_view_deadline(lambda request: None, search) == 5
+    assert get_view_deadline(lambda request: None, other) == 20
+    assert get_view_deadline(slow_query.__wrapped__, search) == 0.05
+    assert get_view_deadline(view_deadline(None)(lambda request: None), search) is None
+
+
+def test_postgresql_statement_timeout():
+    """
+    Ensure statement_timeout is set once per deadline, tightened as the budget runs out, and reset after it
+    """
+    raw_cursor = mock.Mock()
+    pg_connection = SimpleNamespace(vendor="postgresql", statement_timeout=None)
+    context = {"connection": pg_connection, "cursor": SimpleNamespace(cursor=raw_cursor)}
+    execute = mock.Mock(return_value="rows")
+
+    deadline = Deadline(10)
+    token = _DEADLINE.set(deadline)
+    try:
+        assert enforce_deadline(execute, "SELECT 1", None, False, context) == "rows"
+        enforce_deadline(execute, "SELECT 1", None, False, context)
+        deadline.expires_at -= 8
+        enforce_deadline(execute, "SELECT 1", None, False, context)
+    finally:
+        _DEADLINE.reset(token)
+    enforce_deadline(execute, "SELECT 1", None, False, context)
+    enforce_deadline(execute, "SELECT 1", None, False, context)
+
+    statements = [call.args[0] for call in raw_cursor.execute.call_args_list]
+    assert len(statements) == 3
+    assert statements[0].startswith("SET statement_timeout = ") and 9900 < int(statements[0].split()[-1]) <= 10000
+    assert statements[1].startswith("SET statement_timeout = ") and int(statements[1].split()[-1]) <= 2000
+    assert statements[2] == "RESET statement_timeout"
+    assert execute.call_count == 5
@@ -0,0 +1,54 @@
+"""
+Tests for the custom model fields
+"""
+import time
+import uuid
+
+import pytest
+from django.db import connection
+
+from api.core.benchmarks.keys import TimeOrderedKeyRow, create_key_tables
+from api.core.fields import uuid7
+
+
+def test_uuid7_layout():
+    """
+    Ensure uuid7 are version 7, RFC variant, and start with the Unix time in ms
+    """
+    before = time.time_ns() // 1000000
+    value = uuid7()
+    after = time.time_ns() // 1000000
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before <= value.int >> 80 <= after
+
+
+def test_uuid7_strictly_increasing():
+    """
+    Ensure keys generated within the same millisecond keep increasing
+    """
+    values = [uuid7() for _ in range(10000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+@pytest.mark.django_db
+def test_time_ordered_uuid_field_round_trip():
+    """
+    Ensure TimeOrderedUUIDField keys are stored in 16 bytes and read back as UUIDs, in creation order
+    """
+    create_key_tables()
+    rows = [TimeOrderedKeyRow.objects.create(title="Row %s" % i) for i in range(5)]
+
+    assert TimeOrderedKeyRow.objects.get(pk=rows[2].pk).title == "Row 2"
+    assert TimeOrderedKeyRow.objects.get(pk=str(rows[3].pk)).title == "Row 3"
+    assert list(TimeOrderedKeyRow.objects.order_by("pk").values_list("title", flat=True)) == [
+        "Row %s" % i for i in range(5)
+    ]
+    assert list(TimeOrderedKeyRow.objects.filter(pk__lt=rows[2].pk).order_by("-pk")) == [rows[1], rows[0]]
+
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT typeof(id), length(id) FROM benchmark_time_ordered_key LIMIT 1")
+            assert cursor.fetchone() == ("blob", 16)
@@ -0,0 +1,80 @@
+"""
+Tests for the `any` lookup and the IN search
+"""
+import uuid
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.core.counters import ANSWER_COUNT
+from api.core.query_instrumentation import record_queries
+from api.questions.models import Question
+from api.questions.tests.factories import QuestionFactory
+from api.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_any_lookup_matches_in():
+    """
+    Ensure `any` returns the rows of `in`, with the values bound as one parameter
+    """
+    questions = QuestionFactory.create_batch(3)
+    values = [question.question_id for question in questions[:2]] + [uuid.uuid4(), None]
+
+    with record_queries() as stats:
+        found = set(Question.objects.filter(question_id__any=values))
+
+    assert found == set(Question.objects.filter(question_id__in=values)) == set(questions[:2])
+    if connection.vendor in ("postgresql", "sqlite"):
+        assert [shape.count("%s") for shape in stats.shapes] == [1]
+    assert not Question.objects.filter(question_id__any=[None]).exists()
+
+
+@pytest.mark.django_db
+def test_any_lookup_large_lists():
+    """
+    Ensure lists larger than the SQLite variable limit are supported
+    """
+    question = QuestionFactory()
+    values = [str(uuid.uuid4()) for _ in range(40000)] + [str(question.question_id)]
+
+    assert list(Question.objects.filter(question_id__any=values)) == [question]
+
+
+@pytest.mark.django_db
+@override_settings(IN_SEARCH_ARRAY_MIN_VALUES=2)
+def test_in_search_all_fields():
+    """
+    Ensure operator=IN searches every field, not only the first one
+    """
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    what, how = QuestionFactory(title="What"), QuestionFactory(title="How")
+    QuestionFactory(title="Why")
+
+    response = client.get(
+        reverse("questions:search"),
+        {"operator": "IN", "title": ["What", "How"], "question_id": [str(how.question_id), str(uuid.uuid4())]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [question["question_id"] for question in response.data["questions"]] == [str(how.question_id)]
+    assert set(Question.objects.IN("title", ["What", "How"])) == {what, how}
+
+
+@pytest.mark.django_db
+def test_counter_recount_chunks():
+    """
+    Ensure recounts of more rows than the variable limit are chunked
+    """
+    question = QuestionFactory()
+    Question.objects.filter(pk=question.pk).update(answer_count=5)
+    pks = [uuid.uuid4() for _ in range(2500)] + [question.pk]
+
+    assert ANSWER_COUNT.recount(pks) == 1
+    question.refresh_from_db()
+    assert question.answer_count == 0
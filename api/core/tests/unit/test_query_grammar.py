@@ -0,0 +1,108 @@
+"""
+Tests for the JSON query grammar of the ADVANCED search
+"""
+import json
+
+import pytest
+from django.db.models import Q
+from django.test import override_settings
+
+from api.core.exceptions import SearchWithOperatorException
+from api.core.query_grammar import In, Lookup, Operation, compile_query, parse_query
+from api.questions.models import Question
+from api.questions.tests.factories import QuestionFactory
+
+
+def parse(operation, *documents):
+    return parse_query.__wrapped__(operation, tuple(json.dumps(document) for document in documents))
+
+
+def test_parse_flattens_same_connector():
+    """
+    Ensure nested operations sharing the connector of their parent are spliced into it
+    """
+    ast = parse("_OR", {"title": "What"}, {"_OR": [{"title": "How"}, {"_OR": {"title": "Why"}}]})
+
+    assert ast == Operation("_OR", (Lookup("title", "What"), Lookup("title", "How"), Lookup("title", "Why")))
+
+
+def test_parse_simplifies_single_terms_and_double_negation():
+    """
+    Ensure single term operations are their term, and _NOT of _NOT is the inner terms
+    """
+    assert parse("_AND", {"_AND": {"title": "What"}}) == Lookup("title", "What")
+    assert parse("_NOT", {"_NOT": [{"title": "What"}, {"title": "How"}]}) == Operation(
+        "_OR", (Lookup("title", "What"), Lookup("title", "How"))
+    )
+    assert parse("_AND", {"_NOT": {"title": "What"}, "context": "$tumor"}) == Operation(
+        "_AND", (Operation("_NOT", (Lookup("title", "What"),)), Lookup("context", "$tumor"))
+    )
+
+
+def test_parse_in_and_list_values():
+    """
+    Ensure _IN is one term, and a list of values one term per value
+    """
+    assert parse("_AND", {"_IN": {"title": ["a", "b"]}}) == In("title", ("a", "b"))
+    assert parse("_OR", {"title": ["a", "b"]}) == Operation("_OR", (Lookup("title", "a"), Lookup("title", "b")))
+
+
+@override_settings(
+    ADVANCED_SEARCH_MAX_DEPTH=3,
+    ADVANCED_SEARCH_MAX_NODES=5,
+    ADVANCED_SEARCH_MAX_IN_VALUES=3,
+    ADVANCED_SEARCH_MAX_LENGTH=200,
+)
+@pytest.mark.parametrize(
+    "documents",
+    [
+        [{"_AND": {"_OR": {"_AND": {"_OR": {"title": "a"}}}}}],
+        [{"title": ["a", "b", "c"]}, {"context": ["a", "b"]}],
+        [{"_IN": {"title": ["a", "b", "c", "d"]}}],
+        [{"title": "a" * 300}],
+        [{"_XOR": [{"title": "a"}]}],
+        [{"title__in); DROP": "a"}],
+        [{"title": {"nested": "object"}}],
+        ["title"],
+        [{"_AND": []}],
+    ],
+)
+def test_parse_rejects_invalid_queries(documents):
+    """
+    Ensure the limits and the grammar are enforced
+    """
+    with pytest.raises(SearchWithOperatorException):
+        parse("_OR", *documents)
+
+
+def test_parse_rejects_invalid_json():
+    with pytest.raises(SearchWithOperatorException):
+        parse_query("_OR", ("{'title': 'What'}",))
+
+
+def test_compile_query():
+    """
+    Ensure the AST compiles to a flat Q tree with the model_search lookups
+    """
+    ast = parse("_AND", {"title": "$tumor"}, {"_NOT": [{"answer_count": ">=2"}, {"_IN": {"title": ["a", "b"]}}]})
+
+    assert compile_query(ast, Question) == Q(
+        ("title__icontains", "tumor"),
+        Q(("answer_count__gte", "2"), ("title__in", ["a", "b"]), _connector=Q.OR, _negated=True),
+    )
+
+
+@pytest.mark.django_db
+def test_advanced_search():
+    """
+    Ensure ADVANCED filters with the JSON documents of the outer operation
+    """
+    what = QuestionFactory(title="What is a tumor?")
+    how = QuestionFactory(title="How to treat it?", context="tumor treatment")
+    QuestionFactory(title="How long?", context="recovery")
+
+    questions = Question.objects.ADVANCED(
+        {"_OR": ['{"title": "What"}', '{"_AND": [{"title": "How"}, {"context": "$tumor"}]}']}
+    )
+
+    assert set(questions) == {what, how}
@@ -0,0 +1,59 @@
+"""
+Unit tests for SQL query instrumentation
+"""
+import pytest
+
+from api.core.query_instrumentation import QueryBudgetExceeded, QueryStats, query_budget, record_queries
+from api.questions.models import Question
+
+
+def test_query_shape_collapses_in_lists():
+    """
+    Ensure queries differing only by IN-list size and whitespace share a shape
+    """
+    assert QueryStats.shape('SELECT * FROM "question" WHERE id IN (%s, %s)') == QueryStats.shape(
+        'SELECT *  FROM "question"\n WHERE id IN (%s)'
+    )
+
+
+def test_duplicates():
+    """
+    Ensure duplicate shapes are reported
+    """
+    stats = QueryStats()
+    stats.add("SELECT 1", 1.0)
+    stats.add("SELECT 1", 2.0)
+    stats.add("SELECT 2", 0.5)
+
+    assert stats.count == 3
+    assert stats.duration == 3.5
+    assert stats.duplicates == {"SELECT 1": 2}
+    assert stats.as_log_fields() == {"db_query_count": 3, "db_duration": 3.5, "db_duplicate_queries": 1}
+
+
+@pytest.mark.django_db
+def test_record_queries():
+    """
+    Ensure every executed statement is recorded
+    """
+    with record_queries() as stats:
+        list(Question.objects.all())
+        list(Question.objects.all())
+
+    assert stats.count == 2
+    assert stats.duplicate_count == 1
+    assert stats.duration >= 0
+
+
+@pytest.mark.django_db
+def test_query_budget():
+    """
+    Ensure query_budget fails blocks that exceed their budget
+    """
+    with query_budget(1):
+        Question.objects.count()
+
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(1):
+            Question.objects.count()
+            Question.objects.count()
@@ -0,0 +1,96 @@
+"""
+Tests for the background tasks (eager in tests) and their duration metrics
+"""
+import os
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+from celery import shared_task
+from django.conf import settings
+from prometheus_client import REGISTRY
+
+from api.core.auth_mechanisms.utils import add_token_user_into_request_user
+from api.core.tasks import reconcile_counters_task
+from api.questions.models import Question
+from api.questions.tests.factories import QuestionFactory
+from api.users.tests.factories import UserFactory
+
+
+@shared_task(name="tests.fail")
+def failing_task():
+    raise ValueError("Failed")
+
+
+def _duration_count(task, outcome):
+    return REGISTRY.get_sample_value("roon_task_duration_seconds_count", {"task": task, "outcome": outcome}) or 0
+
+
+@pytest.mark.django_db
+def test_task_duration_observed():
+    """
+    Ensure each task run is observed by task name and outcome
+    """
+    question = QuestionFactory()
+    Question.objects.filter(pk=question.pk).update(answer_count=3)
+    before = _duration_count("core.reconcile_counters", "success")
+
+    result = reconcile_counters_task.delay()
+
+    assert result.get()["question.answer_count"] == 1
+    assert _duration_count("core.reconcile_counters", "success") == before + 1
+
+    with pytest.raises(ValueError):
+        failing_task.delay()
+    assert _duration_count("tests.fail", "error") == 1
+
+
+@pytest.mark.django_db
+def test_user_groups_synced_by_task(django_assert_num_queries, django_capture_on_commit_callbacks):
+    """
+    Ensure group changes of existing users are synced by the task once committed, unchanged groups only read
+    """
+    user = UserFactory()
+    token_user = {"user_id": 1, "groups": [{"name": "staff"}, {"name": "doctors"}]}
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        add_token_user_into_request_user(token_user, user, created=False)
+    assert not user.groups.exists()
+    assert len(callbacks) == 1
+
+    callbacks[0]()
+    assert set(user.groups.values_list("name", flat=True)) == {"staff", "doctors"}
+
+    with django_assert_num_queries(1):
+        add_token_user_into_request_user(token_user, user, created=False)
+
+
+@pytest.mark.django_db
+def test_user_groups_sync_broker_error(django_capture_on_commit_callbacks):
+    """
+    Ensure a broker error while queuing the group sync does not fail the committed request
+    """
+    user = UserFactory()
+    token_user = {"user_id": 1, "groups": [{"name": "staff"}]}
+
+    with mock.patch("api.users.tasks.sync_user_groups.delay", side_effect=ConnectionError) as delay:
+        with django_capture_on_commit_callbacks(execute=True):
+            add_token_user_into_request_user(token_user, user, created=False)
+
+    delay.assert_called_once_with(user.pk, ["staff"])
+    assert not user.groups.exists()
+
+
+def test_celery_app_keeps_settings_default():
+    """
+    Ensure importing the config package (wsgi, asgi) does not default the settings to the local ones
+    """
+    env = {key: value for key, value in os.environ.items() if key != "DJANGO_SETTINGS_MODULE"}
+    code = "import os, config; print(os.environ.get('DJANGO_SETTINGS_MODULE'))"
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "None"
@@ -0,0 +1,61 @@
+"""
+Tests for the worker warm up and the gunicorn configuration
+"""
+import runpy
+from pathlib import Path
+
+from mock import Mock, patch
+
+from api.core.warmup import WARMERS, warm_up
+
+GUNICORN_CONFIG = str(Path(__file__).resolve().parents[4] / "config" / "gunicorn.py")
+
+
+def test_warm_up_runs_every_warmer_without_the_database():
+    """
+    Ensure every warmer succeeds, tests without django_db fail on any database access
+    """
+    assert set(warm_up()) == {name for name, _ in WARMERS}
+
+
+def test_gunicorn_config_defaults(monkeypatch):
+    """
+    Ensure workers and threads are computed from the CPU count
+    """
+    for name in ("GUNICORN_WORKERS", "GUNICORN_WORKER_CLASS", "GUNICORN_MAX_REQUESTS", "DJANGO_SERVER_MODE"):
+        monkeypatch.delenv(name, raising=False)
+
+    with patch("os.sched_getaffinity", return_value=set(range(4))):
+        config = runpy.run_path(GUNICORN_CONFIG)
+
+    assert config["worker_class"] == "gthread"
+    assert config["workers"] == 5
+    assert config["threads"] == 4
+    assert config["preload_app"]
+    assert (config["max_requests"], config["max_requests_jitter"]) == (1000, 100)
+
+
+def test_gunicorn_config_from_environment(monkeypatch):
+    """
+    Ensure the environment overrides the defaults and ASGI mode uses uvicorn workers
+    """
+    monkeypatch.setenv("DJANGO_SERVER_MODE", "asgi")
+    monkeypatch.setenv("GUNICORN_MAX_WORKERS", "3")
+    monkeypatch.setenv("GUNICORN_PRELOAD", "false")
+    monkeypatch.setenv("GUNICORN_MAX_REQUESTS", "500")
+
+    with patch("os.sched_getaffinity", return_value=set(range(16))):
+        config = runpy.run_path(GUNICORN_CONFIG)
+
+    assert config["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert config["workers"] == 3
+    assert config["threads"] == 1
+    assert not config["preload_app"]
+    assert config["max_requests_jitter"] == 50
+
+    # Only a preloaded master warms up
+    with patch("api.core.warmup.warm_up") as warm_up_mock:
+        config["when_ready"](Mock(cfg=Mock(preload_app=False)))
+        warm_up_mock.assert_not_called()
+        config["post_worker_init"](Mock())
+        warm_up_mock.assert_called_once()
@@ -6,7 +6,18 @@ import operator
 import time
 from functools import wraps, reduce
 
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import base, Q
+from django.db.models import (
+    CharField,
+    DateField,
+    DecimalField,
+    DurationField,
+    FloatField,
+    IntegerField,
+    TextField,
+    TimeField,
+)
 from django.http import QueryDict
 
 LOGGER = logging.getLogger("roon")
@@ -35,16 +46,94 @@ def computed_model_keys(model, field_name_exclusions=(), field_type_exclusions=(
     ]
 
 
-def model_search(params, qs=None, qs_objs=None, exclude=[]):
+# Value prefixes of numeric and date searches (counters: answer_count, question_count),
+# `=` (exact) also applies to the other fields that are not text (Ex: question_id==<uuid>)
+COMPARISON_PREFIXES = {">=": "__gte", "<=": "__lte", ">": "__gt", "<": "__lt", "=": "__exact"}
+COMPARABLE_FIELDS = (IntegerField, FloatField, DecimalField, DateField, TimeField, DurationField)
+TEXT_FIELDS = (CharField, TextField)
+
+
+def resolve_field(model, param):
+    """
+    Field of `model` at the `param` path (Ex: topics__question_count), None when it is not a field
+    """
+    if model is None:
+        return None
+
+    field = None
+    for name in param.split("__"):
+        if field is not None:
+            if not field.is_relation:
+                return None
+            model = field.related_model
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+    return field
+
+
+def comparison_prefix(model, param, val):
+    """
+    Comparison prefix of `val` applying to the `param` field of `model`, None for text fields (their values
+    may start with one: ?title=<3 hearts)
+    """
+    prefix = val[:2] if val[:2] in COMPARISON_PREFIXES else val[:1]
+    if prefix not in COMPARISON_PREFIXES:
+        return None
+
+    field = resolve_field(model, param)
+    if field is None:
+        return None
+    if isinstance(field, COMPARABLE_FIELDS) and not field.is_relation:
+        return prefix
+    if prefix == "=" and not isinstance(field, TEXT_FIELDS):
+        return prefix
+    return None
+
+
+def search_lookup(param, val, model=None):
+    """
+    (lookup, value) of one search value, the value prefix selects the lookup (default istartswith)
+
+    Comparison prefixes apply to the fields of `model`, see comparison_prefix.
+    """
+    filter_param = "__istartswith"  # Default search
+    if isinstance(val, (bytes, str)):
+        prefix = comparison_prefix(model, param, val) if isinstance(val, str) else None
+        if val.startswith("^"):  # TODO: Remove, once FE's stop using this for startswith search
+            filter_param = "__istartswith"
+            val = val[1:]
+        elif val.startswith("$"):
+            filter_param = "__icontains"
+            val = val[1:]
+        elif prefix:  # Ex: answer_count=>=2, answer_count==2
+            filter_param = COMPARISON_PREFIXES[prefix]
+            val = val[len(prefix):]
+        elif val.upper() in ["NULL", "NONE"]:
+            filter_param = "__isnull"
+            val = True
+    elif val is None:
+        filter_param = "__isnull"
+        val = True
+
+    return param + filter_param, val
+
+
+def model_search(params, qs=None, qs_objs=None, exclude=[], model=None):
     """
     Generic function to build out custom search Q nodes
 
     IF qs_objs=None/False, this will return qs_objs ONLY
     ELSE a reduced 'AND` qs for in view search
+
+    The fields are of `model` (default: the model of qs)
     """
     from django.conf import settings
 
     q_objs = []
+    if model is None and qs is not None:
+        model = qs.model
 
     # Need to convert values into a list
     # For Ex: {hf_id: [1,2,3, ...]}
@@ -57,24 +146,9 @@ def model_search(params, qs=None, qs_objs=None, exclude=[]):
         if not isinstance(values, list):
             values = [values]
         for val in values:
-            filter_param = "__istartswith"  # Default search
             if param in settings.SEARCH_FILTERS + exclude:
                 continue
-            if isinstance(val, (bytes, str)):
-                if val.startswith("^"):  # TODO: Remove, once FE's stop using this for startswith search
-                    filter_param = "__istartswith"
-                    val = val[1:]
-                elif val.startswith("$"):
-                    filter_param = "__icontains"
-                    val = val[1:]
-                elif val.upper() in ["NULL", "NONE"]:
-                    filter_param = "__isnull"
-                    val = True
-            elif val is None:
-                filter_param = "__isnull"
-                val = True
-
-            q_objs.append(Q(**{param + filter_param: val}))
+            q_objs.append(Q(search_lookup(param, val, model)))
 
     if qs_objs:
         return q_objs
@@ -96,6 +170,15 @@ def get_and_pop_querydict_entry(key, params, default=None):
     return value
 
 
+def chunked(values, size):
+    """
+    Consecutive lists of at most `size` values (one list of all of them when size is None)
+    """
+    values = list(values)
+    size = size or len(values) or 1
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+
 def remove_forbidden_data(source, *args):
     """
     Makes a copy of the source dict and then remove all keys in args.
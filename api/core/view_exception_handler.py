@@ -2,11 +2,14 @@
 Decorators for uniform view-exception handling
 """
 
+import asyncio
 import logging
+import time
 from functools import wraps
 
+import httpx
 import requests
-from django import db
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, FieldError, ValidationError, MultipleObjectsReturned
 from django.core.paginator import PageNotAnInteger
@@ -15,7 +18,10 @@ from rest_framework import status
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from api.core.db_retry import DatabaseRetry, request_databases, reset_connections, view_request
+from api.core.deadlines import deadline_error, get_view_deadline, request_deadline
 from api.core.exceptions import (
+    DeadlineExceeded,
     SearchWithOperatorException,
     ServiceBaseException,
     ResourceAccessDeniedException,
@@ -81,104 +87,202 @@ def _format_err_msg(err, prefix="Error"):
     return prefix + ": [%s] %s" % (type(err), _extract_err(err))
 
 
-def view_exception_handling(retry=0):
+def _exception_response(err):
+    """
+    Response of an exception raised by a view
+    """
+    try:
+        raise deadline_error(err)
+
+    except DeadlineExceeded as err:
+        return _build_rest_response(
+            error_constructor(
+                _format_err_msg(err, "Deadline exceeded"), internal_code="deadline_exceeded", deadline=err.seconds
+            ),
+            status.HTTP_504_GATEWAY_TIMEOUT,
+        )
+
+    except ResourceAccessDeniedException as err:
+        return _build_rest_response(_format_err_msg(err, "Access denied"), status.HTTP_403_FORBIDDEN)
+
+    except MissingParameterException as err:
+        return _build_rest_response(
+            _format_err_msg(err, "Missing parameters"), status.HTTP_428_PRECONDITION_REQUIRED
+        )
+
+    except FieldError as err:
+        return _build_rest_response(_format_err_msg(err), status.HTTP_400_BAD_REQUEST)
+
+    except DateSearchError as err:
+        return _build_rest_response(_format_err_msg(err, "Date search error"), status.HTTP_400_BAD_REQUEST)
+
+    except SearchWithOperatorException as err:
+        return _build_rest_response(_format_err_msg(err, "Search error"), status.HTTP_400_BAD_REQUEST)
+
+    except HTTP400ResponseException as err:
+        return _build_rest_response(_format_err_msg(err, "Bad Request"), status.HTTP_400_BAD_REQUEST)
+
+    except HTTP409ResponseException as err:
+        return _build_rest_response(_format_err_msg(err, "Conflict"), status.HTTP_409_CONFLICT)
+
+    except HTTP412ResponseException as err:
+        return _build_rest_response(
+            _format_err_msg(err, "Precondition failed"), status.HTTP_412_PRECONDITION_FAILED
+        )
+
+    except (
+        TypeError,
+        ValueError,
+        AttributeError,
+        PageNotAnInteger,
+        ValidationError,
+        MultipleObjectsReturned,
+    ) as err:
+        return _build_rest_response(
+            _format_err_msg(err, "Invalid parameters or data"), status.HTTP_400_BAD_REQUEST
+        )
+
+    # Make sure IntegrityError is above Database Errors as that is the parent exception
+    except (IntegrityError,) as err:
+        return _build_rest_response(_format_err_msg(err, "Integrity error"), status.HTTP_409_CONFLICT)
+
+    # All Database related errors land here
+    except (Error, DatabaseError) as err:
+        return _build_rest_response(_format_err_msg(err, "Database error"), status.HTTP_400_BAD_REQUEST)
+
+    except ServiceBaseException as err:
+        return _build_rest_response(_format_err_msg(err, "Downstream service error"), err.status_code)
+
+    except ObjectDoesNotExist as err:
+        return _build_rest_response(_format_err_msg(err, "Resource not found"), status.HTTP_404_NOT_FOUND)
+
+    except (requests.ConnectionError, requests.ConnectTimeout, httpx.TransportError) as err:
+        err_msg = _format_err_msg(err, "Downstream service connection error")
+        LOGGER.critical(err_msg)
+        return _build_rest_response(err_msg, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    except Exception as err:
+        LOGGER.exception(_format_err_msg(err, "Unhandled API exception:[%s] %s "))
+        return _build_rest_response(
+            "Server Error, contact Roon to resolve", status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+def _database_unavailable_response(retry):
+    """
+    503 of a view given up on after OperationalErrors (or shed by the open circuit), with Retry-After
+    """
+    response = _build_rest_response("Database unavailable, retry later", status.HTTP_503_SERVICE_UNAVAILABLE)
+    response["Retry-After"] = str(retry.circuit.retry_after())
+    return response
+
+
+def _log_operational_error(err, retry, delay):
+    if delay is None:
+        message = f"GIVE UP[{retry.outcome}] after {retry.retries} retries, DB issue"
+    else:
+        message = f"RETRY[{retry.retries}/{settings.MAX_RETRIES}] in {delay * 1000:.0f}ms, DB issue"
+    LOGGER.error(_format_err_msg(err, message))
+
+
+def view_exception_handling():
     """
     Decorator that consolidate handling of common view exceptions.
 
     Some exception handlers do not call logger because middleware already
     does logging for non 200 response
+
+    OperationalErrors are retried with backoff, or answered 503 (api/core/db_retry.py). Sync views run
+    each attempt in its own ATOMIC_REQUESTS transaction: an attempt failing with an OperationalError rolls
+    back, the other exceptions are answered within the transaction and its writes commit, as before.
+    Views run within their deadline (api/core/deadlines.py), answered 504 past it.
+
+    Works for sync views and async views (`async_api_view`).
     """
-    retry += 1
 
     def handling_decorator(func):
         """avoid lint error, sigh"""
 
+        # The function name of `api_view` views
+        view_name = getattr(getattr(func, "cls", func), "__name__", "view")
+
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def _async_handler(*args, **kwargs):
+                """avoid lint error, sigh"""
+
+                request = view_request(args)
+                with request_deadline(get_view_deadline(func, request)):
+                    retry = DatabaseRetry(view_name, request)
+                    if not retry.allow():
+                        return _database_unavailable_response(retry)
+
+                    while True:
+                        try:
+                            response = await func(*args, **kwargs)
+
+                        except (OperationalError,) as err:
+                            # Connections are thread bound: inspect and reset them in the thread of the queries
+                            delay = await sync_to_async(retry.backoff)()
+                            _log_operational_error(err, retry, delay)
+                            if delay is None:
+                                return _database_unavailable_response(retry)
+                            await asyncio.sleep(delay)
+                            await sync_to_async(reset_connections)()
+                            continue
+
+                        except Exception as err:
+                            retry.succeeded()
+                            return _exception_response(err)
+
+                        retry.succeeded()
+                        return response
+
+            return _async_handler
+
         @wraps(func)
         def _handler(*args, **kwargs):
             """avoid lint error, sigh"""
 
-            try:
-                return func(*args, **kwargs)
-
-            except ResourceAccessDeniedException as err:
-                return _build_rest_response(_format_err_msg(err, "Access denied"), status.HTTP_403_FORBIDDEN)
-
-            except MissingParameterException as err:
-                return _build_rest_response(
-                    _format_err_msg(err, "Missing parameters"), status.HTTP_428_PRECONDITION_REQUIRED
-                )
-
-            except FieldError as err:
-                return _build_rest_response(_format_err_msg(err), status.HTTP_400_BAD_REQUEST)
-
-            except DateSearchError as err:
-                return _build_rest_response(_format_err_msg(err, "Date search error"), status.HTTP_400_BAD_REQUEST)
-
-            except SearchWithOperatorException as err:
-                return _build_rest_response(_format_err_msg(err, "Search error"), status.HTTP_400_BAD_REQUEST)
-
-            except HTTP400ResponseException as err:
-                return _build_rest_response(_format_err_msg(err, "Bad Request"), status.HTTP_400_BAD_REQUEST)
-
-            except HTTP409ResponseException as err:
-                return _build_rest_response(_format_err_msg(err, "Conflict"), status.HTTP_409_CONFLICT)
-
-            except HTTP412ResponseException as err:
-                return _build_rest_response(
-                    _format_err_msg(err, "Precondition failed"), status.HTTP_412_PRECONDITION_FAILED
-                )
-
-            except (
-                TypeError,
-                ValueError,
-                AttributeError,
-                PageNotAnInteger,
-                ValidationError,
-                MultipleObjectsReturned,
-            ) as err:
-                return _build_rest_response(
-                    _format_err_msg(err, "Invalid parameters or data"), status.HTTP_400_BAD_REQUEST
-                )
-
-            # Make sure IntegrityError is above Database Errors as that is the parent exception
-            except (IntegrityError,) as err:
-                return _build_rest_response(_format_err_msg(err, "Integrity error"), status.HTTP_409_CONFLICT)
-
-            # Make sure OperationalError is above Database Errors as that is the parent exception
-            # Re-classifying OperationalErrors as 500, so that upstream services can retry
-            # This operation will retry MAX_RETRIES times and reestablish the DB connection each time
-            except (OperationalError,) as err:
-                retry_message = f"RETRY[{retry}/{settings.MAX_RETRIES}] MySQL server DB issue"
-                LOGGER.error(_format_err_msg(err, retry_message))
-                while retry < settings.MAX_RETRIES:
-                    db.connections.close_all()
-                    handler = view_exception_handling(retry)(func)
-                    return handler(*args, **kwargs)
-                return _build_rest_response(
-                    "Server Error, contact Roon to resolve", status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-
-            # All Database related errors land here
-            except (Error, DatabaseError) as err:
-                return _build_rest_response(_format_err_msg(err, "Database error"), status.HTTP_400_BAD_REQUEST)
-
-            except ServiceBaseException as err:
-                return _build_rest_response(_format_err_msg(err, "Downstream service error"), err.status_code)
-
-            except ObjectDoesNotExist as err:
-                return _build_rest_response(_format_err_msg(err, "Resource not found"), status.HTTP_404_NOT_FOUND)
-
-            except (requests.ConnectionError, requests.ConnectTimeout) as err:
-                err_msg = _format_err_msg(err, "Downstream service connection error")
-                LOGGER.critical(err_msg)
-                return _build_rest_response(err_msg, status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            except Exception as err:
-                LOGGER.exception(_format_err_msg(err, "Unhandled API exception:[%s] %s "))
-                return _build_rest_response(
-                    "Server Error, contact Roon to resolve", status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-
+            request = view_request(args)
+            with request_deadline(get_view_deadline(func, request)):
+                retry = DatabaseRetry(view_name, request)
+                if not retry.allow():
+                    return _database_unavailable_response(retry)
+
+                databases = request_databases(func)
+                while True:
+                    try:
+                        with retry.attempt(databases):
+                            try:
+                                response = func(*args, **kwargs)
+                            except (OperationalError,):
+                                raise
+                            # Answered within the transaction, which commits like Django's ATOMIC_REQUESTS one
+                            except Exception as err:
+                                response = _exception_response(err)
+
+                    # Re-classifying OperationalErrors as 503 with Retry-After, so that upstream services can retry
+                    except (OperationalError,) as err:
+                        delay = retry.backoff()
+                        _log_operational_error(err, retry, delay)
+                        if delay is None:
+                            return _database_unavailable_response(retry)
+                        time.sleep(delay)
+                        reset_connections()
+                        continue
+
+                    # The transaction failed to open or commit
+                    except Exception as err:
+                        retry.succeeded()
+                        return _exception_response(err)
+
+                    retry.succeeded()
+                    return response
+
+        # The ATOMIC_REQUESTS transactions are run per attempt by the handler, not around the whole request
+        _handler._non_atomic_requests = set(getattr(func, "_non_atomic_requests", set())) | set(settings.DATABASES)
         return _handler
 
     return handling_decorator
@@ -1,12 +1,16 @@
 from collections import OrderedDict
 
 from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from api.core.metrics import render_metrics
+
 
 ###
 # Roots
@@ -53,3 +57,12 @@ def heartbeat(request):
     if request.query_params.get('system_version'):
         return Response({"success": True, "system_version": settings.SYSTEM_VERSION}, status=status.HTTP_200_OK)
     return Response({"success": True}, status=status.HTTP_200_OK)
+
+
+def metrics(request):
+    """
+    Prometheus metrics for all workers, in the Prometheus text format
+
+    Plain Django view: scraped by Prometheus, which does not negotiate DRF renderers
+    """
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,103 @@
+"""
+Warm the lazily built, process wide caches before a worker serves requests
+
+Called from the gunicorn hooks (config/gunicorn.py): once in the master when the app is
+preloaded, so the warm caches are shared copy-on-write, and on every worker start.
+Never touches the database, connections must not be shared across forks.
+"""
+import logging
+import time
+
+from django.apps import apps
+from django.urls import get_resolver
+
+from api.core.serializer import BaseModelSerializer
+
+LOGGER = logging.getLogger("roon")
+
+
+def _all_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _all_subclasses(subclass)
+
+
+def warm_model_graph():
+    """
+    Build the models' field and relation caches (_meta.get_fields, related objects)
+    """
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+
+def warm_url_resolver():
+    """
+    Populate the URL resolver (reverse and resolve lookups)
+    """
+    get_resolver().reverse_dict
+
+
+def warm_serializers():
+    """
+    Import every app's serializers and build their fields once
+    """
+    for app_config in apps.get_app_configs():
+        if app_config.name.startswith("api."):
+            try:
+                __import__("%s.serializers" % app_config.name)
+            except ImportError:
+                continue
+
+    for serializer_class in _all_subclasses(BaseModelSerializer):
+        if getattr(serializer_class.Meta, "model", None) is not None:
+            serializer_class().fields
+
+
+def warm_auth():
+    """
+    Resolve the JWT settings and handlers (secret key, algorithm, decode handler)
+    """
+    from rest_framework_jwt.settings import api_settings
+
+    for setting in ("JWT_SECRET_KEY", "JWT_ALGORITHM", "JWT_AUTH_HEADER_PREFIX", "JWT_DECODE_HANDLER"):
+        getattr(api_settings, setting)
+
+
+def warm_settings_caches():
+    """
+    Compile the log anonymizer and the request log policies
+    """
+    from api.core.data_anonymizer import get_anonymizer
+    from utility.logging.policies import get_policy
+
+    get_anonymizer()
+    get_policy(None)
+
+
+WARMERS = (
+    ("model_graph", warm_model_graph),
+    ("url_resolver", warm_url_resolver),
+    ("serializers", warm_serializers),
+    ("auth", warm_auth),
+    ("settings_caches", warm_settings_caches),
+)
+
+
+def warm_up():
+    """
+    Run every warmer, a failing warmer is logged and skipped
+
+    Returns {warmer: duration in ms}
+    """
+    durations = {}
+    for name, warmer in WARMERS:
+        start = time.perf_counter()
+        try:
+            warmer()
+        except Exception:
+            LOGGER.exception("Warm up of %s failed", name)
+            continue
+        durations[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    LOGGER.info("Warmed up caches in %.3fms: %s", sum(durations.values()), durations)
+    return durations
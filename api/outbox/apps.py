@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxConfig(AppConfig):
+    name = "api.outbox"
+    verbose_name = _("Outbox")
+
+    def ready(self):
+        try:
+            import api.outbox.signals  # noqa F401
+        except ImportError:
+            pass
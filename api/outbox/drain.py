@@ -0,0 +1,151 @@
+"""
+Outbox drain: deliver the OutboxEvent of the writes, at least once, off the write path
+
+The events are read in order by batches of OUTBOX_BATCH_SIZE, locked (SKIP LOCKED, so drains can
+run concurrently) and handled together: a batch recounts each changed counter, refreshes the
+related questions of each changed question and invalidates the cached searches once.
+
+Every handler recomputes from the current rows (recounts, refreshes, cache generations): an event
+delivered twice, or late, has the effect of one. A failing batch is retried event by event, an
+event failing OUTBOX_MAX_ATTEMPTS times is given up (logged, kept with its error).
+
+The drain runs in the outbox.drain task: queued once a transaction with events commits, and
+scheduled every OUTBOX_DRAIN_INTERVAL seconds to catch up (broker outages, failed events).
+"""
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from api.answers.models import Answer
+from api.core.counters import QUESTION_COUNT, TAG_ANSWER_COUNT
+from api.core.search import bump_search_generation
+from api.outbox.models import OutboxEvent
+from api.questions.related import refresh_related
+
+LOGGER = logging.getLogger("roon")
+
+
+class Changes(object):
+    """
+    What a batch of events changed, applied once per batch
+    """
+
+    def __init__(self):
+        self.topics = set()
+        self.tags = set()
+        self.questions = set()
+        self.answers = set()
+
+    def add(self, event):
+        payload = event.payload
+        if event.action == OutboxEvent.M2M:
+            if payload["relation"] == "topics":
+                self.topics.update(payload["targets"])
+                self.questions.update(payload["sources"])
+            else:
+                self.tags.update(payload["targets"])
+                self.answers.update(payload["sources"])
+        elif event.action == OutboxEvent.DELETE:
+            self.topics.update(payload.get("topics", ()))
+            self.tags.update(payload.get("tags", ()))
+            if payload.get("tags"):
+                self.questions.add(payload["question_id"])
+
+    def apply(self):
+        QUESTION_COUNT.recount(self.topics)
+        TAG_ANSWER_COUNT.recount(self.tags)
+
+        questions = self.questions | {
+            str(pk) for pk in Answer.objects.filter(pk__in=self.answers).values_list("question_id", flat=True)
+        }
+        if questions and settings.RELATED_QUESTIONS_REFRESH_ON_CHANGE:
+            refresh_related(questions)
+
+        bump_search_generation()
+
+
+def deliver(events):
+    changes = Changes()
+    for event in events:
+        changes.add(event)
+    changes.apply()
+
+
+def drain_outbox(batch_size=None, max_batches=None):
+    """
+    Deliver the pending events (at most max_batches batches), returns the number of events processed
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    processed, failed = 0, set()
+    for _ in range(max_batches or settings.OUTBOX_MAX_BATCHES):
+        with transaction.atomic():
+            # The events failing in this drain are retried by the next one
+            pending = OutboxEvent.objects.select_for_update(skip_locked=True).filter(processed_at=None)
+            events = list(pending.exclude(pk__in=failed).order_by("pk")[:batch_size])
+            if not events:
+                break
+
+            try:
+                with transaction.atomic():
+                    deliver(events)
+                    OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                        processed_at=datetime.utcnow(), error=""
+                    )
+            except Exception:
+                LOGGER.exception("Outbox batch of %s events failed, delivering them one by one", len(events))
+                failed.update(_deliver_one_by_one(events))
+        processed += len(events)
+
+    purged, _ = OutboxEvent.objects.filter(
+        processed_at__lt=datetime.utcnow() - timedelta(seconds=settings.OUTBOX_RETENTION)
+    ).delete()
+    if processed or purged:
+        LOGGER.info("Outbox drained: %s events processed, %s purged", processed, purged)
+    return processed
+
+
+def _deliver_one_by_one(events):
+    """
+    Deliver the events of a failed batch separately, returns the pks of the events still pending
+    """
+    failed = []
+    for event in events:
+        try:
+            with transaction.atomic():
+                deliver([event])
+        except Exception as err:
+            event.attempts += 1
+            event.error = repr(err)
+            if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                LOGGER.error("Outbox event %s given up after %s attempts: %r", event.pk, event.attempts, err)
+                event.processed_at = datetime.utcnow()
+            else:
+                failed.append(event.pk)
+        else:
+            event.error, event.processed_at = "", datetime.utcnow()
+        event.save(update_fields=["attempts", "error", "processed_at"])
+    return failed
+
+
+def schedule_drain():
+    """
+    Queue a drain once the current transaction commits (once per transaction)
+    """
+    if not settings.OUTBOX_DRAIN_ON_COMMIT:
+        return
+
+    connection = transaction.get_connection()
+    if not any(callback[1] is _drain_committed for callback in connection.run_on_commit):
+        transaction.on_commit(_drain_committed)
+
+
+def _drain_committed():
+    from api.outbox.tasks import drain_outbox_task
+
+    # The events are committed: without a broker, the scheduled drain delivers them
+    try:
+        drain_outbox_task.delay()
+    except Exception:
+        LOGGER.exception("Could not queue the outbox drain")
@@ -0,0 +1,25 @@
+"""
+Drain the outbox
+"""
+from django.core.management.base import BaseCommand
+
+from api.outbox.drain import drain_outbox
+
+
+class Command(BaseCommand):
+    """
+    Deliver the pending outbox events (counters, related questions, cached searches)
+    """
+
+    help = """Deliver the pending outbox events: recount the changed counters, refresh the related
+    questions of the changed questions and invalidate the cached searches.
+
+    Ex: python manage.py drain_outbox --batch-size 500
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Events per batch")
+
+    def handle(self, **options):
+        processed = drain_outbox(batch_size=options["batch_size"])
+        self.stdout.write("%s outbox event(s) processed" % processed)
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.10 on 2026-10-19 13:36
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=64, verbose_name='Model')),
+                ('object_id', models.CharField(max_length=64, verbose_name='Object ID')),
+                ('action', models.CharField(choices=[('save', 'Save'), ('delete', 'Delete'), ('m2m', 'M2M change')], max_length=8, verbose_name='Action')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Payload')),
+                ('created_at', models.DateTimeField(default=datetime.datetime.utcnow, verbose_name='Created At')),
+                ('processed_at', models.DateTimeField(blank=True, default=None, null=True, verbose_name='Processed At')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Last Error')),
+            ],
+            options={
+                'verbose_name': 'Outbox Event',
+                'verbose_name_plural': 'Outbox Events',
+                'db_table': 'outbox_event',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(('processed_at', None)), fields=['id'], name='outbox_event_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['processed_at'], name='outbox_event_processed_idx'),
+        ),
+    ]
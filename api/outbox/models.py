@@ -0,0 +1,42 @@
+"""Model definitions for the Outbox"""
+import logging
+from datetime import datetime
+
+from django.db import models
+
+LOGGER = logging.getLogger("roon")
+
+
+class OutboxEvent(models.Model):
+    """
+    Change of a Question, Answer, Topic or Tag, written in the transaction of the change (api/outbox/signals.py)
+    and delivered at least once by the drain (api/outbox/drain.py)
+    """
+
+    SAVE, DELETE, M2M = "save", "delete", "m2m"
+    ACTIONS = ((SAVE, "Save"), (DELETE, "Delete"), (M2M, "M2M change"))
+
+    # Changed object, Ex: questions.question and its question_id
+    model = models.CharField("Model", max_length=64)
+    object_id = models.CharField("Object ID", max_length=64)
+    action = models.CharField("Action", max_length=8, choices=ACTIONS)
+    # Rows the handlers need that the change removed (Ex: the topics of a deleted question)
+    payload = models.JSONField("Payload", default=dict, blank=True)
+
+    created_at = models.DateTimeField("Created At", default=datetime.utcnow)
+    processed_at = models.DateTimeField("Processed At", blank=True, null=True, default=None)
+    attempts = models.PositiveSmallIntegerField("Attempts", default=0)
+    error = models.TextField("Last Error", blank=True, default="")
+
+    class Meta:
+        db_table = "outbox_event"
+        verbose_name = "Outbox Event"
+        verbose_name_plural = "Outbox Events"
+        indexes = [
+            # The drain reads the pending events in order, the purge the old processed ones
+            models.Index(fields=["id"], condition=models.Q(processed_at=None), name="outbox_event_pending_idx"),
+            models.Index(fields=["processed_at"], name="outbox_event_processed_idx"),
+        ]
+
+    def __str__(self):
+        return f"Outbox Event: {self.action} {self.model} {self.object_id}"
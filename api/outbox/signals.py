@@ -0,0 +1,80 @@
+"""
+Signals for the Outbox: write an OutboxEvent for each Question, Answer, Topic and Tag change
+
+The events are written in the transaction of the change (ATOMIC_REQUESTS): a rolled back change
+leaves no event, a committed one always has its event.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from api.answers.models import Answer, AnswerTag
+from api.outbox.drain import schedule_drain
+from api.outbox.models import OutboxEvent
+from api.questions.models import Question
+from api.topics.models import QuestionTopic
+
+MODELS = (Question, Answer, QuestionTopic, AnswerTag)
+# Through model: (relation name, source field, target field)
+RELATIONS = {
+    Question.topics.through: ("topics", "question", "questiontopic"),
+    Answer.tags.through: ("tags", "answer", "answertag"),
+}
+# Relations removed with the object by a delete (without m2m_changed)
+DELETED_RELATIONS = {Question: "topics", Answer: "tags"}
+
+
+def write_event(instance, action, payload=None):
+    OutboxEvent.objects.create(
+        model=instance._meta.label_lower, object_id=str(instance.pk), action=action, payload=payload or {}
+    )
+    schedule_drain()
+
+
+def _payload(instance):
+    # The question of an answer, known after its delete
+    return {"question_id": str(instance.question_id)} if isinstance(instance, Answer) else {}
+
+
+def saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        write_event(instance, OutboxEvent.SAVE, _payload(instance))
+
+
+def deleting(sender, instance, **kwargs):
+    relation = DELETED_RELATIONS.get(sender)
+    if relation:
+        instance._outbox_deleted = [str(pk) for pk in getattr(instance, relation).values_list("pk", flat=True)]
+
+
+def deleted(sender, instance, **kwargs):
+    payload = _payload(instance)
+    if sender in DELETED_RELATIONS:
+        payload[DELETED_RELATIONS[sender]] = getattr(instance, "_outbox_deleted", [])
+    write_event(instance, OutboxEvent.DELETE, payload)
+
+
+def relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    {"relation", "sources", "targets"} event of an M2M change, in the forward direction whatever the changed side
+    """
+    relation, source, target = RELATIONS[sender]
+    if action == "pre_clear":
+        # The cleared rows are unknown after the clear
+        own, other = (target, source) if reverse else (source, target)
+        cleared = sender.objects.filter(**{own: instance.pk}).values_list(other + "_id", flat=True)
+        instance._outbox_cleared = [str(pk) for pk in cleared]
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    pks = getattr(instance, "_outbox_cleared", []) if action == "post_clear" else [str(pk) for pk in pk_set]
+    if pks:
+        sources, targets = (pks, [str(instance.pk)]) if reverse else ([str(instance.pk)], pks)
+        write_event(instance, OutboxEvent.M2M, {"relation": relation, "sources": sources, "targets": targets})
+
+
+for model in MODELS:
+    post_save.connect(saved, sender=model)
+    pre_delete.connect(deleting, sender=model)
+    post_delete.connect(deleted, sender=model)
+for through in RELATIONS:
+    m2m_changed.connect(relation_changed, sender=through)
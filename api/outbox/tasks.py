@@ -0,0 +1,14 @@
+"""
+Background tasks of the Outbox
+"""
+from celery import shared_task
+
+from api.outbox.drain import drain_outbox
+
+
+@shared_task(name="outbox.drain")
+def drain_outbox_task():
+    """
+    Deliver the pending outbox events, returns the number of events processed
+    """
+    return drain_outbox()
@@ -0,0 +1,113 @@
+"""
+Tests for the transactional outbox and its drain
+"""
+import pytest
+from django.db import transaction
+
+from api.answers.tests.factories import AnswerFactory, AnswerTagFactory
+from api.core.search import search_generation
+from api.outbox import drain
+from api.outbox.drain import drain_outbox
+from api.outbox.models import OutboxEvent
+from api.questions.tests.factories import QuestionFactory
+from api.topics.tests.factories import QuestionTopicFactory
+
+
+@pytest.mark.django_db
+def test_events_written_in_the_transaction():
+    """
+    Ensure writes add their events, M2M changes of either side in the forward direction, and rollbacks none
+    """
+    topic = QuestionTopicFactory()
+    question = QuestionFactory()
+    topic.question_set.add(question)
+    question.topics.clear()
+
+    events = list(OutboxEvent.objects.order_by("pk").values_list("model", "action", "payload"))
+    relation = {"relation": "topics", "sources": [str(question.pk)], "targets": [str(topic.pk)]}
+    assert events == [
+        ("topics.questiontopic", "save", {}),
+        ("questions.question", "save", {}),
+        ("topics.questiontopic", "m2m", relation),
+        ("questions.question", "m2m", relation),
+    ]
+
+    OutboxEvent.objects.all().delete()
+    with pytest.raises(ValueError):
+        with transaction.atomic():
+            QuestionFactory().topics.add(topic)
+            raise ValueError("Rolled back")
+    assert not OutboxEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_drain_delivers_at_least_once():
+    """
+    Ensure the drain recounts the changed counters, invalidates the cached searches, and events delivered twice
+    have the effect of one
+    """
+    topic, tag = QuestionTopicFactory(), AnswerTagFactory()
+    question = QuestionFactory()
+    question.topics.add(topic)
+    AnswerFactory(question=question).tags.add(tag)
+    generation = search_generation()
+
+    assert drain_outbox(batch_size=2) == OutboxEvent.objects.count()
+    OutboxEvent.objects.update(processed_at=None)
+    drain_outbox()
+
+    topic.refresh_from_db()
+    tag.refresh_from_db()
+    assert (topic.question_count, tag.answer_count) == (1, 1)
+    assert search_generation() > generation
+    assert not OutboxEvent.objects.filter(processed_at=None).exists()
+    assert drain_outbox() == 0
+
+
+@pytest.mark.django_db
+def test_drain_retries_failed_events(monkeypatch, settings):
+    """
+    Ensure a failing event does not block its batch, and is given up after OUTBOX_MAX_ATTEMPTS
+    """
+    settings.OUTBOX_MAX_ATTEMPTS = 2
+    topic = QuestionTopicFactory()
+    failing, question = QuestionFactory.create_batch(2)
+    failing.topics.add(topic)
+    OutboxEvent.objects.all().delete()
+    failing.delete()
+    question.topics.add(topic)
+
+    def add(changes, event):
+        if event.action == OutboxEvent.DELETE:
+            raise RuntimeError("Failed")
+        add.__wrapped__(changes, event)
+
+    add.__wrapped__ = drain.Changes.add
+    monkeypatch.setattr(drain.Changes, "add", add)
+
+    assert drain_outbox() == 2
+    deleted = OutboxEvent.objects.get(action=OutboxEvent.DELETE)
+    assert (deleted.attempts, deleted.processed_at) == (1, None)
+    assert "Failed" in deleted.error
+    topic.refresh_from_db()
+    assert topic.question_count == 1
+
+    drain_outbox()
+    deleted.refresh_from_db()
+    assert deleted.attempts == 2
+    assert deleted.processed_at is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_drain_queued_on_commit():
+    """
+    Ensure a committed write queues a drain (run in-process by the eager tasks)
+    """
+    topic = QuestionTopicFactory()
+    with transaction.atomic():
+        for question in QuestionFactory.create_batch(2):
+            question.topics.add(topic)
+
+    topic.refresh_from_db()
+    assert topic.question_count == 2
+    assert not OutboxEvent.objects.filter(processed_at=None).exists()
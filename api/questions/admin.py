@@ -45,6 +45,8 @@ class QuestionAdmin(admin.ModelAdmin):
         else:
             return None
 
+    # Avoids one query per row for the canonical answer/owner columns
+    list_select_related = ("canonical_answer", "owner")
     list_filter = ("is_active",)
     raw_id_fields = ("canonical_answer", "owner")
     readonly_fields = ("question_id",)
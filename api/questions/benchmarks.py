@@ -0,0 +1,170 @@
+"""
+Benchmarks for the Questions endpoints
+"""
+import json
+import uuid
+
+from api.core.benchmarks.base import benchmark
+from api.core.benchmarks.client import get, post
+from api.core.benchmarks.corpus import WORDS
+from api.questions.models import Question
+from api.questions.related import compute_all_related
+from api.questions.serializers import QuestionSerializer
+from api.questions.views import (
+    questions_autocomplete,
+    questions_create,
+    questions_info,
+    questions_search,
+    questions_similar,
+)
+
+PER_PAGE = 100
+# Values of the IN search benchmarks, questions_search.in.<size>
+IN_SEARCH_SIZES = (10, 1000, 10000, 100000)
+
+
+@benchmark("questions_search.plain")
+def search_plain(corpus):
+    get(questions_search, corpus.user, {"title": "How", "per_page": PER_PAGE})
+
+
+@benchmark("questions_search.contains")
+def search_contains(corpus):
+    get(questions_search, corpus.user, {"title": "$" + corpus.random.choice(WORDS), "per_page": PER_PAGE})
+
+
+@benchmark("questions_search.operator")
+def search_operator(corpus):
+    get(
+        questions_search,
+        corpus.user,
+        {"operator": "OR", "title": ["What", "Why"], "per_page": PER_PAGE},
+    )
+
+
+@benchmark("questions_search.advanced")
+def search_advanced(corpus):
+    get(
+        questions_search,
+        corpus.user,
+        {
+            "operator": "ADVANCED",
+            "_OR": ['{"title": "What"}', '{"_AND": [{"title": "How"}, {"context": "$tumor"}]}'],
+            "per_page": PER_PAGE,
+        },
+    )
+
+
+@benchmark("questions_search.advanced.large")
+def search_advanced_large(corpus):
+    # ~100 terms, parsed on the first round then served from the grammar's cache
+    terms = [{"_AND": [{"title": word}, {"context": "$tumor"}]} for word in WORDS]
+    get(
+        questions_search,
+        corpus.user,
+        {"operator": "ADVANCED", "_OR": [json.dumps(terms)], "per_page": PER_PAGE},
+    )
+
+
+def _in_values(corpus, size):
+    key = "questions_search.in.%s" % size
+    if key not in corpus.cache:
+        # The sampled questions, padded with IDs matching nothing
+        values = [str(question_id) for question_id in corpus.question_ids[:size]]
+        corpus.cache[key] = values + [str(uuid.uuid4()) for _ in range(size - len(values))]
+    return corpus.cache[key]
+
+
+def _in_search_benchmark(size):
+    @benchmark("questions_search.in.%s" % size, rounds=5 if size >= 10000 else None)
+    def search_in(corpus):
+        list(Question.active_objects.IN(question_id=_in_values(corpus, size)).values_list("pk", flat=True))
+
+    return search_in
+
+
+for _size in IN_SEARCH_SIZES:
+    _in_search_benchmark(_size)
+
+
+@benchmark("questions_search.facets")
+def search_facets(corpus):
+    # A new filter shape each round, the facet counts are computed (not read from the cache)
+    get(
+        questions_search,
+        corpus.user,
+        {
+            "title": "$" + corpus.random.choice(WORDS),
+            "context": "$" + corpus.random.choice(WORDS),
+            "facets": "topics,tags,owner",
+            "per_page": PER_PAGE,
+        },
+    )
+
+
+@benchmark("questions_search.date_range")
+def search_date_range(corpus):
+    get(
+        questions_search,
+        corpus.user,
+        {
+            "created_at_date_start": "2021-01-01T00:00:00",
+            "created_at_date_end": "2021-06-30T00:00:00",
+            "per_page": PER_PAGE,
+        },
+    )
+
+
+@benchmark("questions_search.deep_page")
+def search_deep_page(corpus):
+    page = max(1, min(50, corpus.questions // PER_PAGE))
+    get(questions_search, corpus.user, {"page": page, "per_page": PER_PAGE})
+
+
+@benchmark("questions_autocomplete")
+def autocomplete(corpus):
+    # Typing a word: its first 1 to 5 characters, the index is built by the warmup rounds
+    word = corpus.random.choice(WORDS)
+    get(questions_autocomplete, corpus.user, {"q": word[: corpus.random.randint(1, 5)]})
+
+
+@benchmark("questions_similar")
+def similar(corpus):
+    # Questions similar to an existing one, the index is built by the warmup rounds
+    get(questions_similar, corpus.user, {"question_id": corpus.random_question_id()})
+
+
+@benchmark("questions_similar.text")
+def similar_text(corpus):
+    get(questions_similar, corpus.user, {"title": " ".join(corpus.random.choices(WORDS, k=6))})
+
+
+@benchmark("questions_info")
+def info(corpus):
+    get(questions_info, corpus.user, question_id=corpus.random_question_id())
+
+
+@benchmark("questions_info.related")
+def info_related(corpus):
+    if "questions.related" not in corpus.cache:
+        corpus.cache["questions.related"] = compute_all_related()
+
+    get(questions_info, corpus.user, {"expand": "related"}, question_id=corpus.random_question_id())
+
+
+@benchmark("questions_create")
+def create(corpus):
+    post(
+        questions_create,
+        corpus.user,
+        {"title": "Benchmark question", "context": "benchmark", "topics": [{"title": "Topic 1"}]},
+    )
+
+
+@benchmark("questions.serialization")
+def serialization(corpus):
+    if "questions.serialization" not in corpus.cache:
+        questions = QuestionSerializer.setup_eager_loading(Question.active_objects.all())
+        corpus.cache["questions.serialization"] = list(questions.order_by("-created_at")[:PER_PAGE])
+
+    QuestionSerializer(corpus.cache["questions.serialization"], many=True).data
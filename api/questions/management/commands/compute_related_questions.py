@@ -0,0 +1,22 @@
+"""
+Compute the related questions of every question
+"""
+from django.core.management.base import BaseCommand
+
+from api.questions.related import compute_all_related
+
+
+class Command(BaseCommand):
+    """
+    Recompute and store the top related questions (shared topics and tags) of every question
+    """
+
+    help = """Recompute the related questions of every question from their topics and their answers' tags,
+    and replace the stored ones (also scheduled as the questions.compute_related task).
+
+    Ex: python manage.py compute_related_questions
+    """
+
+    def handle(self, **options):
+        stored = compute_all_related()
+        self.stdout.write("%s related question row(s) stored" % stored)
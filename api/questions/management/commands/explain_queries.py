@@ -0,0 +1,97 @@
+"""
+Report the index usage of the API query shapes
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from api.core.benchmarks import load_benchmarks
+from api.core.benchmarks.corpus import prepare_corpus
+from api.core.benchmarks.explain import explain_benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Seed a synthetic corpus in a test database and EXPLAIN the queries of every API query shape
+    """
+
+    help = """Seed a synthetic corpus in a test database and EXPLAIN the queries of every API query shape.
+
+    The query shapes are the benchmarks (see run_benchmarks). Queries reading a table without
+    an index are reported as SCAN, --strict fails the command when one is found.
+
+    Ex: python manage.py explain_queries --questions 100000 --only questions_search --strict
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=10000, help="Questions in the corpus")
+        parser.add_argument("--answers", type=int, default=2, help="Answers per question")
+        parser.add_argument("--topics", type=int, default=50, help="Topics in the corpus")
+        parser.add_argument("--tags", type=int, default=200, help="Answer tags in the corpus")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed of the corpus")
+        parser.add_argument("--only", nargs="*", default=None, help="Query shape (benchmark) name prefixes")
+        parser.add_argument("--output", default=None, help="Path of the JSON report")
+        parser.add_argument("--strict", action="store_true", help="Fail if a query reads a table without an index")
+        parser.add_argument(
+            "--allow-scan",
+            nargs="*",
+            default=["question_topic", "answer_tag"],
+            help="Small tables that may be read without an index",
+        )
+        parser.add_argument("--keepdb", action="store_true", help="Keep (and reuse) the seeded test database")
+
+    def handle(self, **options):
+        verbosity = options["verbosity"]
+        old_config = setup_databases(verbosity, interactive=False, keepdb=options["keepdb"])
+
+        try:
+            corpus = prepare_corpus(
+                questions=options["questions"],
+                answers_per_question=options["answers"],
+                topics=options["topics"],
+                tags=options["tags"],
+                seed=options["seed"],
+                keepdb=options["keepdb"],
+            )
+
+            load_benchmarks()
+            try:
+                plans = explain_benchmarks(corpus, names=options["only"])
+            except NotImplementedError as err:
+                raise CommandError(str(err))
+        finally:
+            teardown_databases(old_config, verbosity, keepdb=options["keepdb"])
+
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                json.dump(plans, report_file, indent=2, sort_keys=True)
+
+        scans = self.print_plans(plans, set(options["allow_scan"]))
+        if scans and options["strict"]:
+            raise CommandError("%s query(ies) read a table without an index" % scans)
+
+    def print_plans(self, plans, allowed_scans):
+        """
+        One line per query: INDEX or SCAN, the indexes used, the tables scanned and the query shape
+
+        Returns the number of queries scanning a table not in `allowed_scans`
+        """
+        scans = 0
+        for name, queries in sorted(plans.items()):
+            self.stdout.write(name)
+            for plan in queries:
+                full_scans = [table for table in plan["full_scans"] if table not in allowed_scans]
+                scans += bool(full_scans)
+
+                self.stdout.write(
+                    "  %-5s %s%s%s\n        %s"
+                    % (
+                        "SCAN" if full_scans else "INDEX",
+                        ", ".join(plan["indexes"]) or "-",
+                        " | scans: %s" % ", ".join(plan["full_scans"]) if plan["full_scans"] else "",
+                        " | sorts" if plan["sorts"] else "",
+                        plan["shape"][:200],
+                    )
+                )
+        return scans
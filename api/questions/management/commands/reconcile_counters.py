@@ -0,0 +1,32 @@
+"""
+Reconcile the denormalized counters
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.core.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    """
+    Recount the counters (answer_count, question_count) that drifted from their actual counts
+    """
+
+    help = """Recount Question.answer_count, QuestionTopic.question_count and AnswerTag.answer_count
+    where they drifted from the actual counts (bulk writes, raw SQL, data fixes).
+
+    Ex: python manage.py reconcile_counters --check
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report the drifted rows, fail if any")
+
+    def handle(self, **options):
+        with transaction.atomic():
+            drifted = reconcile_counters(fix=not options["check"])
+
+        for name, count in drifted.items():
+            self.stdout.write("%-24s %s drifted row(s)%s" % (name, count, "" if options["check"] else " recounted"))
+
+        if options["check"] and any(drifted.values()):
+            raise CommandError("%s counter row(s) drifted" % sum(drifted.values()))
@@ -0,0 +1,81 @@
+"""
+Run the API performance benchmarks
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from api.core.benchmarks import load_benchmarks
+from api.core.benchmarks.base import build_report, find_regressions, load_report, run_benchmarks, save_report
+from api.core.benchmarks.corpus import prepare_corpus
+
+
+class Command(BaseCommand):
+    """
+    Seed a synthetic corpus in a test database and benchmark the API hot paths
+    """
+
+    help = """Seed a synthetic corpus in a test database and benchmark the API hot paths.
+
+    Ex: python manage.py run_benchmarks --questions 100000 --output results.json --baseline baseline.json
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=10000, help="Questions in the corpus (10k - 1M)")
+        parser.add_argument("--answers", type=int, default=2, help="Answers per question")
+        parser.add_argument("--topics", type=int, default=50, help="Topics in the corpus")
+        parser.add_argument("--tags", type=int, default=200, help="Answer tags in the corpus")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed of the corpus")
+        parser.add_argument("--rounds", type=int, default=20, help="Timed rounds per benchmark")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed rounds per benchmark")
+        parser.add_argument("--only", nargs="*", default=None, help="Benchmark name prefixes to run")
+        parser.add_argument("--output", default="benchmarks.json", help="Path of the JSON results")
+        parser.add_argument("--baseline", default=None, help="Path of JSON results to compare against")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs the baseline")
+        parser.add_argument("--keepdb", action="store_true", help="Keep (and reuse) the seeded test database")
+
+    def handle(self, **options):
+        verbosity = options["verbosity"]
+        old_config = setup_databases(verbosity, interactive=False, keepdb=options["keepdb"])
+
+        try:
+            corpus = prepare_corpus(
+                questions=options["questions"],
+                answers_per_question=options["answers"],
+                topics=options["topics"],
+                tags=options["tags"],
+                seed=options["seed"],
+                keepdb=options["keepdb"],
+            )
+
+            load_benchmarks()
+            # The outbox drain runs in a Celery worker, not in the request path (eager tasks would run it inline)
+            with override_settings(OUTBOX_DRAIN_ON_COMMIT=False):
+                results = run_benchmarks(
+                    corpus, names=options["only"], rounds=options["rounds"], warmup=options["warmup"]
+                )
+            report = build_report(results, corpus=corpus.as_dict())
+            save_report(report, options["output"])
+        finally:
+            teardown_databases(old_config, verbosity, keepdb=options["keepdb"])
+
+        self.print_results(results)
+        self.stdout.write("Results saved to %s" % options["output"])
+
+        if options["baseline"]:
+            regressions = find_regressions(results, load_report(options["baseline"]), threshold=options["threshold"])
+            if regressions:
+                for name, regression in sorted(regressions.items()):
+                    self.stderr.write(
+                        "REGRESSION %s: %.3fms -> %.3fms (+%.1f%%)"
+                        % (name, regression["baseline"], regression["current"], regression["change"] * 100)
+                    )
+                raise CommandError("%s benchmark(s) regressed against %s" % (len(regressions), options["baseline"]))
+            self.stdout.write("No regressions against %s" % options["baseline"])
+
+    def print_results(self, results):
+        self.stdout.write("%-32s %10s %10s %10s %10s" % ("benchmark (ms)", "min", "median", "p95", "max"))
+        for name, summary in sorted(results.items()):
+            self.stdout.write(
+                "%-32s %10.3f %10.3f %10.3f %10.3f"
+                % (name, summary["min"], summary["median"], summary["p95"], summary["max"])
+            )
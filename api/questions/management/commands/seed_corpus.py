@@ -0,0 +1,39 @@
+"""
+Seed the database with a synthetic corpus
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from api.core.benchmarks.corpus import seed_corpus
+from api.questions.models import Question
+
+
+class Command(BaseCommand):
+    """
+    Seed the database with the synthetic benchmark corpus, for load tests
+    """
+
+    help = """Seed the database with a synthetic corpus of questions, answers, tags and topics.
+
+    Ex: python manage.py seed_corpus --questions 100000
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=10000, help="Questions in the corpus")
+        parser.add_argument("--answers", type=int, default=2, help="Answers per question")
+        parser.add_argument("--topics", type=int, default=50, help="Topics in the corpus")
+        parser.add_argument("--tags", type=int, default=200, help="Answer tags in the corpus")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed of the corpus")
+        parser.add_argument("--force", action="store_true", help="Seed even if the database has questions")
+
+    def handle(self, **options):
+        if Question.objects.exists() and not options["force"]:
+            raise CommandError("The database already has questions, use --force to add the corpus anyway")
+
+        seed_corpus(
+            questions=options["questions"],
+            answers_per_question=options["answers"],
+            topics=options["topics"],
+            tags=options["tags"],
+            seed=options["seed"],
+        )
+        self.stdout.write("Seeded %s questions" % options["questions"])
@@ -0,0 +1,28 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0003_alter_question_context'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='question',
+            name='context',
+            field=models.TextField(blank=True, db_index=True, default=None, max_length=256, null=True, verbose_name='Context'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='question_active_created_idx'),
+        ),
+        # Questions of a topic (topics_info, ?topics= searches) read the auto-created through table
+        # by questiontopic_id, the unique (question_id, questiontopic_id) index only serves the other way
+        migrations.RunSQL(
+            sql='CREATE INDEX question_topics_topic_question_idx ON question_topics (questiontopic_id, question_id)',
+            reverse_sql='DROP INDEX question_topics_topic_question_idx',
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:51
+
+from django.db import migrations, models
+
+
+# Searches are istartswith/icontains, which Django renders as UPPER("context"::text) LIKE UPPER(%s) on PostgreSQL:
+# a trigram GIN index on the same expression serves both, unlike the btree on the raw text it replaces
+# (costly on every insert, and failing for values over ~2.7KB)
+CREATE_TRIGRAM_INDEX = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    'CREATE INDEX IF NOT EXISTS question_context_trgm_idx ON "question" USING gin (UPPER("context") gin_trgm_ops)',
+]
+DROP_TRIGRAM_INDEX = ["DROP INDEX IF EXISTS question_context_trgm_idx"]
+
+
+def run_on_postgresql(statements):
+    """
+    SQLite has no trigram index, its LIKE never reads an index for these searches either
+    """
+
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0004_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='question',
+            name='context',
+            field=models.TextField(blank=True, default=None, max_length=256, null=True, verbose_name='Context'),
+        ),
+        migrations.RunPython(run_on_postgresql(CREATE_TRIGRAM_INDEX), run_on_postgresql(DROP_TRIGRAM_INDEX)),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_answers(apps, schema_editor):
+    Question = apps.get_model("questions", "Question")
+    Answer = apps.get_model("answers", "Answer")
+    counts = Answer.objects.filter(question=OuterRef("pk")).order_by().values("question").annotate(count=Count("*"))
+    Question.objects.update(answer_count=Coalesce(Subquery(counts.values("count")), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('answers', '0004_text_search_indexes'),
+        ('questions', '0005_text_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='answer_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Answer Count'),
+        ),
+        migrations.RunPython(count_answers, migrations.RunPython.noop),
+    ]
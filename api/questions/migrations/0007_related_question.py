@@ -0,0 +1,32 @@
+# Generated by Django 4.0.10 on 2026-10-19 13:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0006_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Score')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_questions', to='questions.question')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='questions.question')),
+            ],
+            options={
+                'verbose_name': 'Related Question',
+                'verbose_name_plural': 'Related Questions',
+                'db_table': 'question_related',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='relatedquestion',
+            constraint=models.UniqueConstraint(fields=('question', 'related'), name='question_related_unique'),
+        ),
+    ]
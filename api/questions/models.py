@@ -21,7 +21,10 @@ class Question(CoreModel):
 
     # Main information
     title = models.CharField("Title", max_length=256, blank=False, null=False, db_index=True)
-    context = models.TextField("Context", max_length=256, blank=True, null=True, db_index=True, default=None)
+    # Searched with istartswith/icontains, served by a trigram index on PostgreSQL (migration 0005)
+    context = models.TextField("Context", max_length=256, blank=True, null=True, default=None)
+    # Maintained by api/core/counters.py
+    answer_count = models.PositiveIntegerField("Answer Count", default=0)
     canonical_answer = models.ForeignKey(
         "answers.Answer",
         to_field="answer_id",
@@ -39,6 +42,12 @@ class Question(CoreModel):
         db_table = "question"
         verbose_name = "Question"
         verbose_name_plural = "Questions"
+        indexes = [
+            # Every search filters active questions and orders by -created_at (questions_search)
+            models.Index(
+                fields=["-created_at"], condition=models.Q(is_active=True), name="question_active_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Question: ID: {self.question_id} and Title: {self.title}"
@@ -70,3 +79,26 @@ class Question(CoreModel):
         ]
         exclude.extend(CoreModel.model_keys())
         return computed_model_keys(cls, field_name_exclusions=exclude, field_type_exclusions=[])
+
+
+class RelatedQuestion(models.Model):
+    """
+    Precomputed top related questions of a question, by shared topics and tags (api/questions/related.py)
+    """
+
+    question = models.ForeignKey(
+        "questions.Question", related_name="related_questions", on_delete=models.deletion.CASCADE
+    )
+    related = models.ForeignKey("questions.Question", related_name="+", on_delete=models.deletion.CASCADE)
+    score = models.FloatField("Score")
+
+    class Meta:
+        db_table = "question_related"
+        verbose_name = "Related Question"
+        verbose_name_plural = "Related Questions"
+        constraints = [
+            models.UniqueConstraint(fields=["question", "related"], name="question_related_unique"),
+        ]
+
+    def __str__(self):
+        return f"Related Question: {self.question_id} -> {self.related_id} ({self.score})"
@@ -0,0 +1,178 @@
+"""
+Related questions: the top RELATED_QUESTIONS_TOP_N questions sharing topics and tags with each question
+
+The questions and their features (topics, and the tags of their answers) are a sparse incidence
+matrix X. The scores are S = X W Xᵀ, W weighting each feature by its rarity (log(1 + N / df)):
+sharing a niche topic counts more than sharing the most used one. S is computed by batches of
+RELATED_QUESTIONS_BATCH_SIZE rows, and its top-N per row stored in RelatedQuestion.
+
+ * compute_related_questions task (CELERY_BEAT_SCHEDULE) or command: every question
+ * M2M changes of Question.topics and Answer.tags: the changed questions, and the questions whose
+   top-N they enter or leave, by the outbox drain (api/outbox/drain.py)
+
+Scores only depend on the shared features, so a refresh reads the rows of the changed questions'
+features only. Bulk writes send no signals, the scheduled job catches up with them.
+"""
+import logging
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from scipy import sparse
+
+from api.answers.models import Answer
+from api.core.lookups import in_lookup
+from api.core.utils import chunked
+from api.questions.models import Question, RelatedQuestion
+
+LOGGER = logging.getLogger("roon")
+
+TOPIC, TAG = "topic", "tag"
+
+
+def _pairs(question_ids=None, topic_ids=None, tag_ids=None):
+    """
+    (question_id, (kind, feature_id)) of the active questions, optionally only of some questions or features
+    """
+    topics = Question.topics.through.objects.filter(question__is_active=True)
+    tags = Answer.tags.through.objects.filter(answer__is_active=True, answer__question__is_active=True)
+    if question_ids is not None:
+        topics = topics.filter(Q(in_lookup("question_id", list(question_ids))))
+        tags = tags.filter(Q(in_lookup("answer__question_id", list(question_ids))))
+    if topic_ids is not None:
+        topics = topics.filter(Q(in_lookup("questiontopic_id", list(topic_ids)))) if topic_ids else topics.none()
+    if tag_ids is not None:
+        tags = tags.filter(Q(in_lookup("answertag_id", list(tag_ids)))) if tag_ids else tags.none()
+
+    for question_id, topic_id in topics.values_list("question_id", "questiontopic_id").iterator():
+        yield question_id, (TOPIC, topic_id)
+    for question_id, tag_id in tags.values_list("answer__question_id", "answertag_id").iterator():
+        yield question_id, (TAG, tag_id)
+
+
+def _incidence(pairs):
+    """
+    (X, questions, features) of the pairs: X[i, j] = 1 when questions[i] has features[j]
+    """
+    rows, cols = [], []
+    question_positions, feature_positions = {}, {}
+    for question_id, feature in pairs:
+        rows.append(question_positions.setdefault(question_id, len(question_positions)))
+        cols.append(feature_positions.setdefault(feature, len(feature_positions)))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(question_positions), len(feature_positions)),
+    )
+    # A tag of several answers of a question counts once
+    matrix.data[:] = 1
+    return matrix, list(question_positions), list(feature_positions)
+
+
+def compute_related(question_ids=None, top_n=None):
+    """
+    {question_id: [(related_id, score)], best first} of `question_ids` (every question with features when None)
+    """
+    top_n = top_n or settings.RELATED_QUESTIONS_TOP_N
+    if question_ids is not None:
+        question_ids = set(question_ids)
+        if not question_ids:
+            return {}
+        # The targets' features, then every question having one of them
+        features = {feature for _, feature in _pairs(question_ids=question_ids)}
+        topic_ids = [pk for kind, pk in features if kind == TOPIC]
+        pairs = _pairs(topic_ids=topic_ids, tag_ids=[pk for kind, pk in features if kind == TAG])
+    else:
+        pairs = _pairs()
+
+    matrix, questions, _ = _incidence(pairs)
+    positions = {question_id: position for position, question_id in enumerate(questions)}
+    targets = questions if question_ids is None else [pk for pk in question_ids if pk in positions]
+
+    document_frequency = np.asarray(matrix.sum(axis=0)).ravel()
+    weights = np.log1p(Question.active_objects.count() / np.maximum(document_frequency, 1)).astype(np.float32)
+    weighted = matrix.multiply(weights[np.newaxis, :]).tocsr().T
+
+    related = {} if question_ids is None else {pk: [] for pk in question_ids}
+    for batch in chunked([positions[pk] for pk in targets], settings.RELATED_QUESTIONS_BATCH_SIZE):
+        scores = (matrix[batch] @ weighted).tocsr()
+        for row, position in enumerate(batch):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            candidates, values = scores.indices[start:end], scores.data[start:end]
+            keep = candidates != position
+            candidates, values = candidates[keep], values[keep]
+            if len(values) > top_n:
+                best = np.argpartition(-values, top_n - 1)[:top_n]
+                candidates, values = candidates[best], values[best]
+            # Best score first, then question order
+            order = np.lexsort((candidates, -values))
+            related[questions[position]] = [
+                (questions[candidates[i]], round(float(values[i]), 4)) for i in order if values[i] > 0
+            ]
+    return related
+
+
+def store_related(related, replace_all=False):
+    """
+    Replace the stored related questions of the questions of `related` (of every question when replace_all)
+    """
+    rows = [
+        RelatedQuestion(question_id=question_id, related_id=related_id, score=score)
+        for question_id, scores in related.items()
+        for related_id, score in scores
+    ]
+    with transaction.atomic():
+        if replace_all:
+            RelatedQuestion.objects.all().delete()
+        else:
+            for chunk in chunked(related, settings.RELATED_QUESTIONS_BATCH_SIZE):
+                RelatedQuestion.objects.filter(Q(in_lookup("question_id", chunk))).delete()
+        RelatedQuestion.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def compute_all_related():
+    """
+    Compute and store the related questions of every question, returns the number of rows stored
+    """
+    start = time.perf_counter()
+    related = compute_related()
+    stored = store_related(related, replace_all=True)
+    LOGGER.info(
+        "Computed the related questions in %.3fms: %s questions, %s rows",
+        (time.perf_counter() - start) * 1000,
+        len(related),
+        stored,
+    )
+    return stored
+
+
+def refresh_related(question_ids):
+    """
+    Recompute the related questions of changed questions, and of the questions they enter or leave the top-N of
+    """
+    question_ids = {uuid.UUID(str(question_id)) for question_id in question_ids}
+    previous = RelatedQuestion.objects.filter(Q(in_lookup("related_id", list(question_ids))))
+    related = compute_related(question_ids)
+    affected = set(previous.values_list("question_id", flat=True))
+    affected.update(related_id for scores in related.values() for related_id, _ in scores)
+    related.update(compute_related(affected - question_ids))
+    return store_related(related)
+
+
+def related_questions(question_id, limit=None):
+    """
+    [{question_id, title, score}] of the stored related questions of a question, still active, best first
+    """
+    rows = (
+        RelatedQuestion.objects.filter(question_id=question_id, related__is_active=True)
+        .order_by("-score", "related_id")
+        .values_list("related_id", "related__title", "score")
+    )
+    return [
+        {"question_id": str(related_id), "title": title, "score": score}
+        for related_id, title, score in rows[: limit or settings.RELATED_QUESTIONS_TOP_N]
+    ]
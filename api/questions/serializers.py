@@ -12,7 +12,7 @@ from rest_framework.exceptions import ValidationError
 
 from api.answers.serializers import AnswerSerializer
 from api.core.models import EagerLoadingMixin
-from api.core.serializer import BaseModelSerializer, PaginationSerializer
+from api.core.serializer import BaseModelSerializer, PaginationSerializer, TimedListSerializer
 from api.questions.models import Question
 from api.topics.models import QuestionTopic
 from api.topics.serializers import QuestionTopicSerializer
@@ -32,18 +32,25 @@ class BaseQuestionSerializer(BaseModelSerializer, EagerLoadingMixin):
         "topics",
         "canonical_answer__tags",
         "answers",
-        "answers__question",
         "answers__tags",
     ]
+    # Serializer fields rendering a relation of another name
+    _EAGER_LOADING_SOURCES = {"canonical_answer": "canonical_answer_id"}
+
+    # Counters (api/core/counters.py)
+    answer_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Question
+        list_serializer_class = TimedListSerializer
         fields = (
             # Primary
             "question_id",
             # Main information
             "title",
             "context",
+            # Counters
+            "answer_count",
         )
         depth = 1
 
@@ -67,6 +74,7 @@ class QuestionSerializer(BaseQuestionSerializer):
 
     class Meta:
         model = Question
+        list_serializer_class = TimedListSerializer
         data_fields = (
             # Canonical
             "canonical_answer_id",
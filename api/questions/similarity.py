@@ -0,0 +1,241 @@
+"""
+Near-duplicate questions: per-process MinHash index of the question titles and contexts
+
+Each question is the set of its word bigrams (title and context), summarized by a MinHash
+signature of SIMILAR_QUESTIONS_PERMUTATIONS uint32: the fraction of equal values of two signatures
+estimates the Jaccard similarity of their bigrams. The signatures are split in SIMILAR_QUESTIONS_BANDS
+bands (LSH): questions sharing a band are the candidates, scored with their whole signature.
+
+The signatures and band hashes are NumPy arrays (about 320 bytes per question with the defaults),
+scanned in batches of SIMILAR_QUESTIONS_BATCH_SIZE rows. Like the autocomplete index
+(api/core/autocomplete.py), the index is built once per worker and refreshed from `last_modified`,
+reading again the SIMILAR_QUESTIONS_REFRESH_OVERLAP seconds before the previous refresh.
+"""
+import logging
+import re
+import threading
+import time
+import zlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from api.questions.models import Question
+
+LOGGER = logging.getLogger("roon")
+
+TOKEN_RE = re.compile(r"\w+")
+# Universal hashing (a * x + b) mod PRIME of the 32 bit shingle hashes, a and b under 2 ** 31:
+# a * x + b stays under 2 ** 64, in uint64
+PRIME = np.uint64(4294967311)
+EMPTY_HASH = np.uint32(0xFFFFFFFF)
+
+
+def shingles(title, context=None):
+    """
+    Word bigrams (single words for one word texts) of a question
+    """
+    words = TOKEN_RE.findall(("%s %s" % (title or "", context or "")).casefold())
+    if len(words) < 2:
+        return set(words)
+    return {"%s %s" % pair for pair in zip(words, words[1:])}
+
+
+class MinHasher(object):
+    """
+    MinHash signatures of shingle sets, and their LSH band hashes
+    """
+
+    def __init__(self, permutations, bands, seed=1):
+        assert permutations % bands == 0, "The permutations must split evenly into bands"
+        rng = np.random.RandomState(seed)
+        self.permutations = permutations
+        self.bands = bands
+        self.a = rng.randint(1, 1 << 31, size=permutations, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=permutations, dtype=np.uint64)
+        # Odd multipliers of the band hash (a polynomial hash of the band's rows)
+        self.band_multipliers = rng.randint(1, 1 << 62, size=permutations // bands, dtype=np.uint64) | np.uint64(1)
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return np.full(self.permutations, EMPTY_HASH, dtype=np.uint32)
+
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in shingle_set), dtype=np.uint64, count=len(shingle_set)
+        )
+        values = (np.outer(hashes, self.a) + self.b) % PRIME
+        return np.minimum(values.min(axis=0), np.uint64(EMPTY_HASH)).astype(np.uint32)
+
+    def band_hashes(self, signatures):
+        """
+        (rows, bands) uint32 hashes of (rows, permutations) signatures
+        """
+        rows = signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64)
+        hashes = (rows * self.band_multipliers).sum(axis=2)
+        return (hashes ^ (hashes >> np.uint64(32))).astype(np.uint32)
+
+
+class SimilarityIndex(object):
+    """
+    Signatures and band hashes of the active questions, in growable NumPy arrays
+    """
+
+    def __init__(self, permutations=None, bands=None, batch_size=None):
+        self.hasher = MinHasher(
+            permutations or settings.SIMILAR_QUESTIONS_PERMUTATIONS, bands or settings.SIMILAR_QUESTIONS_BANDS
+        )
+        self.batch_size = batch_size or settings.SIMILAR_QUESTIONS_BATCH_SIZE
+
+        self.signatures = np.empty((0, self.hasher.permutations), dtype=np.uint32)
+        self.band_table = np.empty((0, self.hasher.bands), dtype=np.uint32)
+        self.alive = np.empty(0, dtype=bool)
+        self.size = 0
+        self.ids = []
+        self.positions = {}
+        self.refreshed_at = None
+        self.lock = threading.RLock()
+
+    def build(self):
+        """
+        Index every active question
+        """
+        rows = Question.active_objects.values_list("question_id", "title", "context")
+        with self.lock:
+            # Refreshed from the start of the build, even without questions yet
+            self.refreshed_at = timezone.now()
+            for question_id, title, context in rows.iterator():
+                self.add(question_id, title, context)
+        return self
+
+    def refresh(self):
+        """
+        Apply the questions modified since the last build/refresh (and its overlap), returns the number applied
+        """
+        if self.refreshed_at is None:
+            return 0
+
+        started_at = timezone.now()
+        since = self.refreshed_at - timedelta(seconds=settings.SIMILAR_QUESTIONS_REFRESH_OVERLAP)
+        rows = Question.objects.filter(last_modified__gte=since).values_list(
+            "question_id", "title", "context", "is_active"
+        )
+        applied = 0
+        with self.lock:
+            for question_id, title, context, is_active in rows:
+                if is_active:
+                    self.add(question_id, title, context)
+                else:
+                    self.remove(question_id)
+                applied += 1
+            self.refreshed_at = started_at
+        return applied
+
+    def add(self, question_id, title, context=None):
+        """
+        Index (or index again) a question
+        """
+        question_id = str(question_id)
+        signature = self.hasher.signature(shingles(title, context))
+        with self.lock:
+            position = self.positions.get(question_id)
+            if position is None:
+                position = self._append(question_id)
+            self.signatures[position] = signature
+            self.band_table[position] = self.hasher.band_hashes(signature[np.newaxis])[0]
+            self.alive[position] = True
+
+    def remove(self, question_id):
+        with self.lock:
+            position = self.positions.get(str(question_id))
+            if position is not None:
+                self.alive[position] = False
+
+    def similar(self, title=None, context=None, question_id=None, threshold=None, limit=10):
+        """
+        [(question_id, score)] of the questions similar to a text, or to an indexed question, best first
+        """
+        threshold = settings.SIMILAR_QUESTIONS_THRESHOLD if threshold is None else threshold
+        with self.lock:
+            if question_id is not None:
+                position = self.positions[str(question_id)]
+                signature, exclude = self.signatures[position].copy(), position
+            else:
+                signature, exclude = self.hasher.signature(shingles(title, context)), None
+            bands = self.hasher.band_hashes(signature[np.newaxis])[0]
+
+            positions, scores = [], []
+            for start in range(0, self.size, self.batch_size):
+                end = min(start + self.batch_size, self.size)
+                # LSH candidates: a band in common, then the estimated Jaccard of the whole signature
+                candidates = np.flatnonzero((self.band_table[start:end] == bands).any(axis=1) & self.alive[start:end])
+                candidates += start
+                if exclude is not None:
+                    candidates = candidates[candidates != exclude]
+                candidate_scores = (self.signatures[candidates] == signature).mean(axis=1)
+                keep = candidate_scores >= threshold
+                positions.append(candidates[keep])
+                scores.append(candidate_scores[keep])
+
+            positions, scores = np.concatenate(positions or [[]]), np.concatenate(scores or [[]])
+            best = np.argsort(-scores, kind="stable")[:limit]
+            return [(self.ids[int(positions[i])], round(float(scores[i]), 4)) for i in best]
+
+    def _append(self, question_id):
+        if self.size == len(self.alive):
+            capacity = max(1024, 2 * self.size)
+            self.signatures = np.resize(self.signatures, (capacity, self.hasher.permutations))
+            self.band_table = np.resize(self.band_table, (capacity, self.hasher.bands))
+            alive = np.zeros(capacity, dtype=bool)
+            alive[: self.size] = self.alive[: self.size]
+            self.alive = alive
+
+        position = self.size
+        self.size += 1
+        self.ids.append(question_id)
+        self.positions[question_id] = position
+        return position
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+_last_refresh = 0.0
+
+
+def get_index():
+    """
+    The process' index, built on first use and refreshed every SIMILAR_QUESTIONS_REFRESH_INTERVAL seconds
+    """
+    global _last_refresh
+
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            build_index()
+        elif time.monotonic() - _last_refresh >= settings.SIMILAR_QUESTIONS_REFRESH_INTERVAL:
+            _last_refresh = time.monotonic()
+            _INDEX.refresh()
+    return _INDEX
+
+
+def build_index():
+    """
+    Build the process' index (worker start), returns it
+    """
+    global _INDEX, _last_refresh
+
+    start = time.perf_counter()
+    index = SimilarityIndex().build()
+    _INDEX, _last_refresh = index, time.monotonic()
+    LOGGER.info(
+        "Built the similar questions index in %.3fms: %s questions", (time.perf_counter() - start) * 1000, index.size
+    )
+    return index
+
+
+def reset_index():
+    """
+    Drop the process' index, the next get_index() builds it again
+    """
+    global _INDEX
+    _INDEX = None
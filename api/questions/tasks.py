@@ -0,0 +1,14 @@
+"""
+Background tasks of Questions
+"""
+from celery import shared_task
+
+from api.questions.related import compute_all_related
+
+
+@shared_task(name="questions.compute_related")
+def compute_related_questions():
+    """
+    Compute and store the related questions of every question
+    """
+    return compute_all_related()
@@ -0,0 +1,12 @@
+from factory import Faker
+from factory.django import DjangoModelFactory
+
+from api.questions.models import Question
+
+
+class QuestionFactory(DjangoModelFactory):
+    title = Faker("sentence")
+    context = Faker("sentence")
+
+    class Meta:
+        model = Question
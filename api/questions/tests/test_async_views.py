@@ -0,0 +1,63 @@
+"""
+Tests for the async read views served by ASGI deployments
+"""
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.core.query_instrumentation import record_queries
+from api.questions.tests.test_query_budgets import create_questions
+from api.questions.views import questions_info, questions_info_async, questions_search, questions_search_async
+from api.topics.tests.factories import QuestionTopicFactory
+from api.topics.views import topics_info, topics_info_async
+from api.users.tests.factories import UserFactory
+
+FACTORY = APIRequestFactory()
+
+
+def call(view, user, params=None, **kwargs):
+    request = FACTORY.get("/", params)
+    force_authenticate(request, user=user)
+    if asyncio.iscoroutinefunction(view):
+        return async_to_sync(view)(request, **kwargs)
+    return view(request, **kwargs)
+
+
+@pytest.mark.django_db
+def test_async_views_match_sync_views():
+    """
+    Ensure the async views return the same responses with the same queries as the sync views
+    """
+    user = UserFactory()
+    topic = QuestionTopicFactory()
+    questions = create_questions(3, topic=topic)
+
+    cases = [
+        (questions_info, questions_info_async, None, {"question_id": questions[0].question_id}),
+        (questions_search, questions_search_async, {"per_page": 2}, {}),
+        (topics_info, topics_info_async, None, {"topic_id": topic.topic_id}),
+    ]
+    for sync_view, async_view, params, kwargs in cases:
+        with record_queries() as sync_stats:
+            sync_response = call(sync_view, user, params, **kwargs)
+        with record_queries() as async_stats:
+            async_response = call(async_view, user, params, **kwargs)
+
+        assert async_response.status_code == sync_response.status_code == status.HTTP_200_OK
+        assert async_response.data == sync_response.data
+        assert async_stats.count == sync_stats.count
+
+
+@pytest.mark.django_db
+def test_async_questions_info_errors():
+    """
+    Ensure missing parameters and unknown questions are handled like the sync view
+    """
+    user = UserFactory()
+
+    assert call(questions_info_async, user).status_code == status.HTTP_428_PRECONDITION_REQUIRED
+    response = call(questions_info_async, user, question_id="00000000-0000-0000-0000-000000000000")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
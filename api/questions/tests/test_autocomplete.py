@@ -0,0 +1,120 @@
+"""
+Tests for questions_autocomplete and its prefix index
+"""
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from api.answers.tests.factories import AnswerTagFactory
+from api.core import autocomplete
+from api.core.autocomplete import PrefixIndex
+from api.core.query_instrumentation import record_queries
+from api.questions.models import Question
+from api.questions.tests.factories import QuestionFactory
+from api.topics.tests.factories import QuestionTopicFactory
+
+
+@pytest.fixture
+def api_client(api_client):
+    autocomplete.reset_index()
+    yield api_client
+    autocomplete.reset_index()
+
+
+@pytest.mark.django_db
+def test_autocomplete_ranks_prefix_matches(api_client):
+    """
+    Ensure titles of every kind starting with q are returned, highest score first
+    """
+    low = QuestionFactory(title="Treatment options?")
+    Question.objects.filter(pk=low.pk).update(answer_count=1)
+    high = QuestionFactory(title="treatment side effects")
+    Question.objects.filter(pk=high.pk).update(answer_count=5)
+    topic = QuestionTopicFactory(title="Treatment")
+    AnswerTagFactory(title="Diet")
+    QuestionFactory(title="Trial results", is_active=False)
+
+    response = api_client.get(reverse("questions:autocomplete"), {"q": "  TREAT"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [(result["kind"], result["id"]) for result in response.data["results"]] == [
+        ("question", str(high.question_id)),
+        ("question", str(low.question_id)),
+        ("topic", str(topic.topic_id)),
+    ]
+
+    response = api_client.get(reverse("questions:autocomplete"), {"q": "tr", "kinds": "topic", "limit": 1})
+    assert [result["title"] for result in response.data["results"]] == ["Treatment"]
+
+    with record_queries() as stats:
+        api_client.get(reverse("questions:autocomplete"), {"q": "t"})
+    assert stats.count == 0
+
+
+@pytest.mark.django_db
+def test_autocomplete_refresh_from_last_modified(api_client, settings):
+    """
+    Ensure new, renamed and deactivated rows are applied by the refresh
+    """
+    settings.AUTOCOMPLETE_REFRESH_INTERVAL = 0
+    renamed = QuestionFactory(title="Seizure medication")
+    removed = QuestionFactory(title="Seizure at night")
+    api_client.get(reverse("questions:autocomplete"), {"q": "sei"})
+
+    renamed.title = "Sleep and seizures"
+    renamed.save()
+    removed.is_active = False
+    removed.save()
+    added = QuestionFactory(title="Seizure diary")
+
+    response = api_client.get(reverse("questions:autocomplete"), {"q": "s"})
+
+    assert {result["id"] for result in response.data["results"]} == {str(renamed.question_id), str(added.question_id)}
+    response = api_client.get(reverse("questions:autocomplete"), {"q": "seizure"})
+    assert [result["title"] for result in response.data["results"]] == ["Seizure diary"]
+
+
+@pytest.mark.django_db
+def test_prefix_index_refresh_after_empty_build(settings):
+    """
+    Ensure sources without rows at build time are refreshed, and rows committed late are read again
+    """
+    index = PrefixIndex().build()
+    question = QuestionFactory(title="How to sleep")
+
+    assert index.refresh() == 1
+    assert [entry[2] for entry in index.search("how")] == [str(question.question_id)]
+
+    # Modified before the last refresh, committed after it
+    late = QuestionFactory(title="How to eat")
+    Question.objects.filter(pk=late.pk).update(last_modified=index.refreshed_at["question"] - timedelta(seconds=5))
+    assert index.refresh() == 2
+    assert len(index.search("how")) == 2
+
+    settings.AUTOCOMPLETE_REFRESH_OVERLAP = 0
+    assert index.refresh() == 0
+
+
+@pytest.mark.django_db
+def test_prefix_index_memory_budget():
+    """
+    Ensure the lowest scores are left out once the memory budget is reached
+    """
+    for answer_count in range(20):
+        question = QuestionFactory(title="Question %s" % answer_count)
+        Question.objects.filter(pk=question.pk).update(answer_count=answer_count)
+
+    index = PrefixIndex(memory_budget=10 * 350).build()
+
+    assert index.truncated
+    assert 0 < len(index.entries) < 20
+    assert index.memory <= 10 * 350
+    assert min(entry[4] for entry in index.entries) > 0
+
+
+@pytest.mark.django_db
+def test_autocomplete_requires_q(api_client):
+    response = api_client.get(reverse("questions:autocomplete"))
+    assert response.status_code == status.HTTP_428_PRECONDITION_REQUIRED
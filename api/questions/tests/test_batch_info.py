@@ -0,0 +1,106 @@
+"""
+Tests for questions_batch_info and the `fields` projection
+"""
+import uuid
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from api.core.query_instrumentation import record_queries
+from api.questions.tests.factories import QuestionFactory
+from api.questions.tests.test_query_budgets import create_questions
+
+
+@pytest.mark.django_db
+def test_batch_info_returns_requested_order_with_not_found_markers(api_client):
+    """
+    Ensure the questions are returned in request order, missing, inactive and invalid IDs as errors
+    """
+    first, second = QuestionFactory.create_batch(2)
+    inactive = QuestionFactory(is_active=False)
+    missing = str(uuid.uuid4())
+    question_ids = [str(second.question_id), missing, str(first.question_id), "not-a-uuid", str(inactive.question_id)]
+
+    response = api_client.post(reverse("questions:batch_info"), {"question_ids": question_ids}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.data["questions"]
+    assert [result["question_id"] for result in results] == question_ids
+    assert results[0]["title"] == second.title
+    assert results[2]["title"] == first.title
+    for result in (results[1], results[3], results[4]):
+        assert result["success"] is False
+        assert result["error_reason"] == "Question not found"
+
+
+@pytest.mark.django_db
+def test_batch_info_repeated_query_param_with_duplicates(api_client):
+    """
+    Ensure a repeated question_id query param is supported, duplicates included
+    """
+    question = QuestionFactory()
+
+    response = api_client.get(reverse("questions:batch_info"), {"question_id": [str(question.question_id)] * 2})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [result["title"] for result in response.data["questions"]] == [question.title] * 2
+
+
+@pytest.mark.django_db
+def test_batch_info_query_count_is_constant(api_client):
+    """
+    Ensure the questions are fetched with one query (and the eager loading ones), whatever their number
+    """
+    few_ids = [str(question.question_id) for question in create_questions(2)]
+    with record_queries() as few:
+        api_client.post(reverse("questions:batch_info"), {"question_ids": few_ids}, format="json")
+
+    many_ids = [str(question.question_id) for question in create_questions(10)]
+    with record_queries() as many:
+        response = api_client.post(reverse("questions:batch_info"), {"question_ids": many_ids}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert many.count == few.count
+    assert many.count <= settings.QUERY_BUDGETS["questions:batch_info"]
+
+
+@pytest.mark.django_db
+def test_batch_info_validates_ids(api_client):
+    """
+    Ensure the IDs are required and limited to QUESTIONS_BATCH_INFO_MAX_IDS
+    """
+    response = api_client.post(reverse("questions:batch_info"), {}, format="json")
+    assert response.status_code == status.HTTP_428_PRECONDITION_REQUIRED
+
+    with override_settings(QUESTIONS_BATCH_INFO_MAX_IDS=2):
+        question_ids = [str(uuid.uuid4()) for _ in range(3)]
+        response = api_client.post(reverse("questions:batch_info"), {"question_ids": question_ids}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_fields_projection_skips_unrequested_relations(api_client):
+    """
+    Ensure `fields` only renders (and eager loads) the requested fields, and rejects unknown ones
+    """
+    question = create_questions(1)[0]
+
+    with record_queries() as full:
+        api_client.get(reverse("questions:info", kwargs={"question_id": question.question_id}))
+    with record_queries() as projected:
+        response = api_client.get(
+            reverse("questions:info", kwargs={"question_id": question.question_id}), {"fields": "question_id,title"}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.data) == {"question_id", "title"}
+    assert projected.count < full.count
+
+    response = api_client.get(reverse("questions:search"), {"fields": ["question_id", "topics"]})
+    assert set(response.data["questions"][0]) == {"question_id", "topics"}
+
+    response = api_client.get(reverse("questions:search"), {"fields": "question_id,unknown"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
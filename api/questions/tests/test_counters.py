@@ -0,0 +1,129 @@
+"""
+Tests for the denormalized counters (api/core/counters.py)
+"""
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.answers.tests.factories import AnswerFactory, AnswerTagFactory
+from api.core.counters import reconcile_counters
+from api.outbox.drain import drain_outbox
+from api.questions.models import Question
+from api.questions.tests.factories import QuestionFactory
+from api.topics.tests.factories import QuestionTopicFactory
+from api.users.tests.factories import UserFactory
+
+
+def refreshed(*instances):
+    # The M2M counters are recounted by the outbox drain
+    drain_outbox()
+    for instance in instances:
+        instance.refresh_from_db()
+    return instances
+
+
+@pytest.mark.django_db
+def test_answer_count_follows_answers():
+    """
+    Ensure creating and deleting answers updates Question.answer_count
+    """
+    question = QuestionFactory()
+    answers = AnswerFactory.create_batch(3, question=question)
+    assert refreshed(question)[0].answer_count == 3
+
+    answers[0].delete()
+    assert refreshed(question)[0].answer_count == 2
+
+
+@pytest.mark.django_db
+def test_question_count_follows_topics():
+    """
+    Ensure M2M changes from both sides and question deletes update QuestionTopic.question_count, once drained
+    """
+    first, second = QuestionTopicFactory.create_batch(2)
+    questions = QuestionFactory.create_batch(3)
+
+    questions[0].topics.add(first, second)
+    questions[1].topics.add(first)
+    second.question_set.add(questions[2])
+    assert [topic.question_count for topic in refreshed(first, second)] == [2, 2]
+
+    questions[0].topics.remove(second)
+    questions[1].topics.clear()
+    assert [topic.question_count for topic in refreshed(first, second)] == [1, 1]
+
+    questions[0].delete()
+    second.question_set.clear()
+    assert [topic.question_count for topic in refreshed(first, second)] == [0, 0]
+
+
+@pytest.mark.django_db
+def test_tag_answer_count_follows_tags():
+    """
+    Ensure tagging and deleting answers update AnswerTag.answer_count, once drained
+    """
+    tag = AnswerTagFactory()
+    answers = AnswerFactory.create_batch(2)
+    for answer in answers:
+        answer.tags.add(tag)
+    assert refreshed(tag)[0].answer_count == 2
+
+    answers[0].delete()
+    assert refreshed(tag)[0].answer_count == 1
+
+
+@pytest.mark.django_db
+def test_reconcile_counters():
+    """
+    Ensure drift from writes without signals is found and recounted
+    """
+    question = QuestionFactory()
+    AnswerFactory.create_batch(2, question=question)
+    Question.objects.filter(pk=question.pk).update(answer_count=7)
+
+    with pytest.raises(CommandError):
+        call_command("reconcile_counters", "--check")
+
+    assert reconcile_counters()["question.answer_count"] == 1
+    assert refreshed(question)[0].answer_count == 2
+    assert not any(reconcile_counters(fix=False).values())
+
+
+@pytest.mark.django_db
+def test_questions_search_filters_and_sorts_on_answer_count():
+    """
+    Ensure answer_count is returned, filterable with comparison prefixes and sortable
+    """
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    for answers in (0, 1, 3):
+        AnswerFactory.create_batch(answers, question=QuestionFactory())
+
+    response = client.get(reverse("questions:search"), {"answer_count": ">=1", "order_by": "-answer_count"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [question["answer_count"] for question in response.data["questions"]] == [3, 1]
+
+    response = client.get(reverse("questions:search"), {"answer_count": "=0"})
+    assert [question["answer_count"] for question in response.data["questions"]] == [0]
+
+
+@pytest.mark.django_db
+def test_comparison_prefixes_not_applied_to_text():
+    """
+    Ensure a text value starting with a comparison prefix is still a startswith search
+    """
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    for title in ("<3 hearts", ">50mg doses", "=x", "Other"):
+        QuestionFactory(title=title)
+
+    for prefix, title in (("<3", "<3 hearts"), (">50MG", ">50mg doses"), ("=x", "=x")):
+        response = client.get(reverse("questions:search"), {"title": prefix})
+        assert response.status_code == status.HTTP_200_OK
+        assert [question["title"] for question in response.data["questions"]] == [title]
+
+    advanced = {"operator": "ADVANCED", "_OR": ['{"title": "<3"}', '{"answer_count": ">=1"}']}
+    response = client.get(reverse("questions:search"), advanced)
+    assert [question["title"] for question in response.data["questions"]] == ["<3 hearts"]
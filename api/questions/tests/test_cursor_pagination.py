@@ -0,0 +1,43 @@
+"""
+Tests for the cursor pagination fast path of questions_search
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from api.questions.tests.factories import QuestionFactory
+
+
+@pytest.mark.django_db
+def test_questions_search_cursor_pages(api_client):
+    """
+    Ensure following next_cursor returns every question once, ordered by question_id
+    """
+    questions = QuestionFactory.create_batch(5)
+    inactive = QuestionFactory(is_active=False)
+
+    seen, cursor = [], ""
+    for _ in range(len(questions)):
+        response = api_client.get(reverse("questions:search"), {"cursor": cursor, "per_page": 2})
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(question["question_id"] for question in response.data["questions"])
+        assert response.data["pagination_info"]["page_count"] == len(response.data["questions"])
+
+        cursor = response.data["pagination_info"]["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == sorted((str(question.question_id) for question in questions), reverse=True)
+    assert str(inactive.question_id) not in seen
+
+
+@pytest.mark.django_db
+def test_questions_search_cursor_rejects_order_by(api_client):
+    """
+    Ensure cursor pagination does not silently ignore another ordering or an invalid cursor
+    """
+    response = api_client.get(reverse("questions:search"), {"cursor": "", "order_by": "title"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.get(reverse("questions:search"), {"cursor": "not-a-uuid"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,76 @@
+"""
+Query budget tests for the Questions endpoints
+
+QUERY_BUDGET_ENFORCE is set in the test settings, so any request exceeding
+settings.QUERY_BUDGETS raises QueryBudgetExceeded.
+"""
+import pytest
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import status
+
+from api.answers.tests.factories import AnswerFactory, AnswerTagFactory
+from api.core.query_instrumentation import record_queries
+from api.questions.tests.factories import QuestionFactory
+from api.topics.tests.factories import QuestionTopicFactory
+
+
+def create_questions(count, answers=3, topic=None):
+    tags = AnswerTagFactory.create_batch(2)
+    topic = topic or QuestionTopicFactory()
+    questions = []
+    for _ in range(count):
+        question = QuestionFactory()
+        question.topics.add(topic)
+        for answer in AnswerFactory.create_batch(answers, question=question):
+            answer.tags.add(*tags)
+        questions.append(question)
+    return questions
+
+
+@pytest.mark.django_db
+def test_questions_search_query_count_is_constant(api_client):
+    """
+    Ensure questions_search does not run queries per question (N+1)
+    """
+    create_questions(2)
+    with record_queries() as few:
+        response = api_client.get(reverse("questions:search"))
+    assert response.status_code == status.HTTP_200_OK
+
+    create_questions(10)
+    with record_queries() as many:
+        response = api_client.get(reverse("questions:search"))
+    assert response.status_code == status.HTTP_200_OK
+
+    assert many.count == few.count
+    assert many.count <= settings.QUERY_BUDGETS["questions:search"]
+
+
+@pytest.mark.django_db
+def test_questions_info_within_budget(api_client):
+    """
+    Ensure questions_info stays within its budget regardless of answer count
+    """
+    question = create_questions(1, answers=10)[0]
+
+    with record_queries() as stats:
+        response = api_client.get(reverse("questions:info", kwargs={"question_id": question.question_id}))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert stats.count <= settings.QUERY_BUDGETS["questions:info"]
+    assert not stats.duplicates
+
+
+@pytest.mark.django_db
+def test_topics_info_within_budget(api_client):
+    """
+    Ensure topics_info stays within its budget
+    """
+    topic = QuestionTopicFactory()
+    create_questions(5, topic=topic)
+
+    response = api_client.get(reverse("topics:info", kwargs={"topic_id": topic.topic_id}))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["questions"]) == 5
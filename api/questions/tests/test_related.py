@@ -0,0 +1,92 @@
+"""
+Tests for the related questions (shared topics and tags) and questions_info?expand=related
+"""
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from api.answers.tests.factories import AnswerFactory, AnswerTagFactory
+from api.questions.models import RelatedQuestion
+from api.questions.related import compute_related
+from api.questions.tests.factories import QuestionFactory
+from api.topics.tests.factories import QuestionTopicFactory
+
+
+def _related(question):
+    return list(
+        RelatedQuestion.objects.filter(question=question).order_by("-score").values_list("related_id", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_compute_related_ranks_shared_features(settings):
+    """
+    Ensure questions sharing more, and rarer, topics and tags rank first, without the question itself
+    """
+    settings.RELATED_QUESTIONS_REFRESH_ON_CHANGE = False
+    common, rare = QuestionTopicFactory(), QuestionTopicFactory()
+    tag = AnswerTagFactory()
+    question, both, common_only, tagged, unrelated = QuestionFactory.create_batch(5)
+    for related in (question, both, common_only, unrelated):
+        related.topics.add(common)
+    for related in (question, both):
+        related.topics.add(rare)
+    for related in (question, tagged):
+        for answer in AnswerFactory.create_batch(2, question=related):
+            answer.tags.add(tag)
+    QuestionFactory(is_active=False).topics.add(rare)
+
+    call_command("compute_related_questions")
+
+    assert _related(question)[:2] == [both.question_id, tagged.question_id]
+    assert set(_related(question)[2:]) == {common_only.question_id, unrelated.question_id}
+    assert _related(tagged) == [question.question_id]
+    assert compute_related([question.question_id], top_n=1) == {
+        question.question_id: [(both.question_id, RelatedQuestion.objects.get(question=question, related=both).score)]
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_related_refreshed_on_m2m_changed():
+    """
+    Ensure topic and tag changes refresh the changed questions and the questions they enter or leave
+    """
+    topic, tag = QuestionTopicFactory(), AnswerTagFactory()
+    question, other = QuestionFactory.create_batch(2)
+
+    question.topics.add(topic)
+    other.topics.add(topic)
+    assert _related(question) == [other.question_id]
+    assert _related(other) == [question.question_id]
+
+    topic.question_set.remove(other)
+    assert _related(question) == []
+    assert _related(other) == []
+
+    AnswerFactory(question=other).tags.add(tag)
+    tag.answer_set.add(AnswerFactory(question=question))
+    assert _related(question) == [other.question_id]
+    assert _related(other) == [question.question_id]
+
+
+@pytest.mark.django_db
+def test_questions_info_expand_related(api_client, settings):
+    settings.RELATED_QUESTIONS_REFRESH_ON_CHANGE = False
+    topic = QuestionTopicFactory()
+    question, related, inactive = QuestionFactory.create_batch(3)
+    for each in (question, related, inactive):
+        each.topics.add(topic)
+    call_command("compute_related_questions")
+    inactive.active = False
+    inactive.save()
+
+    url = reverse("questions:info", kwargs={"question_id": question.question_id})
+    response = api_client.get(url, {"expand": "related"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["related"] == [
+        {"question_id": str(related.question_id), "title": related.title, "score": response.data["related"][0]["score"]}
+    ]
+    assert "related" not in api_client.get(url).data
+    assert api_client.get(url, {"expand": "answers"}).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,79 @@
+"""
+Tests for the facet counts of questions_search
+"""
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+
+from api.answers.tests.factories import AnswerFactory, AnswerTagFactory
+from api.core.query_instrumentation import record_queries
+from api.core.search import filter_shape
+from api.questions.tests.factories import QuestionFactory
+from api.topics.tests.factories import QuestionTopicFactory
+from api.users.tests.factories import UserFactory
+
+
+@pytest.fixture
+def api_client(api_client):
+    cache.clear()
+    return api_client
+
+
+@pytest.mark.django_db
+def test_search_facets_count_matching_questions(api_client):
+    """
+    Ensure each facet counts the distinct matching questions per value, over every page
+    """
+    treatment, diet = QuestionTopicFactory(title="treatment"), QuestionTopicFactory(title="diet")
+    tag = AnswerTagFactory(title="helpful")
+    questions = [QuestionFactory(title="How %s" % i) for i in range(3)]
+    QuestionFactory(title="What").topics.add(treatment)
+    for question in questions:
+        question.topics.add(treatment)
+        for answer in AnswerFactory.create_batch(2, question=question):
+            answer.tags.add(tag)
+    questions[0].topics.add(diet)
+
+    response = api_client.get(reverse("questions:search"), {"title": "How", "facets": "topics,tags", "per_page": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert list(response.data) == ["pagination_info", "facets", "questions"]
+    assert response.data["facets"] == {
+        "topics": [
+            {"value": str(treatment.topic_id), "label": "treatment", "count": 3},
+            {"value": str(diet.topic_id), "label": "diet", "count": 1},
+        ],
+        "tags": [{"value": str(tag.tag_id), "label": "helpful", "count": 3}],
+    }
+
+
+@pytest.mark.django_db
+def test_search_facets_cached_per_filter_shape(api_client):
+    """
+    Ensure the counts are cached per filters, whatever the page
+    """
+    QuestionFactory(title="How", owner=UserFactory())
+    QuestionFactory(title="What")
+    labels = {result: {"cache": "search_facets", "result": result} for result in ("hit", "miss")}
+    lookups = {result: REGISTRY.get_sample_value("roon_cache_requests_total", labels[result]) or 0 for result in labels}
+
+    with record_queries() as first:
+        response = api_client.get(reverse("questions:search"), {"title": "How", "facets": "owner"})
+    with record_queries() as cached:
+        api_client.get(reverse("questions:search"), {"title": "How", "facets": "owner"})
+    assert cached.count == first.count - 1
+    for result in labels:
+        assert REGISTRY.get_sample_value("roon_cache_requests_total", labels[result]) == lookups[result] + 1
+    assert filter_shape({"title": "How", "page": "2", "per_page": "5"}) == filter_shape({"title": "How"})
+    assert [row["count"] for row in response.data["facets"]["owner"]] == [1]
+
+    response = api_client.get(reverse("questions:search"), {"facets": "owner"})
+    assert sum(row["count"] for row in response.data["facets"]["owner"]) == 1
+
+
+@pytest.mark.django_db
+def test_search_facets_unknown(api_client):
+    response = api_client.get(reverse("questions:search"), {"facets": "topics,unknown"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
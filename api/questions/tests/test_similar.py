@@ -0,0 +1,169 @@
+"""
+Tests for questions_similar, the duplicate check of questions_create and the similarity index
+"""
+import zlib
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from api.core.query_instrumentation import record_queries
+from api.questions import similarity
+from api.questions.models import Question
+from api.questions.similarity import PRIME, MinHasher, SimilarityIndex, shingles
+from api.questions.tests.factories import QuestionFactory
+
+
+@pytest.fixture
+def api_client(api_client):
+    similarity.reset_index()
+    yield api_client
+    similarity.reset_index()
+
+
+def test_minhash_estimates_jaccard():
+    """
+    Ensure the share of equal signature values estimates the Jaccard similarity of the shingles
+    """
+    hasher = MinHasher(256, 32)
+    first = {"word %s" % i for i in range(100)}
+    second = {"word %s" % i for i in range(50, 150)}  # Jaccard 50 / 150
+
+    estimate = (hasher.signature(first) == hasher.signature(second)).mean()
+
+    assert abs(estimate - 1 / 3) < 0.1
+    assert (hasher.signature(first) == hasher.signature(set(first))).all()
+    assert shingles("How to treat", "a fever?") == {"how to", "to treat", "treat a", "a fever"}
+
+
+def test_minhash_universal_hashing_does_not_overflow():
+    """
+    Ensure the signature is the min of (a * x + b) mod PRIME, without uint64 wrap around
+    """
+    hasher = MinHasher(64, 16)
+    shingle_set = {"ab", "how to", "\uffff" * 8}
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingle_set]
+
+    expected = [min((int(a) * x + int(b)) % int(PRIME) for x in hashes) for a, b in zip(hasher.a, hasher.b)]
+
+    assert hasher.signature(shingle_set).tolist() == expected
+    # The largest 32 bit hash too
+    assert int(hasher.a.max()) * 0xFFFFFFFF + int(hasher.b.max()) < 2**64
+
+
+@pytest.mark.django_db
+def test_similar_questions(api_client):
+    """
+    Ensure questions_similar returns the active near-duplicates, most similar first, without the question itself
+    """
+    question = QuestionFactory(title="How do I treat a fever in young children", context="at night")
+    close = QuestionFactory(title="How do I treat a fever in young children", context="during the day")
+    closer = QuestionFactory(title="how do I treat a fever in young children?", context="at night")
+    QuestionFactory(title="How do I treat a fever in young children", context="at night", is_active=False)
+    QuestionFactory(title="Best diet for the elderly", context="")
+
+    response = api_client.get(reverse("questions:similar"), {"question_id": str(question.question_id)})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [result["question_id"] for result in response.data["results"]] == [
+        str(closer.question_id),
+        str(close.question_id),
+    ]
+    assert response.data["results"][0]["score"] == 1.0
+
+    response = api_client.get(
+        reverse("questions:similar"), {"title": "Treat a fever in young children", "threshold": 0.4, "limit": 1}
+    )
+    assert len(response.data["results"]) == 1
+
+    with record_queries() as stats:
+        api_client.get(reverse("questions:similar"), {"title": "Best diet for the elderly", "threshold": 0.9})
+    assert stats.count == 1
+
+
+@pytest.mark.django_db
+def test_similar_questions_refresh(api_client, settings):
+    """
+    Ensure new, edited and deactivated questions are applied by the refresh
+    """
+    settings.SIMILAR_QUESTIONS_REFRESH_INTERVAL = 0
+    edited = QuestionFactory(title="Side effects of the new medication", context="")
+    removed = QuestionFactory(title="Which exercises help with back pain", context="")
+    api_client.get(reverse("questions:similar"), {"title": "anything"})
+
+    edited.title = "Which exercises help with back pain"
+    edited.save()
+    removed.is_active = False
+    removed.save()
+
+    response = api_client.get(reverse("questions:similar"), {"title": "Which exercises help with back pain"})
+
+    assert [result["question_id"] for result in response.data["results"]] == [str(edited.question_id)]
+
+
+@pytest.mark.django_db
+def test_similarity_refresh_after_empty_build(settings):
+    """
+    Ensure an index built without questions is refreshed, and questions committed late are read again
+    """
+    index = SimilarityIndex().build()
+    question = QuestionFactory(title="How to treat a fever", context="")
+
+    assert index.refresh() == 1
+    assert index.similar(question_id=None, title="How to treat a fever") == [(str(question.question_id), 1.0)]
+
+    # Modified before the last refresh, committed after it
+    late = QuestionFactory(title="How to treat a cold", context="")
+    Question.objects.filter(pk=late.pk).update(last_modified=index.refreshed_at - timedelta(seconds=5))
+    assert index.refresh() == 2
+    assert index.size == 2
+
+    settings.SIMILAR_QUESTIONS_REFRESH_OVERLAP = 0
+    assert index.refresh() == 0
+
+
+@pytest.mark.django_db
+def test_create_check_duplicates(api_client, django_capture_on_commit_callbacks):
+    """
+    Ensure check_duplicates lists the near-duplicates, and the created question is indexed once committed
+    """
+    existing = QuestionFactory(title="Can I take ibuprofen with paracetamol", context="for a headache")
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = api_client.post(
+            reverse("questions:create"),
+            {"title": "Can I take ibuprofen with paracetamol", "context": "for a headache", "check_duplicates": True},
+            format="json",
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [result["question_id"] for result in response.data["possible_duplicates"]] == [str(existing.question_id)]
+    assert str(response.data["question_id"]) not in similarity.get_index().positions
+    for callback in callbacks:
+        callback()
+    assert str(response.data["question_id"]) in similarity.get_index().positions
+
+    similarity.reset_index()
+    response = api_client.post(reverse("questions:create"), {"title": "Can I take ibuprofen with paracetamol"})
+    assert "possible_duplicates" not in response.data
+    # No index built on the write path without check_duplicates
+    assert similarity._INDEX is None
+
+
+def test_similarity_index_grows_and_removes():
+    index = SimilarityIndex(permutations=16, bands=4)
+    for i in range(3000):
+        index.add(i, "question number %s about the same thing" % i)
+    index.remove(1)
+
+    assert index.size == 3000
+    assert len(index.signatures) >= 3000
+    assert "1" not in [question_id for question_id, _ in index.similar(question_id=0, threshold=0, limit=3000)]
+
+
+@pytest.mark.django_db
+def test_similar_requires_question_or_title(api_client):
+    assert api_client.get(reverse("questions:similar")).status_code == status.HTTP_428_PRECONDITION_REQUIRED
+    response = api_client.get(reverse("questions:similar"), {"title": "x", "threshold": 2})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,15 +1,24 @@
+from django.conf import settings
 from django.urls import path
 
 from api.questions import views
 
 app_name = "questions"
 
+# ASGI deployments serve the read endpoints with their async views
+questions_info = views.questions_info_async if settings.ASYNC_VIEWS else views.questions_info
+questions_batch_info = views.questions_batch_info_async if settings.ASYNC_VIEWS else views.questions_batch_info
+questions_search = views.questions_search_async if settings.ASYNC_VIEWS else views.questions_search
+
 urlpatterns = [
     path("", views.questions_root, name="root"),
     path("create/", views.questions_create, name="create"),
     path("update/", views.questions_update, name="update"),
-    path("info/", views.questions_info, name="info"),
-    path("info/<question_id>/", views.questions_info, name="info"),
-    path("search/", views.questions_search, name="search"),
+    path("info/", questions_info, name="info"),
+    path("info/<question_id>/", questions_info, name="info"),
+    path("batch_info/", questions_batch_info, name="batch_info"),
+    path("search/", questions_search, name="search"),
+    path("autocomplete/", views.questions_autocomplete, name="autocomplete"),
+    path("similar/", views.questions_similar, name="similar"),
 ]
 
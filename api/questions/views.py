@@ -1,26 +1,43 @@
 import logging
+import uuid
 from collections import OrderedDict
+from functools import partial
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db import transaction
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from api.core.async_views import async_api_view
+from api.core.autocomplete import SOURCES, get_index
 from api.core.exceptions import MissingParameterException
-from api.core.models import date_search, search_with_operator
-from api.core.utils import remove_forbidden_data, model_search
+from api.core.models import error_constructor
+from api.core.search import Facet, list_param, paginated_search, requested_fields
+from api.core.utils import remove_forbidden_data
 from api.core.view_exception_handler import view_exception_handling
+from api.questions import similarity
 from api.questions.models import Question
-from core.serializer import PaginationSerializer
+from api.questions.related import related_questions
 from questions.serializers import QuestionSerializer
 
 LOGGER = logging.getLogger("roon")
 
 FORBIDDEN_API_VALUES = settings.FORBIDDEN_API_VALUES
 
+# ?expand= of questions_info
+QUESTION_EXPANSIONS = ("related",)
+
+# ?facets= of questions_search
+QUESTION_FACETS = {
+    "topics": Facet("topics__topic_id", "topics__title"),
+    "tags": Facet("answers__tags__tag_id", "answers__tags__title"),
+    "owner": Facet("owner_id", "owner__username"),
+}
+
 
 @view_exception_handling()
 @api_view(["GET"])
@@ -34,7 +51,10 @@ def questions_root(request):
                 ("create", reverse("questions:create", request=request)),
                 ("update", reverse("questions:update", request=request)),
                 ("info", reverse("questions:info", request=request)),
+                ("batch_info", reverse("questions:batch_info", request=request)),
                 ("search", reverse("questions:search", request=request)),
+                ("autocomplete", reverse("questions:autocomplete", request=request)),
+                ("similar", reverse("questions:similar", request=request)),
             )
         )
     )
@@ -75,6 +95,8 @@ def questions_create(request):
         - context (str)
         - topics (array[dict[str, str]])
             - Ex: [{"title": "treatment"}, {"title": "something else"}]
+        - check_duplicates (bool): adds `possible_duplicates`, the existing questions at least
+          settings.SIMILAR_QUESTIONS_DUPLICATE_THRESHOLD similar (the question is created anyway)
     ---
     """
     context = None
@@ -96,9 +118,22 @@ def questions_create(request):
     if not serializer.is_valid():
         raise ValidationError(serializer.errors)
 
-    serializer.save(owner=request.user)
+    check_duplicates = str(request.data.get("check_duplicates", "")).lower() in ("1", "true")
+    duplicates = []
+    if check_duplicates:
+        index = similarity.get_index()
+        duplicates = index.similar(
+            params.get("title"), params.get("context"), threshold=settings.SIMILAR_QUESTIONS_DUPLICATE_THRESHOLD
+        )
 
-    return Response(serializer.data, status.HTTP_200_OK)
+    question = serializer.save(owner=request.user)
+
+    data = serializer.data
+    if check_duplicates:
+        # Indexed once committed, for the next checks of this worker (the refresh indexes it in the others)
+        transaction.on_commit(partial(index.add, question.question_id, question.title, question.context))
+        data = dict(data, possible_duplicates=_similar_questions(duplicates))
+    return Response(data, status.HTTP_200_OK)
 
 
 @view_exception_handling()
@@ -138,16 +173,164 @@ def questions_info(request, question_id=None):
     ** REQUIRED PARAMETERS **:
 
         - question_id
+
+    ** OPTIONAL PARAMETERS **:
+
+        - fields (str): only these fields, comma separated or repeated
+            - Ex: ?fields=question_id,title
+        - expand (str): also return, comma separated or repeated:
+            - related: `related`, the questions sharing the most topics and tags
+              [{"question_id", "title", "score"}], precomputed
     ---
     """
     if not question_id:
         raise MissingParameterException("question_id is required")
 
-    question = QuestionSerializer.setup_eager_loading(Question.active_objects.all())
+    fields, expand = requested_fields(request.query_params), _expansions(request.query_params)
+    return Response(_get_question_data(question_id, fields, expand), status.HTTP_200_OK)
+
+
+@view_exception_handling()
+@async_api_view(["GET"])
+async def questions_info_async(request, question_id=None):
+    """
+    Please read documentation carefully.
+
+    ### Information on a Question ###
+
+    Async `questions_info`, served by ASGI deployments. Same parameters and response.
+    """
+    if not question_id:
+        raise MissingParameterException("question_id is required")
+
+    fields, expand = requested_fields(request.query_params), _expansions(request.query_params)
+    return Response(await sync_to_async(_get_question_data)(question_id, fields, expand), status.HTTP_200_OK)
+
+
+def _expansions(params):
+    """
+    Requested expansions (`expand` param) of questions_info
+    """
+    expand = list_param(params, "expand") or []
+    unknown = set(expand) - set(QUESTION_EXPANSIONS)
+    if unknown:
+        raise ValueError("Unknown expand: %s" % ", ".join(sorted(unknown)))
+    return expand
+
+
+def _get_question_data(question_id, fields=None, expand=()):
+    """
+    Serialized active Question, with its expansions, raises Question.DoesNotExist
+    """
+    question = QuestionSerializer.setup_eager_loading(Question.active_objects.all(), fields=fields)
     question = question.get(question_id=question_id)
-    serializer = QuestionSerializer(question)
+    data = QuestionSerializer(question, fields=fields).data
+    if "related" in expand:
+        data["related"] = related_questions(question.question_id)
+    return data
+
+
+@view_exception_handling()
+@api_view(["GET", "POST"])
+# @permission_required("questions.questions_info", raise_exception=True)
+def questions_batch_info(request):
+    """
+    Please read documentation carefully.
+
+    ### Information on several Questions ###
+
+    Retrieve information related to a list of **Question**, in one request (and one query).
+
+    The questions are returned in the requested order, a question that does not exist
+    (or whose ID is invalid) is returned as {"success": false, "error_reason": ..., "question_id": ...}.
 
-    return Response(serializer.data, status.HTTP_200_OK)
+    ---
+    ** VERSION **:
+
+        V1
+
+    ** RESPONSE_SERIALIZER **:
+
+        QuestionSerializer
+
+    ** REQUIRED PARAMETERS **:
+
+        - question_ids (array[str]): POST body, at most settings.QUESTIONS_BATCH_INFO_MAX_IDS
+        - OR question_id (str): repeated query param, Ex: ?question_id=<id>&question_id=<id>
+
+    ** OPTIONAL PARAMETERS **:
+
+        - fields (str): only these fields, comma separated or repeated
+    ---
+    """
+    params, question_ids = _batch_info_params(request)
+    return Response(_get_questions_data(question_ids, requested_fields(params)), status.HTTP_200_OK)
+
+
+@view_exception_handling()
+@async_api_view(["GET", "POST"])
+async def questions_batch_info_async(request):
+    """
+    Please read documentation carefully.
+
+    ### Information on several Questions ###
+
+    Async `questions_batch_info`, served by ASGI deployments. Same parameters and response.
+    """
+    params, question_ids = _batch_info_params(request)
+    data = await sync_to_async(_get_questions_data)(question_ids, requested_fields(params))
+    return Response(data, status.HTTP_200_OK)
+
+
+def _batch_info_params(request):
+    """
+    Params and requested question IDs of a batch_info request (POST body or query params)
+    """
+    if request.method == "POST":
+        params = request.data
+        question_ids = params.get("question_ids")
+    else:
+        params = request.query_params
+        question_ids = params.getlist("question_id")
+
+    if not question_ids:
+        raise MissingParameterException("question_ids is required")
+    if not isinstance(question_ids, list):
+        raise TypeError("question_ids must be an array of question IDs")
+    if len(question_ids) > settings.QUESTIONS_BATCH_INFO_MAX_IDS:
+        raise ValueError("At most %s question_ids per request" % settings.QUESTIONS_BATCH_INFO_MAX_IDS)
+    return params, question_ids
+
+
+def _get_questions_data(question_ids, fields=None):
+    """
+    Serialized active Questions of `question_ids`, in order, with a not found error for the missing ones
+    """
+    valid_ids = {}
+    for question_id in question_ids:
+        try:
+            valid_ids[question_id] = uuid.UUID(str(question_id))
+        except ValueError:
+            continue
+
+    questions = []
+    if valid_ids:
+        questions = QuestionSerializer.setup_eager_loading(Question.active_objects.all(), fields=fields)
+        questions = list(questions.filter(question_id__in=set(valid_ids.values())))
+    serialized = dict(
+        zip(
+            [question.question_id for question in questions],
+            QuestionSerializer(questions, many=True, fields=fields).data,
+        )
+    )
+
+    results = []
+    for question_id in question_ids:
+        if valid_ids.get(question_id) in serialized:
+            results.append(serialized[valid_ids[question_id]])
+        else:
+            results.append(error_constructor("Question not found", question_id=question_id))
+    return {"questions": results}
 
 
 @view_exception_handling()
@@ -161,7 +344,15 @@ def questions_search(request):
 
     Search information related to a **Question**.
 
-    All search params are insensitive startswith
+    All search params are insensitive startswith, unless prefixed:
+
+     * `$`: insensitive contains, Ex: ?title=$tumor
+     * `>`, `>=`, `<`, `<=`, `=`: comparisons, Ex: ?answer_count=>=2
+
+    Results are sortable on any field with `order_by`, Ex: ?order_by=-answer_count
+
+    Boolean queries use `operator=ADVANCED` and JSON terms (see api.core.query_grammar),
+    Ex: ?operator=ADVANCED&_OR={"title": "What"}&_OR={"_AND": [{"title": "How"}, {"context": "$tumor"}]}
 
     When `page` and `per_page` are not provided:
 
@@ -179,6 +370,18 @@ def questions_search(request):
 
      * `page` and `per_page` data will be used
 
+    If `cursor` is provided (empty for the first page):
+
+     * `per_page` questions ordered by `question_id` are returned, after the `cursor` question
+     * `pagination_info.next_cursor` is the `cursor` of the next page (null on the last page)
+     * No `total_count`, and `page`/`order_by` are not supported: the fast path for deep pages
+
+    If `facets` is provided (topics, tags and/or owner, Ex: ?facets=topics,tags):
+
+     * `facets` holds the number of matching questions per topic/tag/owner, next to `pagination_info`
+     * Ex: {"topics": [{"value": "<topic_id>", "label": "treatment", "count": 12}, ...]}
+     * Counts are cached for a minute per search
+
     ** DATE SEARCH PARAMETERS **:
 
         - name: desired_attribute_date_start
@@ -199,39 +402,154 @@ def questions_search(request):
 
     ___
     """
-    params = request.query_params
-    questions = QuestionSerializer.setup_eager_loading(Question.active_objects.all())
+    return Response(_search_questions(request.query_params))
 
-    # Date search
-    questions, params = date_search(questions, params)
 
-    # Operator search
-    if "operator" in list(params.keys()):
-        questions = search_with_operator(questions, params)
-    else:
-        questions = model_search(params, qs=questions)
+@view_exception_handling()
+@async_api_view(["GET"])
+async def questions_search_async(request):
+    """
+    Please read documentation carefully.
+
+    ### Search for Questions ###
+
+    Async `questions_search`, served by ASGI deployments. Same parameters and response.
+    """
+    return Response(await sync_to_async(_search_questions)(request.query_params))
+
+
+def _search_questions(params):
+    """
+    Paginated questions matching the search params
+    """
+    return paginated_search(
+        Question.active_objects.all(), params, QuestionSerializer, "questions", facets=QUESTION_FACETS
+    )
+
+
+@view_exception_handling()
+@api_view(["GET"])
+# @permission_required("questions.questions_search", raise_exception=True)
+def questions_autocomplete(request):
+    """
+    Please read documentation carefully.
 
-    # Sort results
-    questions = questions.order_by(params.get("order_by", "-created_at"))
+    ### Autocomplete ###
 
-    # Get total per search params
-    questions_total = questions.count()
+    Question, topic and tag titles starting with `q` (case insensitive), the most answered/used first.
 
-    # Paginate results
-    try:
-        page = params.get("page", 1)
-        per_page = params.get("per_page", 100)
+    Served from an in-memory index of each worker, refreshed every few seconds: a new or
+    renamed title can take AUTOCOMPLETE_REFRESH_INTERVAL seconds to show up.
 
-        paginator = Paginator(questions, per_page)
-        questions = paginator.page(page)
-    except EmptyPage:
-        questions = Question.objects.none()
-    except (ValueError, PageNotAnInteger):
-        raise PageNotAnInteger("Invalid value, per_page/page are integers only.")
+    ---
+    ** VERSION **:
+
+        V1
 
-    serializer = QuestionSerializer(questions, many=True)
-    pagination_serializer = PaginationSerializer(
-        data={"page": page, "page_count": len(serializer.data), "total_count": questions_total}
+    ** REQUIRED PARAMETERS **:
+
+        - q (str): the typed prefix
+
+    ** OPTIONAL PARAMETERS **:
+
+        - kinds (str): only these kinds, comma separated or repeated: question, topic, tag
+        - limit (int): number of results (default and max settings.AUTOCOMPLETE_TOP_K)
+    ---
+    """
+    query = request.query_params.get("q")
+    if not query:
+        raise MissingParameterException("q is required")
+
+    kinds = list_param(request.query_params, "kinds")
+    unknown = set(kinds or ()) - {source.kind for source in SOURCES}
+    if unknown:
+        raise ValueError("Unknown kinds: %s" % ", ".join(sorted(unknown)))
+    limit = int(request.query_params.get("limit", settings.AUTOCOMPLETE_TOP_K))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    entries = get_index().search(query, kinds=kinds, limit=limit)
+    return Response(
+        {
+            "results": [
+                {"kind": kind, "id": pk, "title": title, "score": score} for _, kind, pk, title, score in entries
+            ]
+        },
+        status.HTTP_200_OK,
+    )
+
+
+def _similar_questions(matches):
+    """
+    [{question_id, title, score}] of similarity.SimilarityIndex.similar() matches, still active, best first
+    """
+    titles = dict(
+        Question.active_objects.filter(question_id__in=[question_id for question_id, _ in matches]).values_list(
+            "question_id", "title"
+        )
     )
-    pagination_serializer.is_valid()
-    return Response({"pagination_info": pagination_serializer.data, "questions": serializer.data})
+    titles = {str(question_id): title for question_id, title in titles.items()}
+    return [
+        {"question_id": question_id, "title": titles[question_id], "score": score}
+        for question_id, score in matches
+        if question_id in titles
+    ]
+
+
+@view_exception_handling()
+@api_view(["GET"])
+# @permission_required("questions.questions_search", raise_exception=True)
+def questions_similar(request):
+    """
+    Please read documentation carefully.
+
+    ### Similar Questions ###
+
+    Questions similar to a question, or to a title/context, by estimated Jaccard similarity of
+    their word pairs (MinHash), the most similar first.
+
+    Served from an in-memory index of each worker, refreshed every few seconds: a new or
+    edited question can take SIMILAR_QUESTIONS_REFRESH_INTERVAL seconds to show up.
+
+    ---
+    ** VERSION **:
+
+        V1
+
+    ** REQUIRED PARAMETERS **:
+
+        - question_id (uuid) or title (str)
+
+    ** OPTIONAL PARAMETERS **:
+
+        - context (str): with title
+        - threshold (float): minimum score, between 0 and 1 (default settings.SIMILAR_QUESTIONS_THRESHOLD)
+        - limit (int): number of results (default 10)
+    ---
+    """
+    question_id = request.query_params.get("question_id")
+    title = request.query_params.get("title")
+    if not question_id and not title:
+        raise MissingParameterException("question_id or title is required")
+
+    threshold = float(request.query_params.get("threshold", settings.SIMILAR_QUESTIONS_THRESHOLD))
+    if not 0 <= threshold <= 1:
+        raise ValueError("threshold must be between 0 and 1")
+    limit = int(request.query_params.get("limit", 10))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    index = similarity.get_index()
+    if question_id:
+        question_id = str(uuid.UUID(question_id))
+        if question_id in index.positions:
+            matches = index.similar(question_id=question_id, threshold=threshold, limit=limit)
+        else:
+            # Not indexed yet (or inactive): compare its text
+            question = Question.active_objects.get(question_id=question_id)
+            matches = index.similar(question.title, question.context, threshold=threshold, limit=limit + 1)
+            matches = [match for match in matches if match[0] != question_id][:limit]
+    else:
+        matches = index.similar(title, request.query_params.get("context"), threshold=threshold, limit=limit)
+
+    return Response({"results": _similar_questions(matches)}, status.HTTP_200_OK)
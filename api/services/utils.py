@@ -0,0 +1,53 @@
+"""
+Requests to the other HF Services (Auth Service)
+"""
+import logging
+
+import requests
+from django.conf import settings
+
+from api.core.auth_mechanisms.utils import get_http_headers
+from api.core.deadlines import timeout
+from api.core.exceptions import (
+    Service300FailureException,
+    Service400FailureException,
+    Service500FailureException,
+)
+
+# Setup logger
+LOGGER = logging.getLogger("roon")
+
+
+class ServiceResponse(object):
+    """
+    Decoded response of a Service
+    """
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.content = response.content
+        self.json_data = response.json() if response.content else {}
+
+
+def get_from_service(endpoint, headers, sudo=False, params=None):
+    """
+    GET an endpoint of a Service and raise the Service exception matching the status code
+
+    `headers` are the request.META of the API request, forwarded as HTTP headers.
+    `sudo` authenticates the API itself with HF_AUTH_SERVICE_SUDO_TOKEN instead of the user.
+    Times out after HF_SERVICE_TIMEOUT seconds, or at the request deadline.
+    """
+    http_headers = get_http_headers(headers or {})
+    if sudo and settings.HF_AUTH_SERVICE_SUDO_TOKEN:
+        http_headers["Authorization"] = "JWT " + settings.HF_AUTH_SERVICE_SUDO_TOKEN
+
+    response = requests.get(endpoint, params=params, headers=http_headers, timeout=timeout(settings.HF_SERVICE_TIMEOUT))
+
+    if response.status_code >= 500:
+        raise Service500FailureException(response.content, status_code=response.status_code)
+    if response.status_code >= 400:
+        raise Service400FailureException(response.content, status_code=response.status_code)
+    if response.status_code >= 300:
+        raise Service300FailureException(response.content, status_code=response.status_code)
+
+    return ServiceResponse(response)
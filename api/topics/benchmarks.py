@@ -0,0 +1,16 @@
+"""
+Benchmarks for the Topics endpoints
+"""
+from api.core.benchmarks.base import benchmark
+from api.core.benchmarks.client import get
+from api.topics.views import topics_info
+
+
+@benchmark("topics_info")
+def info(corpus):
+    get(topics_info, corpus.user, topic_id=corpus.random_topic_id())
+
+
+@benchmark("topics_info.ids_only")
+def info_ids_only(corpus):
+    get(topics_info, corpus.user, {"ids_only": "true", "count": "false"}, topic_id=corpus.random_topic_id())
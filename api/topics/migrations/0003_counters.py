@@ -0,0 +1,34 @@
+# Generated by Django 4.0.10 on 2026-10-19 12:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_questions(apps, schema_editor):
+    QuestionTopic = apps.get_model("topics", "QuestionTopic")
+    QuestionTopics = apps.get_model("questions", "Question").topics.through
+    counts = (
+        QuestionTopics.objects.filter(questiontopic=OuterRef("pk"))
+        .order_by()
+        .values("questiontopic")
+        .annotate(count=Count("*"))
+    )
+    QuestionTopic.objects.update(question_count=Coalesce(Subquery(counts.values("count")), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0006_counters'),
+        ('topics', '0002_alter_questiontopic_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questiontopic',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Question Count'),
+        ),
+        migrations.RunPython(count_questions, migrations.RunPython.noop),
+    ]
@@ -21,6 +21,8 @@ class QuestionTopic(CoreModel):
 
     # Tag data
     title = models.CharField("Topic Title", max_length=256, blank=False, null=False)
+    # Maintained by api/core/counters.py
+    question_count = models.PositiveIntegerField("Question Count", default=0)
 
     class Meta:
         db_table = "question_topic"
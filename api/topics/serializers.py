@@ -3,7 +3,9 @@ Model Serializers for Topics
 """
 import logging
 
-from api.core.serializer import BaseModelSerializer
+from rest_framework import serializers
+
+from api.core.serializer import BaseModelSerializer, TimedListSerializer
 from api.topics.models import QuestionTopic
 
 LOGGER = logging.getLogger("roon")
@@ -14,6 +16,10 @@ class QuestionTopicSerializer(BaseModelSerializer):
     QuestionTopic serializer.
     """
 
+    # Counters (api/core/counters.py)
+    question_count = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = QuestionTopic
-        fields = ("topic_id", "title")
+        list_serializer_class = TimedListSerializer
+        fields = ("topic_id", "title", "question_count")
@@ -0,0 +1,11 @@
+from factory import Sequence
+from factory.django import DjangoModelFactory
+
+from api.topics.models import QuestionTopic
+
+
+class QuestionTopicFactory(DjangoModelFactory):
+    title = Sequence(lambda n: f"Topic {n}")
+
+    class Meta:
+        model = QuestionTopic
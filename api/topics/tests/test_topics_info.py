@@ -0,0 +1,79 @@
+"""
+Tests for topics_info pagination, search and ids_only mode
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from api.core.query_instrumentation import record_queries
+from api.questions.tests.factories import QuestionFactory
+from api.topics.tests.factories import QuestionTopicFactory
+
+
+@pytest.fixture
+def topic(db):
+    topic = QuestionTopicFactory()
+    for title in ("How to rest", "How to eat", "What is a scan", "Why sleep"):
+        QuestionFactory(title=title).topics.add(topic)
+    QuestionFactory(title="How to walk")  # Other topic
+    return topic
+
+
+def get_info(client, topic, **params):
+    response = client.get(reverse("topics:info", kwargs={"topic_id": topic.topic_id}), params)
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+@pytest.mark.django_db
+def test_topics_info_paginates_and_searches(api_client, topic):
+    """
+    Ensure topics_info pages and filters the topic's questions like questions_search
+    """
+    data = get_info(api_client, topic, per_page=3)
+    assert len(data["questions"]) == 3
+    assert data["pagination_info"]["total_count"] == 4
+    assert data["pagination_info"]["has_next"]
+
+    data = get_info(api_client, topic, title="How", order_by="title")
+    assert [question["title"] for question in data["questions"]] == ["How to eat", "How to rest"]
+
+    data = get_info(api_client, topic, per_page=3, page=2, count="false")
+    assert len(data["questions"]) == 1
+    assert data["pagination_info"]["total_count"] is None
+    assert not data["pagination_info"]["has_next"] and data["pagination_info"]["has_previous"]
+
+
+@pytest.mark.django_db
+def test_topics_info_uncounted_empty_page(api_client, topic):
+    """
+    Ensure an out of range page with count=false is empty, without total_count
+    """
+    for page in (0, 5):
+        data = get_info(api_client, topic, page=page, count="false")
+        assert data["questions"] == []
+        assert data["pagination_info"]["total_count"] is None
+        assert not data["pagination_info"]["has_next"]
+
+
+@pytest.mark.django_db
+def test_topics_info_ids_only(api_client, topic):
+    """
+    Ensure ids_only returns the question IDs with one query and no COUNT when count=false
+    """
+    expected = sorted(str(question_id) for question_id in topic.question_set.values_list("question_id", flat=True))
+
+    with record_queries() as stats:
+        data = get_info(api_client, topic, ids_only="true", count="false")
+
+    assert "questions" not in data
+    assert sorted(data["question_ids"]) == expected
+    assert stats.count == 1
+
+    pages, cursor = [], ""
+    while cursor is not None:
+        data = get_info(api_client, topic, ids_only="true", cursor=cursor, per_page=3)
+        pages.append(data["question_ids"])
+        cursor = data["pagination_info"]["next_cursor"]
+    assert [len(page) for page in pages] == [3, 1]
+    assert sorted(pages[0] + pages[1]) == expected
@@ -0,0 +1,36 @@
+"""
+Tests for topics_search
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.outbox.drain import drain_outbox
+from api.questions.tests.factories import QuestionFactory
+from api.topics.tests.factories import QuestionTopicFactory
+from api.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_topics_search():
+    """
+    Ensure topics are searched on title and question_count, and sorted
+    """
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    treatment, therapy, diet = (QuestionTopicFactory(title=title) for title in ("Treatment", "Therapy", "Diet"))
+    for topic, questions in ((treatment, 1), (therapy, 2), (diet, 3)):
+        for question in QuestionFactory.create_batch(questions):
+            question.topics.add(topic)
+    drain_outbox()
+
+    response = client.get(reverse("topics:search"), {"title": "T", "order_by": "-question_count"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [(topic["title"], topic["question_count"]) for topic in response.data["topics"]] == [
+        ("Therapy", 2),
+        ("Treatment", 1),
+    ]
+
+    response = client.get(reverse("topics:search"), {"question_count": ">=2", "ids_only": "true"})
+    assert sorted(response.data["topic_ids"]) == sorted([str(therapy.topic_id), str(diet.topic_id)])
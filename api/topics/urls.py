@@ -1,15 +1,19 @@
+from django.conf import settings
 from django.urls import path
 
 from api.topics import views
 
 app_name = "topics"
 
+# ASGI deployments serve the read endpoints with their async views
+topics_info = views.topics_info_async if settings.ASYNC_VIEWS else views.topics_info
+
 urlpatterns = [
     path("", views.topics_root, name="root"),
     path("create/", views.topics_create, name="create"),
     path("update/", views.topics_update, name="update"),
-    path("info/", views.topics_info, name="info"),
-    path("info/<topic_id>/", views.topics_info, name="info"),
+    path("info/", topics_info, name="info"),
+    path("info/<topic_id>/", topics_info, name="info"),
     path("search/", views.topics_search, name="search"),
 ]
 
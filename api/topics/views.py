@@ -1,16 +1,21 @@
 import logging
 from collections import OrderedDict
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from api.core.async_views import async_api_view
 from api.core.exceptions import MissingParameterException
+from api.core.search import paginated_search
 from api.core.view_exception_handler import view_exception_handling
 from api.questions.models import Question
 from api.questions.serializers import QuestionOnlySerializer
+from api.topics.models import QuestionTopic
+from api.topics.serializers import QuestionTopicSerializer
 
 LOGGER = logging.getLogger("roon")
 
@@ -86,29 +91,77 @@ def topics_info(request, topic_id=None):
     ** REQUIRED PARAMETERS **:
 
         - topic_id
+
+    ** OPTIONAL PARAMETERS **:
+
+        Same search, sort and pagination parameters as `questions_search`, Ex:
+        - page, per_page (default 1, 100), or cursor for keyset pagination
+        - order_by (default -created_at)
+        - count=false, to skip the total_count
+        - ids_only=true, to only return the `question_ids`
     ---
     """
     if not topic_id:
         raise MissingParameterException("topic_id is required")
 
-    questions = QuestionOnlySerializer.setup_eager_loading(Question.active_objects.all())
-    questions = questions.filter(topics__topic_id=topic_id)
-    serializer = QuestionOnlySerializer(questions, many=True)
+    return Response(_get_topic_questions_data(topic_id, request.query_params), status.HTTP_200_OK)
 
-    return Response(serializer.data, status.HTTP_200_OK)
+
+@view_exception_handling()
+@async_api_view(["GET"])
+async def topics_info_async(request, topic_id=None):
+    """
+    Please read documentation carefully.
+
+    ### Information on a Question Topic ###
+
+    Async `topics_info`, served by ASGI deployments. Same parameters and response.
+    """
+    if not topic_id:
+        raise MissingParameterException("topic_id is required")
+
+    return Response(
+        await sync_to_async(_get_topic_questions_data)(topic_id, request.query_params), status.HTTP_200_OK
+    )
+
+
+def _get_topic_questions_data(topic_id, params):
+    """
+    Paginated active Questions of a topic matching the search params
+    """
+    questions = Question.active_objects.filter(topics__topic_id=topic_id)
+    return paginated_search(questions, params, QuestionOnlySerializer, "questions")
 
 
 @view_exception_handling()
 @api_view(["GET"])
-# @permission_required("hl7_messages.hl7_messages_search", raise_exception=True)
+# @permission_required("topics.topics_search", raise_exception=True)
 def topics_search(request):
     """
     Please read documentation carefully.
 
-    ### Search for a Question Topic ###
+    ### Search for Question Topics ###
 
     Search information related to a **QuestionTopic** .
 
-    ### NOT IMPLEMENTED ###
+    Same search, sort and pagination parameters as `questions_search`, Ex:
+
+        - ?title=$treatment&question_count=>=10&order_by=-question_count
+        - page, per_page (default 1, 100), or cursor for keyset pagination
+        - count=false, to skip the total_count
+        - ids_only=true, to only return the `topic_ids`
+
+    ---
+    ** VERSION **:
+
+        V1
+
+    ** RESPONSE_SERIALIZER **:
+
+        QuestionTopicSerializer
+    ---
     """
-    return Response({}, status.HTTP_200_OK)
+    return Response(
+        paginated_search(QuestionTopic.active_objects.all(), request.query_params, QuestionTopicSerializer, "topics"),
+        status.HTTP_200_OK,
+    )
@@ -1,4 +1,4 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, Group
 from django.db.models import CharField
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -24,3 +24,22 @@ class User(AbstractUser):
 
         """
         return reverse("users:detail", kwargs={"username": self.username})
+
+    def has_groups(self, names):
+        """
+        Whether the user's groups are exactly the group names
+        """
+        return set(names) == set(self.groups.values_list("name", flat=True))
+
+    def change_groups(self, names):
+        """
+        Set the user's groups to the Auth Service group names, creating missing groups
+
+        No queries are written when the groups are unchanged (every JWT request syncs them).
+        """
+        names = set(names)
+        if self.has_groups(names):
+            return
+
+        groups = [Group.objects.get_or_create(name=name)[0] for name in sorted(names)]
+        self.groups.set(groups)
@@ -0,0 +1,14 @@
+"""
+Background tasks of Users
+"""
+from celery import shared_task
+
+from api.users.models import User
+
+
+@shared_task(name="users.sync_groups")
+def sync_user_groups(user_id, names):
+    """
+    Set the groups of a user to its Auth Service group names
+    """
+    User.objects.get(pk=user_id).change_groups(names)
@@ -0,0 +1,22 @@
+"""
+ASGI config for Roon-API project.
+
+Served by uvicorn workers under gunicorn (see compose/production/django/start):
+
+    gunicorn config.asgi -k uvicorn.workers.UvicornWorker
+
+ASGI deployments serve the read endpoints (questions_info, questions_search, topics_info)
+with their async views, so a worker is not blocked during the Auth Service round trip.
+"""
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / "api"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+os.environ.setdefault("DJANGO_ASYNC_VIEWS", "True")
+
+application = get_asgi_application()
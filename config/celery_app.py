@@ -0,0 +1,59 @@
+"""
+Celery application of Roon-API: background tasks on the Redis broker
+
+Workers: celery -A config.celery_app worker -l info
+Schedule (CELERY_BEAT_SCHEDULE): celery -A config.celery_app beat -l info
+
+CELERY_TASK_ALWAYS_EAGER runs the tasks in-process, in the calling thread (tests, local without Redis).
+"""
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from celery import Celery, Task
+
+from api.core.metrics import TASK_DURATION
+
+# This allows easy placement of apps within the interior
+# api directory.
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(BASE_DIR / "api"))
+# set the default Django settings module for the 'celery' program only: this module is imported by
+# the config package, so that wsgi, asgi and manage.py keep their own default.
+PROGRAM = Path(sys.argv[0])
+if PROGRAM.name == "celery" or PROGRAM.parent.name == "celery":
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+LOGGER = logging.getLogger("roon")
+
+
+class ObservedTask(Task):
+    """
+    Base class of every task: the duration of each run is observed by task name and outcome
+    """
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = super().__call__(*args, **kwargs)
+            outcome = "success"
+            return result
+        finally:
+            duration = time.perf_counter() - start
+            TASK_DURATION.labels(task=self.name, outcome=outcome).observe(duration)
+            LOGGER.info("Task %s: %s in %.3fms", self.name, outcome, duration * 1000)
+
+
+app = Celery("roon", task_cls=ObservedTask, include=["api.core.tasks"])
+
+# Using a string here means the worker doesn't have to serialize
+# the configuration object to child processes.
+# - namespace='CELERY' means all celery-related configuration keys
+#   should have a `CELERY_` prefix.
+app.config_from_object("django.conf:settings", namespace="CELERY")
+
+# Load task modules from all registered Django app configs.
+app.autodiscover_tasks()
@@ -0,0 +1,154 @@
+"""
+Gunicorn configuration for Roon-API
+
+    gunicorn -c config/gunicorn.py config.wsgi
+    DJANGO_SERVER_MODE=asgi gunicorn -c config/gunicorn.py config.asgi
+
+Every setting is read from the environment:
+
+    GUNICORN_BIND                 0.0.0.0:5000
+    GUNICORN_WORKER_CLASS         gthread (wsgi) / uvicorn.workers.UvicornWorker (asgi), or sync, gevent
+    GUNICORN_WORKERS              CPU count + 1 (2 x CPU count + 1 for sync workers), capped by GUNICORN_MAX_WORKERS
+    GUNICORN_MAX_WORKERS          12
+    GUNICORN_THREADS              4 (gthread only)
+    GUNICORN_WORKER_CONNECTIONS   1000 (gevent only)
+    GUNICORN_PRELOAD              True, import the app in the master and share it copy-on-write
+    GUNICORN_MAX_REQUESTS         1000, recycle workers (memory growth), 0 disables
+    GUNICORN_MAX_REQUESTS_JITTER  10% of GUNICORN_MAX_REQUESTS, so workers do not restart together
+    GUNICORN_TIMEOUT              30 seconds before a silent worker is killed
+    GUNICORN_GRACEFUL_TIMEOUT     30 seconds for in-flight requests on restart/shutdown
+    GUNICORN_KEEPALIVE            5 seconds an idle connection from the proxy is kept open
+"""
+import os
+
+DJANGO_SERVER_MODE = os.environ.get("DJANGO_SERVER_MODE", "wsgi")
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ("true", "1", "yes", "on")
+
+
+def _cpu_count():
+    """
+    CPUs this process may run on (the container's cpuset, not the host's CPUs)
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_workers(worker_class, cpu_count):
+    """
+    Sync workers block on I/O and need more processes, threaded/async workers need ~1 per CPU
+    """
+    if worker_class == "sync":
+        return 2 * cpu_count + 1
+    return cpu_count + 1
+
+
+# SERVER
+# ------------------------------------------------------------------------------
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+chdir = os.environ.get("GUNICORN_CHDIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# WORKERS
+# ------------------------------------------------------------------------------
+worker_class = os.environ.get(
+    "GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker" if DJANGO_SERVER_MODE == "asgi" else "gthread"
+)
+workers = _env_int(
+    "GUNICORN_WORKERS",
+    min(default_workers(worker_class, _cpu_count()), _env_int("GUNICORN_MAX_WORKERS", 12)),
+)
+threads = _env_int("GUNICORN_THREADS", 4) if worker_class == "gthread" else 1
+worker_connections = _env_int("GUNICORN_WORKER_CONNECTIONS", 1000)
+# Heartbeat files on tmpfs, Docker's overlay filesystem can stall workers into timeouts
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# LOGGING
+# ------------------------------------------------------------------------------
+# Requests are logged by the app (utility/logging), gunicorn only logs errors
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+if worker_class == "gevent":
+    # Patch before the preloaded app imports anything, and make psycopg2 cooperative
+    # so a query does not block every greenlet of the worker
+    from gevent import monkey
+
+    monkey.patch_all()
+
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
+
+
+# HOOKS
+# ------------------------------------------------------------------------------
+def when_ready(server):
+    """
+    Warm the caches in the master, workers forked from a preloaded app share them copy-on-write
+    """
+    if server.cfg.preload_app:
+        from django import db
+
+        from api.core.warmup import warm_up
+
+        warm_up()
+        # Never fork with an open database connection
+        db.connections.close_all()
+
+
+def post_worker_init(worker):
+    """
+    Warm the caches not already warmed in the master before the worker accepts requests,
+    and build the worker's autocomplete and similar questions indexes (they read the database, so not in the master)
+    """
+    from django.conf import settings
+
+    from api.core.warmup import warm_up
+
+    warm_up()
+
+    if settings.AUTOCOMPLETE_BUILD_ON_START:
+        from api.core.autocomplete import build_index
+
+        try:
+            build_index()
+        except Exception:
+            # Built on the first autocomplete request instead
+            worker.log.exception("Autocomplete index build failed")
+
+    if settings.SIMILAR_QUESTIONS_BUILD_ON_START:
+        from api.questions.similarity import build_index
+
+        try:
+            build_index()
+        except Exception:
+            # Built on the first similar questions request instead
+            worker.log.exception("Similar questions index build failed")
+
+
+def child_exit(server, worker):
+    """
+    Remove the metrics files of a dead worker (see api/core/metrics.py)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
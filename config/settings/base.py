@@ -74,6 +74,8 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 ROOT_URLCONF = "config.urls"
 # https://docs.djangoproject.com/en/dev/ref/settings/#wsgi-application
 WSGI_APPLICATION = "config.wsgi.application"
+# ASGI deployments (config/asgi.py) serve the read endpoints with their async views
+ASYNC_VIEWS = env.bool("DJANGO_ASYNC_VIEWS", default=False)
 
 # APPS
 # ------------------------------------------------------------------------------
@@ -105,6 +107,7 @@ LOCAL_APPS = [
     "api.questions",
     "api.answers",
     "api.topics",
+    "api.outbox",
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -150,6 +153,7 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "api.core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -159,6 +163,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.core.middleware.QueryInstrumentationMiddleware",
 ]
 
 # STATIC
@@ -282,6 +287,27 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# AUTH SERVICE CONFIGURATION
+# ------------------------------------------------------------------------------
+# Base URL of the HF Auth Service (tokens/verify/, tokens/obtain/, users/info/<user_id>)
+HF_AUTH_SERVICE_URL = env.str("HF_AUTH_SERVICE_URL", default="http://localhost:8001/api/v1/")
+# Token of the API itself, used for sudo requests to the Auth Service
+HF_AUTH_SERVICE_SUDO_TOKEN = env.str("HF_AUTH_SERVICE_SUDO_TOKEN", default="")
+# Seconds before a request to a Service times out
+HF_SERVICE_TIMEOUT = env.float("HF_SERVICE_TIMEOUT", default=5.0)
+# Authenticate API requests with JWTs verified by the Auth Service
+HF_AUTH_SERVICE_ENABLED = env.bool("HF_AUTH_SERVICE_ENABLED", default=False)
+if HF_AUTH_SERVICE_ENABLED:
+    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = (
+        "api.core.auth_mechanisms.auth_backends.RoonJSONWebTokenAuthentication",
+    ) + REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"]
+
+# drf-jwt - https://styria-digital.github.io/django-rest-framework-jwt/
+JWT_AUTH = {"JWT_AUTH_HEADER_PREFIX": "JWT"}
+# Key the Auth Service signs tokens with (defaults to SECRET_KEY)
+if env.str("HF_AUTH_JWT_SECRET_KEY", default=""):
+    JWT_AUTH["JWT_SECRET_KEY"] = env.str("HF_AUTH_JWT_SECRET_KEY")
+
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
 CORS_URLS_REGEX = r"^/api/.*$"
 
@@ -306,7 +332,101 @@ FORBIDDEN_API_VALUES = [
     "is_superuser",
 ]
 
-SEARCH_FILTERS = ['page', 'per_page', 'order_by', 'format', 'include_inactive', 'operator']
+SEARCH_FILTERS = [
+    'page', 'per_page', 'cursor', 'count', 'ids_only', 'order_by', 'format', 'include_inactive', 'operator', 'fields',
+    'facets',
+]
+
+# IN searches of this many values (or more) bind them as one array parameter (api/core/lookups.py)
+IN_SEARCH_ARRAY_MIN_VALUES = env.int("IN_SEARCH_ARRAY_MIN_VALUES", default=100)
+
+# Search facet counts (?facets=) run on this database, and are cached per filter shape
+SEARCH_FACETS_DATABASE = env.str("SEARCH_FACETS_DATABASE", default="replica_db")
+SEARCH_FACETS_CACHE_TIMEOUT = env.int("SEARCH_FACETS_CACHE_TIMEOUT", default=60)  # seconds
+SEARCH_FACETS_LIMIT = 50  # values per facet
+
+# Maximum number of question IDs of a questions_batch_info request
+QUESTIONS_BATCH_INFO_MAX_IDS = env.int("QUESTIONS_BATCH_INFO_MAX_IDS", default=100)
+
+# ADVANCED SEARCH CONFIGURATION
+# ------------------------------------------------------------------------------
+# Limits of the `operator=ADVANCED` JSON query grammar (api/core/query_grammar.py)
+ADVANCED_SEARCH_MAX_LENGTH = env.int("ADVANCED_SEARCH_MAX_LENGTH", default=20000)  # characters of JSON
+ADVANCED_SEARCH_MAX_DEPTH = env.int("ADVANCED_SEARCH_MAX_DEPTH", default=8)
+ADVANCED_SEARCH_MAX_NODES = env.int("ADVANCED_SEARCH_MAX_NODES", default=200)
+ADVANCED_SEARCH_MAX_IN_VALUES = env.int("ADVANCED_SEARCH_MAX_IN_VALUES", default=500)
+# Parsed queries kept in memory, by query text
+ADVANCED_SEARCH_CACHE_SIZE = 512
+
+# AUTOCOMPLETE CONFIGURATION
+# ------------------------------------------------------------------------------
+# Per-process prefix index of questions/autocomplete/ (api/core/autocomplete.py)
+AUTOCOMPLETE_TOP_K = 10
+# Prefixes of up to this many characters have their top-k precomputed
+AUTOCOMPLETE_RANKED_PREFIX_LENGTH = 3
+# Longer prefixes rank their first matches only
+AUTOCOMPLETE_SCAN_LIMIT = 2000
+AUTOCOMPLETE_REFRESH_INTERVAL = env.int("AUTOCOMPLETE_REFRESH_INTERVAL", default=30)  # seconds
+# Refreshes read again the rows of the previous one's last seconds, committed out of order (longest transactions)
+AUTOCOMPLETE_REFRESH_OVERLAP = env.int("AUTOCOMPLETE_REFRESH_OVERLAP", default=60)  # seconds
+AUTOCOMPLETE_MEMORY_BUDGET = env.int("AUTOCOMPLETE_MEMORY_BUDGET", default=64 * 1024 * 1024)  # bytes
+# Build the index when a gunicorn worker starts, instead of on its first autocomplete request
+AUTOCOMPLETE_BUILD_ON_START = env.bool("AUTOCOMPLETE_BUILD_ON_START", default=True)
+
+# SIMILAR QUESTIONS CONFIGURATION
+# ------------------------------------------------------------------------------
+# Per-process MinHash/LSH index of questions/similar/ (api/questions/similarity.py)
+SIMILAR_QUESTIONS_PERMUTATIONS = 64
+# 16 bands of 4 rows: questions above ~0.5 similarity share a band
+SIMILAR_QUESTIONS_BANDS = 16
+SIMILAR_QUESTIONS_BATCH_SIZE = 65536  # rows scored per NumPy batch
+SIMILAR_QUESTIONS_THRESHOLD = env.float("SIMILAR_QUESTIONS_THRESHOLD", default=0.5)
+# questions_create with check_duplicates warns about the questions this similar
+SIMILAR_QUESTIONS_DUPLICATE_THRESHOLD = env.float("SIMILAR_QUESTIONS_DUPLICATE_THRESHOLD", default=0.8)
+SIMILAR_QUESTIONS_REFRESH_INTERVAL = env.int("SIMILAR_QUESTIONS_REFRESH_INTERVAL", default=30)  # seconds
+SIMILAR_QUESTIONS_REFRESH_OVERLAP = env.int("SIMILAR_QUESTIONS_REFRESH_OVERLAP", default=60)  # seconds
+SIMILAR_QUESTIONS_BUILD_ON_START = env.bool("SIMILAR_QUESTIONS_BUILD_ON_START", default=True)
+
+# CELERY CONFIGURATION
+# ------------------------------------------------------------------------------
+# Background tasks (config/celery_app.py), https://docs.celeryq.dev/en/stable/userguide/configuration.html
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/0")
+# Run the tasks in-process instead of sending them to the broker (tests, local without Redis)
+CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=False)
+CELERY_TASK_EAGER_PROPAGATES = True
+# The tasks' results are not read: no result backend
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_ACCEPT_CONTENT = ["json"]
+CELERY_TASK_SERIALIZER = "json"
+# Acknowledged once done: a task of a killed worker runs again (the tasks are idempotent)
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_TIME_LIMIT = 30 * 60
+CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-counters": {"task": "core.reconcile_counters", "schedule": 60 * 60},
+    "compute-related-questions": {"task": "questions.compute_related", "schedule": 6 * 60 * 60},
+    "drain-outbox": {"task": "outbox.drain", "schedule": env.int("OUTBOX_DRAIN_INTERVAL", default=10)},
+}
+
+# OUTBOX CONFIGURATION
+# ------------------------------------------------------------------------------
+# Events of the writes, delivered by the drain (api/outbox/drain.py)
+OUTBOX_BATCH_SIZE = env.int("OUTBOX_BATCH_SIZE", default=500)
+OUTBOX_MAX_BATCHES = 100  # per drain, the next drain continues
+OUTBOX_MAX_ATTEMPTS = 5
+# Queue a drain when a transaction with events commits (else only the scheduled drain delivers them)
+OUTBOX_DRAIN_ON_COMMIT = env.bool("OUTBOX_DRAIN_ON_COMMIT", default=True)
+OUTBOX_RETENTION = 24 * 60 * 60  # seconds processed events are kept
+
+# RELATED QUESTIONS CONFIGURATION
+# ------------------------------------------------------------------------------
+# Precomputed by shared topics and tags (api/questions/related.py), served by questions_info?expand=related
+RELATED_QUESTIONS_TOP_N = 10
+RELATED_QUESTIONS_BATCH_SIZE = 1000  # rows of the sparse score matrix computed at once
+# Refresh the changed questions on m2m_changed, off for bulk loads (then run compute_related_questions)
+RELATED_QUESTIONS_REFRESH_ON_CHANGE = env.bool("RELATED_QUESTIONS_REFRESH_ON_CHANGE", default=True)
 
 # LOGS ANONYMIZATION CONFIGURATION
 # ------------------------------------------------------------------------------
@@ -362,6 +482,78 @@ LOGGING = {
     },
 }
 
-# MAX RETRIES CONFIGURATION
+# REQUEST LOG POLICY CONFIGURATION
+# ------------------------------------------------------------------------------
+# Policy applied to every view that is not listed in REQUEST_LOG_POLICIES
+#   - sample_rate: fraction of successful requests that are logged (0.0 - 1.0)
+#   - include_parameters / include_response: attach sanitized parameters / failed response bodies
+#   - max_body_size: truncate parameters and response bodies after this many characters
+#   - always_log_errors: errors bypass sampling
+#   - slow_request_ms: requests at or above this duration bypass sampling
+REQUEST_LOG_DEFAULT_POLICY = {
+    "sample_rate": 1.0,
+    "include_parameters": True,
+    "include_response": True,
+    "max_body_size": None,
+    "always_log_errors": True,
+    "slow_request_ms": env.int("REQUEST_LOG_SLOW_REQUEST_MS", default=1000),
+}
+
+# Per-view overrides, keyed by the resolved view_name
+REQUEST_LOG_POLICIES = {
+    "heartbeat": {
+        "sample_rate": env.float("REQUEST_LOG_HEARTBEAT_SAMPLE_RATE", default=0.01),
+        "include_parameters": False,
+        "include_response": False,
+    },
+    "questions:search": {
+        "sample_rate": env.float("REQUEST_LOG_QUESTIONS_SEARCH_SAMPLE_RATE", default=0.1),
+        "max_body_size": 2048,
+    },
+}
+
+# QUERY BUDGET CONFIGURATION
+# ------------------------------------------------------------------------------
+# Maximum number of SQL queries per request, keyed by the resolved view_name.
+# Requests over budget are logged with their duplicate query shapes (N+1 queries),
+# or raise QueryBudgetExceeded when QUERY_BUDGET_ENFORCE is set (tests).
+QUERY_BUDGETS = {
+    "heartbeat": 0,
+    "answers:search": 3,
+    "questions:autocomplete": 3,
+    "questions:batch_info": 8,
+    "questions:info": 8,
+    "questions:similar": 4,
+    "questions:search": 13,
+    "topics:info": 4,
+    "topics:search": 2,
+}
+QUERY_BUDGET_ENFORCE = env.bool("QUERY_BUDGET_ENFORCE", default=False)
+
+# REQUEST DEADLINE CONFIGURATION
+# ------------------------------------------------------------------------------
+# Time budget (seconds) of the views, keyed by the resolved view_name, VIEW_DEADLINE_DEFAULT for the
+# others (None: no deadline). `@view_deadline(seconds)` overrides them (api/core/deadlines.py).
+# Bounds the statement_timeout of their queries and the timeouts of their Service calls, past it they answer 504.
+# Under GUNICORN_TIMEOUT (config/gunicorn.py), so requests fail before their worker is killed
+VIEW_DEADLINE_DEFAULT = env.float("VIEW_DEADLINE_DEFAULT", default=25.0)
+VIEW_DEADLINES = {
+    "answers:search": env.float("VIEW_DEADLINE_SEARCH", default=10.0),
+    "questions:search": env.float("VIEW_DEADLINE_SEARCH", default=10.0),
+    "topics:search": env.float("VIEW_DEADLINE_SEARCH", default=10.0),
+}
+
+# DATABASE RETRY CONFIGURATION
 # ------------------------------------------------------------------------------
-MAX_RETRIES = 10
+# Views failing with an OperationalError are retried (api/core/db_retry.py): idempotent requests
+# only, at most MAX_RETRIES times, waiting random 0 - min(DB_RETRY_MAX_DELAY, DB_RETRY_BASE_DELAY * 2 ** retry)
+# seconds between attempts, within DB_RETRY_DEADLINE seconds. Then they answer 503 with Retry-After.
+MAX_RETRIES = env.int("MAX_RETRIES", default=3)
+DB_RETRY_BASE_DELAY = env.float("DB_RETRY_BASE_DELAY", default=0.05)
+DB_RETRY_MAX_DELAY = env.float("DB_RETRY_MAX_DELAY", default=1.0)
+DB_RETRY_DEADLINE = env.float("DB_RETRY_DEADLINE", default=3.0)
+# Circuit breaker of each worker: DB_CIRCUIT_FAILURE_THRESHOLD OperationalErrors within DB_CIRCUIT_WINDOW
+# seconds open it, views then answer 503 at once until a trial request succeeds, every DB_CIRCUIT_RESET_TIMEOUT seconds
+DB_CIRCUIT_FAILURE_THRESHOLD = env.int("DB_CIRCUIT_FAILURE_THRESHOLD", default=20)
+DB_CIRCUIT_WINDOW = env.float("DB_CIRCUIT_WINDOW", default=10.0)
+DB_CIRCUIT_RESET_TIMEOUT = env.float("DB_CIRCUIT_RESET_TIMEOUT", default=5.0)
@@ -80,5 +80,10 @@ if env.bool("USE_DOCKER", default=False):
 # https://django-extensions.readthedocs.io/en/latest/installation_instructions.html#configuration
 INSTALLED_APPS += ["django_extensions"]  # noqa F405
 
+# CELERY
+# ------------------------------------------------------------------------------
+# Tasks run in-process unless CELERY_TASK_ALWAYS_EAGER=false (then start a worker on Redis)
+CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=True)
+
 # Your stuff...
 # ------------------------------------------------------------------------------
@@ -9,6 +9,9 @@ from .base import env
 DATABASES = {
     "default": env.db("PRIMARY_DATABASE_URL", default="sqlite::memory:"),
 }
+# Tests run against a single database, reads are not routed to the replica
+DATABASE_ROUTERS = []
+SEARCH_FACETS_DATABASE = "default"
 
 
 # GENERAL
@@ -34,5 +37,16 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 # DEBUGGING FOR TEMPLATES
 # ------------------------------------------------------------------------------
 TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore # noqa F405
+
+# CELERY
+# ------------------------------------------------------------------------------
+# Tasks run in-process, their exceptions raised
+CELERY_TASK_ALWAYS_EAGER = True
+
+# QUERY BUDGETS
+# ------------------------------------------------------------------------------
+# Fail tests when an endpoint exceeds its declared query budget
+QUERY_BUDGET_ENFORCE = True
+
 # Your stuff...
 # ------------------------------------------------------------------------------
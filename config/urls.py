@@ -24,6 +24,8 @@ urlpatterns += [
     path("", views.root, name="root"),
     path("api/v1/", include("api.core.urls")),
     path("heartbeat/", views.heartbeat, name="heartbeat"),
+    # No trailing slash: Prometheus scrapes /metrics by default
+    path("metrics", views.metrics, name="metrics"),
     path("auth/", include("rest_framework.urls", namespace="rest_framework")),
     # Django Admin, use {% url 'admin:index' %}
     path(settings.ADMIN_URL, admin.site.urls),
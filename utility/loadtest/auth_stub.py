@@ -0,0 +1,218 @@
+"""
+Local stand-in for the HF Auth Service
+
+Serves the three endpoints Roon-API calls, with configurable latency and error rate, so the
+API can be load tested without the real Auth Service:
+
+    POST tokens/obtain/        {"email", "password"} -> {"token"}
+    POST tokens/verify/        {"token"} -> {"token"}
+    GET  users/info/<user_id>  -> the token user
+
+Tokens are HS256 JWTs signed with `--secret`, which must match the API's
+HF_AUTH_JWT_SECRET_KEY (or SECRET_KEY). Any email/password pair is accepted.
+
+    python -m utility.loadtest.auth_stub --port 8001 --latency-ms 20 --jitter-ms 10 --error-rate 0.01
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+
+LOGGER = logging.getLogger("roon")
+
+API_PREFIX = "/api/v1/"
+
+
+class AuthStubConfig(object):
+    """
+    Behaviour of the stub Auth Service
+    """
+
+    def __init__(self, secret, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, token_ttl=3600, groups=(), seed=None):
+        self.secret = secret
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.groups = list(groups)
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Calls per endpoint, to check the API's Auth Service traffic after a run
+        self.calls = {"obtain": 0, "verify": 0, "users_info": 0, "errors": 0}
+
+    def user_for_email(self, email):
+        """
+        Token user of an email, the same email always has the same user_id
+        """
+        return {
+            "user_id": str(uuid.uuid5(uuid.NAMESPACE_URL, email)),
+            "email": email,
+            "groups": [{"name": name} for name in self.groups],
+        }
+
+    def create_token(self, user):
+        now = datetime.utcnow()
+        payload = {
+            "user_id": user["user_id"],
+            "username": user["user_id"],
+            "email": user["email"],
+            "orig_iat": int(now.timestamp()),
+            "exp": now + timedelta(seconds=self.token_ttl),
+            "user": user,
+        }
+        token = jwt.encode(payload, self.secret, algorithm="HS256")
+        return token.decode("utf-8") if isinstance(token, bytes) else token
+
+    def decode_token(self, token):
+        return jwt.decode(token, self.secret, algorithms=["HS256"])
+
+    def simulate(self, action):
+        """
+        Sleep for the configured latency, then return True if this call must fail
+        """
+        with self._lock:
+            self.calls[action] += 1
+            delay = max(0.0, self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms))
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.calls["errors"] += 1
+
+        if delay:
+            time.sleep(delay / 1000)
+        return failed
+
+
+class AuthStubHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the stub, `server.config` is an AuthStubConfig
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        LOGGER.debug("auth_stub: " + format, *args)
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def send_json(self, status_code, body):
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def route(self):
+        """
+        Path relative to the API prefix, or None if the path is unknown
+        """
+        path = self.path.split("?", 1)[0]
+        if not path.startswith(API_PREFIX):
+            return None
+        return path[len(API_PREFIX):].strip("/")
+
+    def do_POST(self):
+        route = self.route()
+        data = self.read_json()
+
+        if route == "tokens/obtain":
+            if self.config.simulate("obtain"):
+                return self.send_json(503, {"error_reason": "Simulated Auth Service failure"})
+            if not data.get("email") or not data.get("password"):
+                return self.send_json(400, {"error_reason": "email and password are required"})
+            token = self.config.create_token(self.config.user_for_email(data["email"]))
+            return self.send_json(200, {"token": token})
+
+        if route == "tokens/verify":
+            if self.config.simulate("verify"):
+                return self.send_json(503, {"error_reason": "Simulated Auth Service failure"})
+            try:
+                self.config.decode_token(data.get("token") or "")
+            except jwt.InvalidTokenError as err:
+                return self.send_json(400, {"error_reason": "Invalid token: %s" % err})
+            return self.send_json(200, {"token": data["token"]})
+
+        return self.send_json(404, {"error_reason": "Not found"})
+
+    def do_GET(self):
+        route = self.route() or ""
+
+        if route.startswith("users/info/"):
+            if self.config.simulate("users_info"):
+                return self.send_json(503, {"error_reason": "Simulated Auth Service failure"})
+            user_id = route[len("users/info/"):]
+            return self.send_json(
+                200, {"user_id": user_id, "email": "%s@loadtest.roon.com" % user_id, "groups": []}
+            )
+
+        return self.send_json(404, {"error_reason": "Not found"})
+
+
+def make_server(config, host="127.0.0.1", port=8001):
+    """
+    Threaded stub server, call serve_forever() (or use a thread) to run it
+    """
+    server = ThreadingHTTPServer((host, port), AuthStubHandler)
+    server.daemon_threads = True
+    server.config = config
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the HF Auth Service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--secret",
+        default=os.environ.get("HF_AUTH_JWT_SECRET_KEY") or os.environ.get("DJANGO_SECRET_KEY"),
+        help="JWT signing key, defaults to $HF_AUTH_JWT_SECRET_KEY then $DJANGO_SECRET_KEY",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency of every call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- variation of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with a 503")
+    parser.add_argument("--groups", nargs="*", default=[], help="Group names of every token user")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed of the latency and errors")
+    args = parser.parse_args(argv)
+
+    if not args.secret:
+        parser.error("--secret (or $HF_AUTH_JWT_SECRET_KEY) is required to sign tokens")
+
+    config = AuthStubConfig(
+        args.secret,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        groups=args.groups,
+        seed=args.seed,
+    )
+    server = make_server(config, host=args.host, port=args.port)
+    print("Auth Service stub listening on http://%s:%s%s" % (args.host, args.port, API_PREFIX))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Auth Service calls: %s" % json.dumps(config.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Asyncio load test client for the Questions, Answers and Topics endpoints
+
+Runs weighted request scenarios from `--concurrency` concurrent workers for `--duration` seconds
+and reports p50/p95/p99 latency, throughput and error rate per endpoint. Every run is labelled
+with the worker configuration it ran against, and `compare` prints the runs side by side.
+
+    python -m utility.loadtest.client run --label "gunicorn 4x1" --concurrency 32 --duration 60 \\
+        --output loadtest-4x1.json
+    python -m utility.loadtest.client compare loadtest-4x1.json loadtest-2x8.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import time
+from collections import Counter
+from datetime import datetime
+
+import httpx
+
+LOGGER = logging.getLogger("roon")
+
+SEARCH_WORDS = ("How", "What", "Why", "When", "treatment", "surgery", "fatigue", "tumor", "MRI", "sleep")
+PER_PAGE = 100
+
+SCENARIOS = {}
+
+
+def scenario(name, weight=1, requires=()):
+    """
+    Register a scenario under the endpoint `name`
+
+    The function receives the LoadTestContext and returns the request to send as a dict
+    of httpx.AsyncClient.request() arguments. `requires` lists the context samples it needs.
+    """
+
+    def decorate(func):
+        assert name not in SCENARIOS, "Scenario %s is already registered" % name
+        func.scenario_name = name
+        func.scenario_weight = weight
+        func.scenario_requires = requires
+        SCENARIOS[name] = func
+        return func
+
+    return decorate
+
+
+@scenario("questions_search.plain", weight=4)
+def questions_search_plain(context):
+    return {"method": "GET", "url": "questions/search/", "params": {"title": "How", "per_page": PER_PAGE}}
+
+
+@scenario("questions_search.contains", weight=3)
+def questions_search_contains(context):
+    params = {"title": "$" + context.random.choice(SEARCH_WORDS), "per_page": PER_PAGE}
+    return {"method": "GET", "url": "questions/search/", "params": params}
+
+
+@scenario("questions_search.operator", weight=1)
+def questions_search_operator(context):
+    params = {"operator": "OR", "title": ["What", "Why"], "per_page": PER_PAGE}
+    return {"method": "GET", "url": "questions/search/", "params": params}
+
+
+@scenario("questions_info", weight=6, requires=("question_ids",))
+def questions_info(context):
+    return {"method": "GET", "url": "questions/info/%s/" % context.random.choice(context.question_ids)}
+
+
+@scenario("questions_create", weight=1)
+def questions_create(context):
+    data = {"title": "Load test question", "context": "load test", "topics": [{"title": "Load test"}]}
+    return {"method": "POST", "url": "questions/create/", "json": data}
+
+
+@scenario("answers_search", weight=2)
+def answers_search(context):
+    params = {"description": "$" + context.random.choice(SEARCH_WORDS), "per_page": PER_PAGE}
+    return {"method": "GET", "url": "questions/answers/search/", "params": params}
+
+
+@scenario("topics_info", weight=3, requires=("topic_ids",))
+def topics_info(context):
+    return {"method": "GET", "url": "questions/topics/info/%s/" % context.random.choice(context.topic_ids)}
+
+
+class LoadTestContext(object):
+    """
+    IDs sampled from the target API, shared by the scenarios
+    """
+
+    def __init__(self, question_ids=(), topic_ids=(), seed=None):
+        self.question_ids = list(question_ids)
+        self.topic_ids = list(topic_ids)
+        self.random = random.Random(seed)
+
+    def available(self, func):
+        return all(getattr(self, sample) for sample in func.scenario_requires)
+
+
+class EndpointStats(object):
+    """
+    Latencies (ms) and outcomes of the requests of one endpoint
+    """
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = Counter()
+
+    def record(self, latency, status_code=None):
+        self.latencies.append(latency)
+        self.statuses[str(status_code or "error")] += 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+
+    def merge(self, other):
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        self.statuses.update(other.statuses)
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput": round(count / elapsed, 2) if elapsed else 0.0,
+            "mean": round(sum(latencies) / count, 3) if count else 0.0,
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(latencies[-1], 3) if count else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of sorted values
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def select_scenarios(context, names=None):
+    """
+    Registered scenarios (all, or those whose name starts with one of `names`) the context can run
+    """
+    selected = []
+    for name, func in sorted(SCENARIOS.items()):
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        if not context.available(func):
+            LOGGER.warning("Skipping scenario %s, the target API has no %s", name, ", ".join(func.scenario_requires))
+            continue
+        selected.append(func)
+    return selected
+
+
+async def obtain_token(auth_url, email, password):
+    """
+    JWT of the load test user, obtained from the Auth Service (or its stub)
+    """
+    async with httpx.AsyncClient() as client:
+        response = await client.post(auth_url + "tokens/obtain/", json={"email": email, "password": password})
+        response.raise_for_status()
+        return response.json()["token"]
+
+
+async def sample_ids(client):
+    """
+    Sample question and topic IDs from the first page of questions
+    """
+    response = await client.get("questions/search/", params={"per_page": PER_PAGE})
+    response.raise_for_status()
+    questions = response.json().get("questions", [])
+
+    question_ids = [question["question_id"] for question in questions]
+    topic_ids = {topic["topic_id"] for question in questions for topic in question.get("topics") or []}
+    return question_ids, sorted(topic_ids)
+
+
+async def _worker(client, context, scenarios, weights, deadline, stats, max_requests):
+    while time.perf_counter() < deadline and (max_requests is None or max_requests[0] > 0):
+        if max_requests is not None:
+            max_requests[0] -= 1
+
+        func = context.random.choices(scenarios, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await client.request(**func(context))
+            status_code = response.status_code
+        except httpx.HTTPError as err:
+            LOGGER.debug("%s failed: %s", func.scenario_name, err)
+            status_code = None
+        stats.setdefault(func.scenario_name, EndpointStats()).record((time.perf_counter() - start) * 1000, status_code)
+
+
+async def run_load_test(client, context, scenarios, concurrency=16, duration=30.0, max_requests=None):
+    """
+    Send requests from `concurrency` workers for `duration` seconds (or until `max_requests` are sent)
+
+    Returns ({endpoint: EndpointStats}, elapsed seconds)
+    """
+    weights = [func.scenario_weight for func in scenarios]
+    stats = {}
+    remaining = [max_requests] if max_requests is not None else None
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *[_worker(client, context, scenarios, weights, deadline, stats, remaining) for _ in range(concurrency)]
+    )
+    return stats, time.perf_counter() - start
+
+
+def build_report(stats, elapsed, label, meta=None):
+    """
+    JSON serializable report, per endpoint and for all endpoints ("ALL")
+    """
+    total = EndpointStats()
+    for endpoint_stats in stats.values():
+        total.merge(endpoint_stats)
+
+    results = {name: endpoint_stats.summary(elapsed) for name, endpoint_stats in stats.items()}
+    results["ALL"] = total.summary(elapsed)
+
+    report_meta = {
+        "label": label,
+        "created_at": datetime.utcnow().isoformat(),
+        "elapsed": round(elapsed, 3),
+        "python": platform.python_version(),
+    }
+    report_meta.update(meta or {})
+    return {"meta": report_meta, "results": results}
+
+
+def format_report(report):
+    lines = ["%s (%.1fs)" % (report["meta"]["label"], report["meta"]["elapsed"])]
+    lines.append(
+        "%-28s %9s %8s %8s %10s %10s %10s" % ("endpoint", "requests", "errors", "req/s", "p50 (ms)", "p95", "p99")
+    )
+    for name, summary in sorted(report["results"].items(), key=lambda item: (item[0] == "ALL", item[0])):
+        lines.append(
+            "%-28s %9s %7.2f%% %8.1f %10.2f %10.2f %10.2f"
+            % (
+                name,
+                summary["requests"],
+                summary["error_rate"] * 100,
+                summary["throughput"],
+                summary["p50"],
+                summary["p95"],
+                summary["p99"],
+            )
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(reports, metric="p95"):
+    """
+    One row per endpoint and one column per worker configuration
+    """
+    labels = [report["meta"]["label"] for report in reports]
+    endpoints = sorted({name for report in reports for name in report["results"]}, key=lambda n: (n == "ALL", n))
+
+    lines = ["%s (ms) / req/s" % metric, "%-28s" % "endpoint" + "".join(" %22s" % label[:22] for label in labels)]
+    for name in endpoints:
+        cells = []
+        for report in reports:
+            summary = report["results"].get(name)
+            cells.append(" %22s" % ("%.2f / %.1f" % (summary[metric], summary["throughput"]) if summary else "-"))
+        lines.append("%-28s" % name + "".join(cells))
+    return "\n".join(lines)
+
+
+async def _run(args):
+    token = args.token or await obtain_token(args.auth_url, args.email, args.password)
+    headers = {"Authorization": "JWT " + token}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=args.timeout) as client:
+        question_ids, topic_ids = await sample_ids(client)
+        context = LoadTestContext(question_ids, topic_ids, seed=args.seed)
+        scenarios = select_scenarios(context, names=args.only)
+        if not scenarios:
+            raise SystemExit("No scenario to run, seed the target database first (manage.py seed_corpus)")
+
+        stats, elapsed = await run_load_test(
+            client, context, scenarios, concurrency=args.concurrency, duration=args.duration, max_requests=args.requests
+        )
+
+    return build_report(
+        stats,
+        elapsed,
+        args.label,
+        meta={"url": args.url, "concurrency": args.concurrency, "duration": args.duration},
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Roon-API endpoints")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run a load test and save its report")
+    run_parser.add_argument("--url", default="http://localhost:8000/api/v1/", help="Base URL of the API")
+    run_parser.add_argument("--auth-url", default="http://localhost:8001/api/v1/", help="Base URL of the Auth Service")
+    run_parser.add_argument("--email", default="loadtest@roon.com")
+    run_parser.add_argument("--password", default="loadtest")
+    run_parser.add_argument("--token", default=None, help="JWT to use instead of obtaining one")
+    run_parser.add_argument("--label", default="default", help="Worker configuration under test, e.g. 'gunicorn 4x2'")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    run_parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    run_parser.add_argument("--timeout", type=float, default=30.0, help="Seconds before a request fails")
+    run_parser.add_argument("--only", nargs="*", default=None, help="Scenario name prefixes to run")
+    run_parser.add_argument("--seed", type=int, default=None, help="Random seed of the scenario mix")
+    run_parser.add_argument("--output", default="loadtest.json", help="Path of the JSON report")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare the reports of several worker configurations")
+    compare_parser.add_argument("reports", nargs="+", help="Paths of JSON reports")
+    compare_parser.add_argument("--metric", default="p95", choices=["p50", "p95", "p99", "mean", "max"])
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        reports = []
+        for path in args.reports:
+            with open(path) as report_file:
+                reports.append(json.load(report_file))
+        print(format_comparison(reports, metric=args.metric))
+        return
+
+    report = asyncio.run(_run(args))
+    with open(args.output, "w") as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+    print(format_report(report))
+    print("Report saved to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
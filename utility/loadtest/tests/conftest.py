@@ -0,0 +1,22 @@
+"""Pytest conftest file for defining load test specific pytest fixtures"""
+import threading
+
+import pytest
+
+from utility.loadtest.auth_stub import AuthStubConfig, make_server
+
+SECRET = "load-test-secret"
+
+
+@pytest.fixture
+def auth_stub():
+    """Pytest fixture that runs the Auth Service stub on a free port and yields its base URL and config"""
+    config = AuthStubConfig(SECRET, groups=["staff"], seed=1)
+    server = make_server(config, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield "http://127.0.0.1:%s/api/v1/" % server.server_address[1], config
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,52 @@
+"""Unit Tests for the Auth Service stub"""
+import jwt
+import requests
+
+
+def test_obtain_and_verify_token(auth_stub):
+    """Ensure obtained tokens carry the token user and verify"""
+    url, config = auth_stub
+
+    response = requests.post(url + "tokens/obtain/", json={"email": "a@roon.com", "password": "pass"})
+    assert response.status_code == 200
+    token = response.json()["token"]
+
+    payload = jwt.decode(token, "load-test-secret", algorithms=["HS256"])
+    assert payload["user"]["email"] == "a@roon.com"
+    assert payload["user"]["groups"] == [{"name": "staff"}]
+    assert payload["user"] == config.user_for_email("a@roon.com")
+
+    response = requests.post(url + "tokens/verify/", json={"token": token})
+    assert response.status_code == 200
+    assert response.json() == {"token": token}
+    assert config.calls["obtain"] == config.calls["verify"] == 1
+
+
+def test_invalid_token_and_credentials(auth_stub):
+    """Ensure bad tokens and missing credentials are rejected with a 400"""
+    url, _ = auth_stub
+
+    assert requests.post(url + "tokens/verify/", json={"token": "not-a-token"}).status_code == 400
+    assert requests.post(url + "tokens/obtain/", json={"email": "a@roon.com"}).status_code == 400
+    assert requests.get(url + "unknown/").status_code == 404
+
+
+def test_users_info(auth_stub):
+    """Ensure users/info returns the requested user"""
+    url, _ = auth_stub
+
+    response = requests.get(url + "users/info/1234")
+
+    assert response.status_code == 200
+    assert response.json()["user_id"] == "1234"
+
+
+def test_error_rate(auth_stub):
+    """Ensure the configured fraction of calls fail with a 503"""
+    url, config = auth_stub
+    config.error_rate = 1.0
+
+    response = requests.post(url + "tokens/obtain/", json={"email": "a@roon.com", "password": "pass"})
+
+    assert response.status_code == 503
+    assert config.calls["errors"] == 1
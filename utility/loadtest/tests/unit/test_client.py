@@ -0,0 +1,78 @@
+"""Unit Tests for the load test client"""
+import asyncio
+
+import httpx
+
+from utility.loadtest.client import (
+    SCENARIOS,
+    EndpointStats,
+    LoadTestContext,
+    build_report,
+    format_comparison,
+    percentile,
+    run_load_test,
+    select_scenarios,
+)
+
+
+def test_percentile():
+    """Ensure percentiles use the nearest rank"""
+    values = list(range(1, 101))
+
+    assert percentile(values, 0.5) == 51
+    assert percentile(values, 0.99) == 100
+    assert percentile([], 0.5) == 0.0
+
+
+def test_endpoint_stats_summary():
+    """Ensure errors and throughput are computed from the recorded requests"""
+    stats = EndpointStats()
+    for latency in range(1, 11):
+        stats.record(float(latency), 200)
+    stats.record(50.0, 500)
+    stats.record(60.0, None)
+
+    summary = stats.summary(elapsed=2.0)
+
+    assert summary["requests"] == 12
+    assert summary["errors"] == 2
+    assert summary["throughput"] == 6.0
+    assert summary["max"] == 60.0
+    assert summary["statuses"] == {"200": 10, "500": 1, "error": 1}
+
+
+def test_scenarios_without_samples_are_skipped():
+    """Ensure info scenarios are skipped when the target API has no questions or topics"""
+    names = [func.scenario_name for func in select_scenarios(LoadTestContext())]
+
+    assert "questions_info" not in names
+    assert "topics_info" not in names
+    assert "questions_search.plain" in names
+
+    context = LoadTestContext(question_ids=["1"], topic_ids=["2"])
+    assert len(select_scenarios(context)) == len(SCENARIOS)
+    assert [func.scenario_name for func in select_scenarios(context, names=["topics"])] == ["topics_info"]
+
+
+def test_run_load_test_reports_per_endpoint():
+    """Ensure a run reports every endpoint it requested and the total"""
+
+    def handler(request):
+        status_code = 500 if "topics" in request.url.path else 200
+        return httpx.Response(status_code, json={})
+
+    async def run():
+        context = LoadTestContext(question_ids=["1"], topic_ids=["2"], seed=1)
+        scenarios = select_scenarios(context, names=["questions_info", "topics_info"])
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(base_url="http://api/api/v1/", transport=transport) as client:
+            return await run_load_test(client, context, scenarios, concurrency=4, duration=10, max_requests=40)
+
+    stats, elapsed = asyncio.run(run())
+    report = build_report(stats, elapsed, "test")
+
+    assert set(report["results"]) == {"questions_info", "topics_info", "ALL"}
+    assert report["results"]["ALL"]["requests"] == 40
+    assert report["results"]["topics_info"]["error_rate"] == 1.0
+    assert report["results"]["questions_info"]["errors"] == 0
+    assert "questions_info" in format_comparison([report, report])
@@ -12,6 +12,7 @@ from rest_framework import status
 
 from api.core.data_anonymizer import cleanse_data
 from api.core.utils import extract_protocol_and_ip
+from utility.logging.policies import get_policy
 
 
 class RequestLogFilter(logging.Filter):
@@ -38,6 +39,9 @@ class RequestLogFilter(logging.Filter):
         "status",
         "response",
         "duration",
+        "db_query_count",
+        "db_duration",
+        "db_duplicate_queries",
         ("log_level", "levelname"),
         ("exception", "exc_text"),
         "message",
@@ -86,25 +90,39 @@ class RequestLogFilter(logging.Filter):
             if "HTTP_USER_AGENT" in self.request.META:
                 record.agent = self.request.META["HTTP_USER_AGENT"]
             try:
-                record.action = resolve(self.request.path).view_name
-                record.object = resolve(self.request.path).app_name
+                match = resolve(self.request.path)
+                record.action = match.view_name
+                record.object = match.app_name
             except (Resolver404, NoReverseMatch):
                 record.action = "Unknown"
                 record.object = "Unknown"
-            record.parameters = self.sanitize_parameters(self.request)
+            query_stats = getattr(self.request, "query_stats", None)
+            if query_stats is not None:
+                for field, value in query_stats.as_log_fields().items():
+                    setattr(record, field, value)
 
         if self.response is not None:
             record.http_status = getattr(self.response, "status_code", "Unknown status")
             record.duration = getattr(self.response, "duration", record.duration)
             if not status.is_redirect(record.http_status) and not status.is_success(record.http_status):
                 record.status = "Fail"
-                try:
-                    record.response = self.response.data
-                except Exception:
-                    pass
             else:
                 record.status = "Success"
 
+        # Sampling and field selection happen before any expensive field is computed
+        policy = get_policy(record.action)
+        if not policy.should_log(record):
+            return False
+
+        if self.request is not None and policy.include_parameters:
+            record.parameters = policy.cap_body(self.sanitize_parameters(self.request))
+
+        if record.status == "Fail" and policy.include_response:
+            try:
+                record.response = policy.cap_body(self.response.data)
+            except Exception:
+                pass
+
         return record
 
     def set_record_defaults(self, record):
@@ -129,6 +147,9 @@ class RequestLogFilter(logging.Filter):
         record.status = None
         record.response = None
         record.duration = None
+        record.db_query_count = None
+        record.db_duration = None
+        record.db_duplicate_queries = None
         record.exception = None
         record.log_level = record.levelno
 
@@ -0,0 +1,134 @@
+"""Defines RequestLogPolicy"""
+import json
+import logging
+import random
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import status
+
+
+class RequestLogPolicy(object):
+    """
+    Per-view request logging policy
+
+    Decides whether a log record for a view is emitted (sampling) and which expensive
+    fields (parameters, response body) are attached to it. Errors and slow requests
+    bypass sampling so that they are always logged.
+    """
+
+    DEFAULTS = {
+        "sample_rate": 1.0,
+        "include_parameters": True,
+        "include_response": True,
+        "max_body_size": None,
+        "always_log_errors": True,
+        "slow_request_ms": None,
+    }
+
+    def __init__(self, **options):
+        unknown = set(options.keys()).difference(self.DEFAULTS.keys())
+        assert not unknown, "Unknown request log policy option(s): {}".format(sorted(unknown))
+
+        config = dict(self.DEFAULTS, **options)
+        self.sample_rate = float(config["sample_rate"])
+        self.include_parameters = bool(config["include_parameters"])
+        self.include_response = bool(config["include_response"])
+        self.max_body_size = config["max_body_size"]
+        self.always_log_errors = bool(config["always_log_errors"])
+        self.slow_request_ms = config["slow_request_ms"]
+
+    def is_error(self, record):
+        """
+        Record is an error when it is logged at ERROR or above, or the response failed
+        """
+        if record.levelno >= logging.ERROR:
+            return True
+
+        http_status = getattr(record, "http_status", None)
+        if isinstance(http_status, int):
+            return not status.is_success(http_status) and not status.is_redirect(http_status)
+        return False
+
+    def is_slow(self, record):
+        """
+        Record is slow when its duration (ms) reaches the policy threshold
+        """
+        duration = getattr(record, "duration", None)
+        if self.slow_request_ms is None or duration is None:
+            return False
+        try:
+            return float(duration) >= self.slow_request_ms
+        except (TypeError, ValueError):
+            return False
+
+    def should_log(self, record):
+        """
+        Sampling decision, errors and slow requests are always logged
+        """
+        if self.always_log_errors and self.is_error(record):
+            return True
+        if self.is_slow(record):
+            return True
+        if self.sample_rate >= 1.0:
+            return True
+        if self.sample_rate <= 0.0:
+            return False
+        return random.random() < self.sample_rate
+
+    def cap_body(self, body):
+        """
+        Returns the body unchanged when it fits within max_body_size,
+        otherwise a truncated string representation of it
+        """
+        if not self.max_body_size or body is None:
+            return body
+
+        if isinstance(body, (bytes, bytearray)):
+            serialized = body.decode("utf8", errors="replace")
+        elif isinstance(body, str):
+            serialized = body
+        else:
+            serialized = json.dumps(body, default=str)
+
+        if len(serialized) <= self.max_body_size:
+            return body
+
+        return "%s...[truncated %s chars]" % (
+            serialized[: self.max_body_size],
+            len(serialized) - self.max_body_size,
+        )
+
+
+@lru_cache(maxsize=None)
+def _compiled_policies():
+    """
+    Build the default policy and all per-view policies from settings once
+    """
+    default_options = getattr(settings, "REQUEST_LOG_DEFAULT_POLICY", {})
+    default = RequestLogPolicy(**default_options)
+
+    policies = {
+        view_name: RequestLogPolicy(**dict(default_options, **options))
+        for view_name, options in getattr(settings, "REQUEST_LOG_POLICIES", {}).items()
+    }
+    return default, policies
+
+
+def get_policy(view_name):
+    """
+    Returns the RequestLogPolicy for a resolved view_name (Ex: "questions:search")
+    """
+    default, policies = _compiled_policies()
+    return policies.get(view_name, default)
+
+
+@receiver(setting_changed)
+def _reset_policies(setting, **kwargs):
+    """
+    Recompile the policies when the settings change (Ex: in tests)
+    """
+    if setting in ("REQUEST_LOG_DEFAULT_POLICY", "REQUEST_LOG_POLICIES"):
+        _compiled_policies.cache_clear()
@@ -0,0 +1,97 @@
+"""Unit Tests for RequestLogPolicy"""
+from django.test import RequestFactory
+from mock import patch
+
+from utility.logging.filters import RequestLogFilter
+from utility.logging.policies import RequestLogPolicy, get_policy
+
+
+def test_default_policy_logs_everything(log_info_record):
+    """Ensure the default policy keeps every record and every field"""
+    policy = RequestLogPolicy()
+
+    assert policy.should_log(log_info_record)
+    assert policy.include_parameters
+    assert policy.include_response
+    assert policy.cap_body({"key": "value"}) == {"key": "value"}
+
+
+def test_sampling_drops_successful_records(log_info_record):
+    """Ensure a zero sample rate drops successful records"""
+    policy = RequestLogPolicy(sample_rate=0.0)
+    log_info_record.http_status = 200
+
+    assert not policy.should_log(log_info_record)
+
+    with patch("utility.logging.policies.random.random", return_value=0.05):
+        assert RequestLogPolicy(sample_rate=0.1).should_log(log_info_record)
+    with patch("utility.logging.policies.random.random", return_value=0.5):
+        assert not RequestLogPolicy(sample_rate=0.1).should_log(log_info_record)
+
+
+def test_errors_and_slow_requests_bypass_sampling(log_info_record, log_error_record):
+    """Ensure errors and slow requests are always logged"""
+    policy = RequestLogPolicy(sample_rate=0.0, slow_request_ms=500)
+
+    assert policy.should_log(log_error_record)
+
+    log_info_record.http_status = 503
+    assert policy.should_log(log_info_record)
+
+    log_info_record.http_status = 200
+    log_info_record.duration = 750
+    assert policy.should_log(log_info_record)
+
+    log_info_record.duration = 10
+    assert not policy.should_log(log_info_record)
+
+    assert not RequestLogPolicy(sample_rate=0.0, always_log_errors=False).should_log(log_error_record)
+
+
+def test_cap_body():
+    """Ensure bodies over max_body_size are truncated"""
+    policy = RequestLogPolicy(max_body_size=10)
+
+    assert policy.cap_body("short") == "short"
+    assert policy.cap_body("x" * 25) == "x" * 10 + "...[truncated 15 chars]"
+    assert policy.cap_body({"key": "y" * 20}).startswith('{"key": "y')
+
+
+def test_get_policy_from_settings(settings):
+    """Ensure per-view policies are merged over the default policy"""
+    settings.REQUEST_LOG_DEFAULT_POLICY = {"sample_rate": 0.5, "max_body_size": 100}
+    settings.REQUEST_LOG_POLICIES = {"heartbeat": {"include_parameters": False}}
+
+    heartbeat = get_policy("heartbeat")
+    assert heartbeat.sample_rate == 0.5
+    assert heartbeat.max_body_size == 100
+    assert not heartbeat.include_parameters
+
+    default = get_policy("questions:info")
+    assert default.sample_rate == 0.5
+    assert default.include_parameters
+
+
+def test_filter_skips_parameters_before_sanitizing(settings, log_info_record):
+    """Ensure RequestLogFilter does not compute parameters the policy excludes"""
+    settings.REQUEST_LOG_POLICIES = {"heartbeat": {"include_parameters": False}}
+
+    log_filter = RequestLogFilter()
+    log_filter.request = RequestFactory().get("/heartbeat/", {"password": "secret"})
+
+    with patch.object(RequestLogFilter, "sanitize_parameters") as mock_sanitize:
+        assert log_filter.filter(log_info_record)
+        mock_sanitize.assert_not_called()
+
+    assert log_info_record.action == "heartbeat"
+    assert log_info_record.parameters is None
+
+
+def test_filter_drops_sampled_out_records(settings, log_info_record):
+    """Ensure RequestLogFilter drops records that the view policy samples out"""
+    settings.REQUEST_LOG_POLICIES = {"heartbeat": {"sample_rate": 0.0}}
+
+    log_filter = RequestLogFilter()
+    log_filter.request = RequestFactory().get("/heartbeat/")
+
+    assert not log_filter.filter(log_info_record)